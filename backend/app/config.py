@@ -15,21 +15,50 @@ VM_IP = DEFAULT_VM_IP  # Alias for backwards compatibility
 VM_CPUS = 2
 VM_MEMORY = "2G"
 VM_DISK = "10G"
+VM_STATE_CACHE_TTL = 2.0  # seconds multipass list/info results are reused
 
 # Network Configuration
 FLOW_TIMEOUT = 2  # seconds (VERY aggressive for continuous detection)
 PACKET_BUFFER_SIZE = 1000
 MAX_FLOWS = 5000  # Balanced: not too restrictive, not too permissive
+INTERFACE_COMMAND_TIMEOUT = 3.0  # seconds for ip/route/ifconfig/getcap lookups
+CAPTURE_START_TIMEOUT = 2.0  # seconds to wait for the sniffer to signal readiness
+CAPTURE_REBIND_DELAY = 1.0  # seconds to let link/route change bursts settle before rebinding
 
 # Detection Configuration
 DETECTION_CONFIDENCE_THRESHOLD = 0.15  # Lowered to detect suspicious behavior (was 0.5, original 0.7)
 BATCH_SIZE = 32  # for model inference
 DETECTION_INTERVAL = 1  # seconds (for flow processing)
 LOG_ALL_PREDICTIONS = True  # Log predictions for all flows, not just attacks
+ALERT_AGGREGATION_WINDOW = 5  # seconds - merge repeated detections into one incident
+MAX_OPEN_INCIDENTS = 10000
+
+# Cardinality (HyperLogLog) scan/spoofing detection
+CARDINALITY_PRECISION = 10  # 2^10 registers per key (~1 KB, ~3% error)
+CARDINALITY_WINDOW = 10  # seconds per decay window (estimates cover 1-2 windows)
+CARDINALITY_MAX_KEYS = 10000  # Max tracked keys per estimator map
+PORT_SCAN_THRESHOLD = 100  # Distinct dst ports from one source
+SPOOF_SOURCE_THRESHOLD = 500  # Distinct sources to one dst ip:port
+
+# Time-series metrics tiers: name -> (resolution seconds, ring slots)
+TIMESERIES_TIERS = {
+    "1s": (1, 3600),  # last hour
+    "1m": (60, 1440),  # last day
+    "1h": (3600, 168),  # last week
+}
 
 # WebSocket Configuration
 WEBSOCKET_PORT = 8000
 WEBSOCKET_HOST = "0.0.0.0"
+WS_SEND_QUEUE_SIZE = 1000  # Per-client pending messages
+WS_QUEUE_FULL_POLICY = "coalesce"  # drop_oldest, drop_newest or coalesce
+WS_SEND_TIMEOUT = 5.0  # seconds for a single send before the client is dropped
+WS_MAX_LAG = 10.0  # seconds a queued message may wait before the client is dropped
+WS_MAX_DROPPED = 10000  # Dropped messages before the client is disconnected
+WS_BATCH_INTERVAL = 0.1  # seconds - detections are sent in frames at most this often
+WS_BATCH_MAX_EVENTS = 200  # Flush a detection frame early once it holds this many
+STATS_PUSH_INTERVAL = 1.0  # seconds between stats ticks pushed over /ws
+STATS_KEYFRAME_TICKS = 30  # Send a full stats snapshot every N ticks, deltas otherwise
 
 # API Configuration
 API_HOST = "0.0.0.0"
@@ -45,12 +74,45 @@ CORS_ORIGINS = [
 ATTACK_TOOLS_DIR = BASE_DIR / "tools"
 ATTACK_LOG_DIR = BASE_DIR / "logs" / "attacks"
 ATTACK_LOG_DIR.mkdir(parents=True, exist_ok=True)
+ATTACK_LOG_LINES = 1000  # Output lines kept per launched attack tool (ring buffer)
+ATTACK_STOP_TIMEOUT = 5.0  # seconds to wait after SIGTERM before SIGKILL
+ATTACK_LAUNCHER_HISTORY = 20  # Finished launches whose logs stay available
+ATTACK_USE_WORKER_PROCESSES = os.getenv("ATTACK_USE_WORKER_PROCESSES", "true").lower() == "true"
+ATTACK_WORKERS = int(os.getenv("ATTACK_WORKERS", "1"))  # Worker processes per attack (parameters.workers overrides)
+ATTACK_MAX_WORKERS = os.cpu_count() or 1
+ATTACK_STATUS_POLL_INTERVAL = 0.25  # seconds between worker liveness checks
+WORDLIST_DIR = BASE_DIR / "wordlists"  # Default brute-force credential lists
+
+# Scenario (timed attack campaign) configuration
+SCENARIO_DIR = BASE_DIR / "scenarios"  # Saved scenario files (<name>.json)
+SCENARIO_RUN_DIR = BASE_DIR / "logs" / "scenarios"  # Ground-truth labels per run
+SCENARIO_RUN_DIR.mkdir(parents=True, exist_ok=True)
+SCENARIO_RUN_HISTORY = 20  # Finished runs kept in memory (all stay on disk)
+SCENARIO_DETECTION_GRACE = 10.0  # seconds after a phase ends that its detections still count
 
 # Capture Configuration
 CAPTURE_LOG_DIR = BASE_DIR / "logs" / "capture"
 CAPTURE_LOG_DIR.mkdir(parents=True, exist_ok=True)
 PCAP_SAVE_DIR = BASE_DIR / "pcaps"
 PCAP_SAVE_DIR.mkdir(parents=True, exist_ok=True)
+PCAP_RING_ENABLED = os.getenv("PCAP_RING_ENABLED", "false").lower() == "true"  # Record raw frames while monitoring
+PCAP_RING_DIR = PCAP_SAVE_DIR / "ring"  # Rotating recorder files (cleared when a capture starts)
+PCAP_RING_FILES = 8  # Ring size: oldest file is deleted beyond this
+PCAP_RING_FILE_SIZE = 32 * 1024 * 1024  # bytes per ring file before rotating
+PCAP_RING_FILE_SECONDS = 60  # capture seconds per ring file before rotating
+PCAP_RING_QUEUE_SIZE = 100000  # Frames waiting for the writer thread before new ones are dropped
+PCAP_RING_FLUSH_INTERVAL = 0.5  # seconds between writer passes
+PCAP_SNAPSHOT_BEFORE = 20  # capture seconds kept before a detection
+PCAP_SNAPSHOT_AFTER = 10  # capture seconds kept after a detection
+PCAP_SNAPSHOT_MAX_SECONDS = 300  # Overlapping detections extend one snapshot up to this length
+PCAP_SNAPSHOT_HISTORY = 50  # Recent snapshots listed in recorder stats
+
+# Detection storage (SQLite, WAL mode)
+DATA_DIR = BASE_DIR / "data"
+DETECTION_DB_PATH = DATA_DIR / "detections.db"
+DETECTION_STORE_BATCH_SIZE = 500  # Rows per group commit
+DETECTION_STORE_FLUSH_INTERVAL = 1.0  # seconds
+DETECTION_STORE_QUEUE_SIZE = 100000  # Pending rows before new ones are dropped
 
 # Feature extraction
 FEATURE_COUNT = 82  # CIC-IDS2018 features before selection
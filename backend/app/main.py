@@ -2,6 +2,7 @@
 
 import sys
 import os
+import json
 from pathlib import Path
 
 # Add parent directory to path to allow imports
@@ -15,10 +16,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import CORS_ORIGINS, API_HOST, API_PORT, LOG_LEVEL, LOG_FORMAT
-from app.routes import monitoring, attacks, vm, stats, attack_launcher
+from app.routes import monitoring, attacks, vm, stats, attack_launcher, detections, scenarios
 from app.websocket_manager import get_websocket_manager
 from app.services.detection_engine import get_detection_engine
 from app.services.ids_model import get_model_service
+from app.services.detection_store import get_detection_store
+from app.services.stats_stream import build_stats_summary, get_stats_stream
+from app.services.attack_orchestrator import get_attack_orchestrator
+from app.services.scenario_runner import get_scenario_runner
 
 # Configure logging
 logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
@@ -56,11 +61,27 @@ async def lifespan(app: FastAPI):
             'protocol': detection.protocol,
             'packet_count': detection.packet_count,
             'byte_count': detection.byte_count,
-            'is_attack': detection.is_attack
+            'is_attack': detection.is_attack,
+            'incident_id': detection.incident_id,
+            'count': detection.count,
+            'first_seen': detection.first_seen.isoformat() if detection.first_seen else None,
+            'last_seen': detection.last_seen.isoformat() if detection.last_seen else None
         })
     
     detection_engine.register_detection_callback(detection_callback)
     
+    # Persist detections
+    detection_store = get_detection_store()
+    detection_store.start()
+    detection_engine.register_detection_callback(detection_store.add)
+    
+    # Push dashboard stats over /ws instead of per-tab polling
+    stats_stream = get_stats_stream()
+    stats_stream.register_source('summary', build_stats_summary)
+    stats_stream.register_source('active_attacks', get_attack_orchestrator().get_active_attacks)
+    stats_stream.register_source('real_attacks', attack_launcher.list_active_real_attacks)
+    stats_stream.start()
+    
     logger.info("IDS Monitoring System started")
     
     yield
@@ -68,10 +89,18 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down IDS Monitoring System...")
     
+    # Stop a running scenario (and its attacks) so its labels are saved
+    await get_scenario_runner().stop()
+    
     # Stop detection if running
     if detection_engine.is_running:
         await detection_engine.stop_monitoring()
     
+    await stats_stream.stop()
+    
+    # Flush pending detections to disk
+    detection_store.stop()
+    
     logger.info("IDS Monitoring System shutdown complete")
 
 
@@ -98,6 +127,8 @@ app.include_router(attacks.router)
 app.include_router(vm.router)
 app.include_router(stats.router)
 app.include_router(attack_launcher.router)
+app.include_router(detections.router)
+app.include_router(scenarios.router)
 
 
 @app.get("/")
@@ -127,8 +158,10 @@ async def health_check():
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
     ws_manager = get_websocket_manager()
+    stats_stream = get_stats_stream()
     
     await ws_manager.connect(websocket)
+    await stats_stream.send_snapshot(websocket)
     
     try:
         while True:
@@ -137,7 +170,36 @@ async def websocket_endpoint(websocket: WebSocket):
             
             # Echo back for ping/pong
             if data == "ping":
-                await websocket.send_text("pong")
+                await ws_manager.send_personal_message("pong", websocket)
+                continue
+            
+            # Subscription filters: {"type": "subscribe", "event_types": [...], ...}
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            
+            # Client missed a stats delta - resend the full snapshot
+            if message.get('type') == 'stats_resync':
+                await stats_stream.send_snapshot(websocket)
+                continue
+            
+            if message.get('type') != 'subscribe':
+                continue
+            
+            try:
+                subscription = ws_manager.update_subscription(websocket, message)
+                await ws_manager.send_personal_message({
+                    'event_type': 'subscribed',
+                    'subscription': subscription.to_dict()
+                }, websocket)
+            except ValueError as e:
+                await ws_manager.send_personal_message({
+                    'event_type': 'error',
+                    'message': str(e)
+                }, websocket)
             
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
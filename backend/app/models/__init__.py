@@ -3,6 +3,7 @@
 from .detection import DetectionResult, DetectionEvent
 from .attack import AttackRequest, AttackResponse, AttackStatus
 from .vm import VMStatus, VMInfo
+from .scenario import Scenario, ScenarioPhase
 
 __all__ = [
     'DetectionResult',
@@ -11,6 +12,8 @@ __all__ = [
     'AttackResponse',
     'AttackStatus',
     'VMStatus',
-    'VMInfo'
+    'VMInfo',
+    'Scenario',
+    'ScenarioPhase'
 ]
 
@@ -21,6 +21,12 @@ class DetectionResult(BaseModel):
     byte_count: int
     duration: float
     is_attack: bool
+    
+    # Incident aggregation (set by AlertAggregator)
+    incident_id: Optional[str] = None
+    count: int = 1
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
 
 
 class DetectionEvent(BaseModel):
@@ -42,3 +48,10 @@ class DetectionStats(BaseModel):
     start_time: Optional[datetime] = None
     uptime_seconds: float
 
+
+
+class ReplayRequest(BaseModel):
+    """Offline detection over capture files"""
+    files: List[str]  # pcap/pcapng names, relative to PCAP_SAVE_DIR
+    speed: float = 0.0  # 0 = as fast as possible, 1.0 = real time
+    vm_ip: Optional[str] = None  # only analyse traffic to/from this address
@@ -0,0 +1,71 @@
+"""Attack scenario (timed campaign) models"""
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Any
+from app.models.attack import AttackType
+
+BENIGN_LABEL = "Benign"
+
+
+class RateRamp(BaseModel):
+    """Linear rate ramp over a phase, applied in equal steps"""
+    start_rate: float = Field(gt=0)
+    end_rate: float = Field(gt=0)
+    steps: int = Field(default=5, ge=1)
+
+
+class ScenarioPhase(BaseModel):
+    """One timed phase; no attack_type means a benign (no attack) period"""
+    name: str
+    start: float = Field(default=0.0, ge=0)  # seconds from scenario start
+    duration: float = Field(gt=0)  # seconds
+    attack_type: Optional[AttackType] = None
+    target_port: Optional[int] = None
+    intensity: Optional[str] = None  # low, medium, high
+    rate: Optional[float] = None  # fixed target rate (overrides intensity)
+    ramp: Optional[RateRamp] = None  # overrides rate
+    workers: Optional[int] = None
+    parameters: Dict[str, Any] = {}
+    
+    @model_validator(mode="after")
+    def check_rates(self):
+        if self.attack_type is None and (self.rate or self.ramp):
+            raise ValueError(f"Phase '{self.name}': benign phases take no rate or ramp")
+        return self
+    
+    @property
+    def label(self) -> str:
+        """Ground-truth label (the model's class name)"""
+        return self.attack_type.value if self.attack_type else BENIGN_LABEL
+    
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class Scenario(BaseModel):
+    """A mixed attack campaign: phases may overlap"""
+    name: str
+    description: str = ""
+    target_ip: Optional[str] = None  # default target (the run request can override)
+    phases: List[ScenarioPhase]
+    
+    @model_validator(mode="after")
+    def check_phases(self):
+        if not self.phases:
+            raise ValueError("Scenario needs at least one phase")
+        names = [phase.name for phase in self.phases]
+        if len(set(names)) != len(names):
+            raise ValueError("Phase names must be unique")
+        return self
+    
+    @property
+    def duration(self) -> float:
+        return max(phase.end for phase in self.phases)
+
+
+class ScenarioRunRequest(BaseModel):
+    """Run a saved scenario by name, or an inline one"""
+    name: Optional[str] = None
+    scenario: Optional[Scenario] = None
+    target_ip: Optional[str] = None
@@ -4,10 +4,15 @@ API endpoints for launching real attack tools directly from frontend
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional, Literal
-import subprocess
+from typing import Dict, List, Optional, Literal
+from collections import OrderedDict, deque
+from datetime import datetime
 import logging
 import asyncio
+import signal
+import os
+
+from app.config import ATTACK_LOG_LINES, ATTACK_STOP_TIMEOUT, ATTACK_LAUNCHER_HISTORY
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +24,101 @@ class AttackLaunchRequest(BaseModel):
     duration: int = 30  # seconds
     threads: Optional[int] = None  # Auto-set based on attack type
 
-# Store active processes
-active_attacks = {}
+# Store active processes (and recently finished ones, for their logs)
+active_attacks: Dict[str, Dict] = {}
+finished_attacks: "OrderedDict[str, Dict]" = OrderedDict()
+
+async def _pump_output(stream: asyncio.StreamReader, info: Dict, name: str):
+    """Read a pipe until EOF into the attack's ring buffer so the tool never blocks on a full pipe"""
+    pending = b""
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            _append_log(info, name, line)
+        if len(pending) > 65536:
+            # Unterminated output (progress bars etc.) - flush as a line
+            _append_log(info, name, pending)
+            pending = b""
+    if pending:
+        _append_log(info, name, pending)
+
+def _append_log(info: Dict, name: str, line: bytes):
+    logs = info["logs"]
+    if len(logs) == logs.maxlen:
+        info["lines_dropped"] += 1
+    logs.append({
+        "timestamp": datetime.now().isoformat(),
+        "stream": name,
+        "line": line.decode(errors="replace").rstrip("\r")
+    })
+    info["lines_total"] += 1
+
+async def _supervise(attack_id: str, info: Dict):
+    """Drain output, record the exit code and move the attack to finished_attacks"""
+    process = info["process"]
+    try:
+        await asyncio.gather(
+            _pump_output(process.stdout, info, "stdout"),
+            _pump_output(process.stderr, info, "stderr")
+        )
+        info["returncode"] = await process.wait()
+        logger.info(f"Attack {attack_id} exited with code {info['returncode']}")
+    except Exception as e:
+        logger.error(f"Supervising attack {attack_id} failed: {e}")
+    finally:
+        if info["returncode"] is None:
+            info["returncode"] = process.returncode
+        info["ended_at"] = datetime.now().isoformat()
+        active_attacks.pop(attack_id, None)
+        finished_attacks[attack_id] = info
+        while len(finished_attacks) > ATTACK_LAUNCHER_HISTORY:
+            finished_attacks.popitem(last=False)
+
+def _signal(process: asyncio.subprocess.Process, sig: int):
+    """Signal the tool's whole process group (bash scripts spawn curl etc.)"""
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        try:
+            process.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+async def _terminate(info: Dict):
+    """SIGTERM, wait for exit, SIGKILL after ATTACK_STOP_TIMEOUT"""
+    process = info["process"]
+    if process.returncode is not None:
+        return
+    
+    _signal(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), ATTACK_STOP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"PID {process.pid} ignored SIGTERM, killing")
+        _signal(process, signal.SIGKILL)
+        await process.wait()
+    
+    # Let the supervisor drain remaining output and record the exit
+    supervisor = info.get("supervisor")
+    if supervisor:
+        try:
+            await asyncio.wait_for(asyncio.shield(supervisor), ATTACK_STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Supervisor for PID {process.pid} did not finish within {ATTACK_STOP_TIMEOUT}s")
+
+def _attack_summary(attack_id: str, info: Dict) -> Dict:
+    return {
+        "attack_id": attack_id,
+        "attack_type": info["attack_type"],
+        "target_ip": info["target_ip"],
+        "duration": info["duration"],
+        "pid": info["pid"],
+        "status": "running" if info["returncode"] is None else "finished"
+    }
 
 @router.post("/launch")
 async def launch_real_attack(request: AttackLaunchRequest):
@@ -73,22 +171,30 @@ async def launch_real_attack(request: AttackLaunchRequest):
         raise HTTPException(status_code=400, detail=f"Unknown attack type: {request.attack_type}")
     
     try:
-        # Launch attack in background
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        # Launch attack in background, in its own process group
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
         )
         
         attack_id = f"{request.attack_type}_{process.pid}"
-        active_attacks[attack_id] = {
+        info = {
             "process": process,
             "attack_type": display_name,
             "target_ip": request.target_ip,
             "duration": request.duration,
-            "pid": process.pid
+            "pid": process.pid,
+            "started_at": datetime.now().isoformat(),
+            "ended_at": None,
+            "returncode": None,
+            "logs": deque(maxlen=ATTACK_LOG_LINES),
+            "lines_total": 0,
+            "lines_dropped": 0
         }
+        active_attacks[attack_id] = info
+        info["supervisor"] = asyncio.create_task(_supervise(attack_id, info))
         
         logger.info(f"Attack launched: {attack_id} (PID: {process.pid})")
         
@@ -106,35 +212,18 @@ async def launch_real_attack(request: AttackLaunchRequest):
         logger.error(f"Failed to launch attack: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to launch attack: {str(e)}")
 
+def list_active_real_attacks() -> List[Dict]:
+    """Running attack processes (exited ones are moved out by their supervisor)"""
+    return [
+        _attack_summary(attack_id, info)
+        for attack_id, info in active_attacks.items()
+        if info["returncode"] is None
+    ]
+
 @router.get("/active")
 async def get_active_real_attacks():
     """Get list of active attack processes"""
-    result = []
-    to_remove = []
-    
-    for attack_id, info in active_attacks.items():
-        process = info["process"]
-        poll = process.poll()
-        
-        if poll is None:
-            # Still running
-            result.append({
-                "attack_id": attack_id,
-                "attack_type": info["attack_type"],
-                "target_ip": info["target_ip"],
-                "duration": info["duration"],
-                "pid": info["pid"],
-                "status": "running"
-            })
-        else:
-            # Finished
-            to_remove.append(attack_id)
-    
-    # Clean up finished attacks
-    for attack_id in to_remove:
-        del active_attacks[attack_id]
-    
-    return result
+    return list_active_real_attacks()
 
 @router.post("/stop/{attack_id}")
 async def stop_real_attack(attack_id: str):
@@ -144,17 +233,10 @@ async def stop_real_attack(attack_id: str):
         raise HTTPException(status_code=404, detail="Attack not found")
     
     info = active_attacks[attack_id]
-    process = info["process"]
     
     try:
-        process.terminate()
-        await asyncio.sleep(1)
-        
-        if process.poll() is None:
-            # Still running, force kill
-            process.kill()
-        
-        del active_attacks[attack_id]
+        await _terminate(info)
+        active_attacks.pop(attack_id, None)
         
         logger.info(f"Attack stopped: {attack_id}")
         
@@ -175,21 +257,19 @@ async def stop_all_real_attacks():
     stopped = []
     errors = []
     
-    for attack_id in list(active_attacks.keys()):
-        try:
-            info = active_attacks[attack_id]
-            process = info["process"]
-            process.terminate()
-            await asyncio.sleep(0.5)
-            
-            if process.poll() is None:
-                process.kill()
-            
-            del active_attacks[attack_id]
+    # Terminate all in parallel; each waits for its own process to exit
+    attack_ids = list(active_attacks.keys())
+    results = await asyncio.gather(
+        *(_terminate(active_attacks[attack_id]) for attack_id in attack_ids),
+        return_exceptions=True
+    )
+    
+    for attack_id, result in zip(attack_ids, results):
+        if isinstance(result, Exception):
+            errors.append(f"{attack_id}: {str(result)}")
+        else:
+            active_attacks.pop(attack_id, None)
             stopped.append(attack_id)
-            
-        except Exception as e:
-            errors.append(f"{attack_id}: {str(e)}")
     
     return {
         "success": len(errors) == 0,
@@ -198,3 +278,22 @@ async def stop_all_real_attacks():
         "message": f"Stopped {len(stopped)} attacks"
     }
 
+@router.get("/{attack_id}/logs")
+async def get_attack_logs(attack_id: str, tail: int = 100):
+    """Get the last `tail` output lines of a running or recently finished attack"""
+    info = active_attacks.get(attack_id) or finished_attacks.get(attack_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Attack not found")
+    
+    logs = info["logs"]
+    tail = max(0, min(tail, len(logs)))
+    
+    return {
+        **_attack_summary(attack_id, info),
+        "started_at": info["started_at"],
+        "ended_at": info["ended_at"],
+        "returncode": info["returncode"],
+        "lines_total": info["lines_total"],
+        "lines_dropped": info["lines_dropped"],
+        "lines": list(logs)[len(logs) - tail:]
+    }
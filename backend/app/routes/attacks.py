@@ -1,25 +1,35 @@
 """Attack API routes"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import Dict, List
+import hashlib
+import json
 import logging
 
 from app.models.attack import AttackRequest, AttackResponse, AttackListItem
-from app.services.attack_orchestrator import get_attack_orchestrator
+from app.services.attack_orchestrator import get_attack_orchestrator, ATTACK_CATALOG
 from app.websocket_manager import get_websocket_manager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/attacks", tags=["attacks"])
 
+# The catalog is static, so the response body and its ETag are computed once
+CATALOG_BODY = json.dumps(
+    [AttackListItem(**attack).model_dump() for attack in ATTACK_CATALOG]
+).encode()
+CATALOG_ETAG = f'"{hashlib.sha256(CATALOG_BODY).hexdigest()[:16]}"'
+CATALOG_HEADERS = {"ETag": CATALOG_ETAG, "Cache-Control": "public, max-age=300"}
 
-@router.get("/list")
-async def list_available_attacks() -> List[AttackListItem]:
-    """Get list of available attack types"""
-    orchestrator = get_attack_orchestrator()
-    attacks = orchestrator.get_available_attacks()
+
+@router.get("/list", response_model=List[AttackListItem])
+async def list_available_attacks(request: Request) -> Response:
+    """Get list of available attack types (304 if If-None-Match matches)"""
+    if_none_match = request.headers.get("if-none-match", "")
+    if CATALOG_ETAG in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=CATALOG_HEADERS)
     
-    return [AttackListItem(**attack) for attack in attacks]
+    return Response(content=CATALOG_BODY, media_type="application/json", headers=CATALOG_HEADERS)
 
 
 @router.post("/start")
@@ -0,0 +1,44 @@
+"""Detection history API routes"""
+
+from fastapi import APIRouter, Query
+from typing import Dict, Optional
+from datetime import datetime
+import logging
+
+from app.services.detection_store import get_detection_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/detections", tags=["detections"])
+
+
+@router.get("")
+async def query_detections(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    src_ip: Optional[str] = None,
+    dst_ip: Optional[str] = None,
+    prediction: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    attacks_only: bool = False
+) -> Dict:
+    """Query stored detections, newest first, with cursor pagination"""
+    store = get_detection_store()
+    
+    return await store.query(
+        limit=limit,
+        before_id=cursor,
+        src_ip=src_ip,
+        dst_ip=dst_ip,
+        prediction=prediction,
+        start_time=start_time,
+        end_time=end_time,
+        attacks_only=attacks_only
+    )
+
+
+@router.get("/store")
+async def get_store_stats() -> Dict:
+    """Get detection store statistics"""
+    return get_detection_store().get_stats()
@@ -1,10 +1,13 @@
 """Monitoring API routes"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Dict
 import logging
 
+from app.config import PCAP_SAVE_DIR, PCAP_SNAPSHOT_BEFORE, PCAP_SNAPSHOT_AFTER
+from app.models.detection import ReplayRequest
 from app.services.detection_engine import get_detection_engine
+from app.services.capture.pcap_replay import resolve_saved_pcap
 from app.services.vm_manager import get_vm_manager
 from app.websocket_manager import get_websocket_manager
 
@@ -53,6 +56,42 @@ async def start_monitoring(vm_ip: str = None, interface: str = None) -> Dict:
     }
 
 
+@router.post("/replay")
+async def start_replay(request: ReplayRequest) -> Dict:
+    """Run detection offline over pcap/pcapng files (stops by itself when done)"""
+    detection_engine = get_detection_engine()
+    ws_manager = get_websocket_manager()
+    
+    if not request.files:
+        raise HTTPException(status_code=400, detail="No capture files given")
+    if request.speed < 0:
+        raise HTTPException(status_code=400, detail="speed must be >= 0")
+    # Only files under PCAP_SAVE_DIR can be read over the API
+    try:
+        files = [str(resolve_saved_pcap(name)) for name in request.files]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    success = await detection_engine.start_monitoring(
+        request.vm_ip,
+        pcap_files=files,
+        replay_speed=request.speed
+    )
+    
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to start replay")
+    
+    # Broadcast status
+    await ws_manager.broadcast_monitoring_status(True, "Offline replay started")
+    
+    return {
+        "success": True,
+        "message": "Offline replay started",
+        "files": detection_engine.packet_capture.get_stats()['files'],
+        "speed": request.speed
+    }
+
+
 @router.post("/stop")
 async def stop_monitoring() -> Dict:
     """Stop packet capture and detection"""
@@ -85,3 +124,35 @@ async def get_monitoring_status() -> Dict:
         "is_running": detection_engine.is_running,
         "stats": detection_engine.get_stats()
     }
+
+
+@router.get("/snapshots")
+async def list_snapshots() -> Dict:
+    """Saved pcap snapshots (replayable by name) and recorder state"""
+    recorder = get_detection_engine().pcap_recorder
+    files = [
+        {'name': path.name, 'bytes': path.stat().st_size, 'modified': path.stat().st_mtime}
+        for path in sorted(PCAP_SAVE_DIR.glob("snapshot_*.pcap"))
+    ]
+    return {
+        "enabled": recorder is not None,
+        "recorder": recorder.get_stats() if recorder else None,
+        "files": files
+    }
+
+
+@router.post("/snapshot")
+async def take_snapshot(
+    label: str = "Manual",
+    before: float = Query(PCAP_SNAPSHOT_BEFORE, ge=0),
+    after: float = Query(PCAP_SNAPSHOT_AFTER, ge=0)
+) -> Dict:
+    """Keep the recorded frames around now (written once `after` seconds have passed)"""
+    recorder = get_detection_engine().pcap_recorder
+    if recorder is None:
+        raise HTTPException(status_code=400, detail="Pcap recording is disabled (set PCAP_RING_ENABLED=true)")
+    
+    name = recorder.request_snapshot(label, before, after)
+    if name is None:
+        raise HTTPException(status_code=409, detail="Recorder is not running")
+    return {"success": True, "name": name}
@@ -0,0 +1,86 @@
+"""Attack scenario API routes"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional
+import logging
+
+from app.config import SCENARIO_DETECTION_GRACE
+from app.models.scenario import ScenarioRunRequest
+from app.services.scenario_runner import get_scenario_runner
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/scenarios", tags=["scenarios"])
+
+
+@router.get("")
+async def list_scenarios() -> List[Dict]:
+    """List saved scenarios"""
+    return get_scenario_runner().list_scenarios()
+
+
+@router.post("/run")
+async def run_scenario(request: ScenarioRunRequest) -> Dict:
+    """Run a saved (by name) or inline scenario"""
+    runner = get_scenario_runner()
+    
+    if request.scenario is not None:
+        scenario = request.scenario
+    elif request.name:
+        try:
+            scenario = runner.load_scenario(request.name)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="Give a scenario name or an inline scenario")
+    
+    try:
+        run = await runner.start(scenario, request.target_ip)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        'success': True,
+        'run_id': run['run_id'],
+        'scenario': run['scenario'],
+        'target_ip': run['target_ip'],
+        'duration': run['duration']
+    }
+
+
+@router.post("/stop")
+async def stop_scenario() -> Dict:
+    """Stop the running scenario"""
+    stopped = await get_scenario_runner().stop()
+    return {'success': stopped, 'message': "Scenario stopped" if stopped else "No scenario running"}
+
+
+@router.get("/status")
+async def get_scenario_status() -> Dict:
+    """Current or last scenario run"""
+    return get_scenario_runner().get_status()
+
+
+@router.get("/runs/{run_id}")
+async def get_scenario_run(run_id: str) -> Dict:
+    """Run record with ground-truth labels"""
+    run = get_scenario_runner().get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@router.get("/runs/{run_id}/score")
+async def score_scenario_run(
+    run_id: str,
+    grace: Optional[float] = Query(None, ge=0, description="Seconds after a phase that detections still count")
+) -> Dict:
+    """Detection recall and latency for a run, scored against stored detections"""
+    score = await get_scenario_runner().score_run(run_id, SCENARIO_DETECTION_GRACE if grace is None else grace)
+    if score is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return score
@@ -1,11 +1,13 @@
 """Statistics API routes"""
 
-from fastapi import APIRouter
-from typing import Dict
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Optional
 import logging
 
 from app.services.detection_engine import get_detection_engine
 from app.services.ids_model import get_model_service
+from app.services.metrics_timeseries import get_metrics_timeseries
+from app.services.stats_stream import build_stats_summary, get_stats_stream
 from app.websocket_manager import get_websocket_manager
 
 logger = logging.getLogger(__name__)
@@ -15,34 +17,21 @@ router = APIRouter(prefix="/api/stats", tags=["stats"])
 
 @router.get("/summary")
 async def get_stats_summary() -> Dict:
-    """Get detection statistics summary"""
-    detection_engine = get_detection_engine()
-    stats = detection_engine.get_stats()
-    capture_stats = stats.get('capture_stats', {})
-    
-    return {
-        "monitoring": {
-            "is_running": stats['is_running'],
-            "uptime_seconds": stats['uptime_seconds'],
-            "start_time": stats['start_time']
-        },
-        "detection": {
-            "total_flows": stats['total_flows'],
-            "total_detections": stats['total_detections'],
-            "benign_count": stats['benign_count'],
-            "attack_count": stats['attack_count'],
-            "detection_rate": stats['detection_rate'],
-            "active_flows": stats['active_flows']
-        },
-        "attacks": {
-            "distribution": stats['attack_distribution']
-        },
-        "packets_captured": capture_stats.get('packet_count', 0),
-        "bytes_captured": capture_stats.get('byte_count', 0),
-        "capture_duration": stats['uptime_seconds'],
-        "packets_per_second": capture_stats.get('packet_count', 0) / stats['uptime_seconds'] if stats['uptime_seconds'] > 0 else 0,
-        "capture": capture_stats
-    }
+    """Get detection statistics summary (also pushed over /ws as "stats")"""
+    return build_stats_summary()
+
+
+@router.get("/timeseries")
+async def get_timeseries(
+    resolution: str = "1s",
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Dict:
+    """Get rolled-up metrics (resolution: 1s, 1m or 1h; start/end as unix seconds)"""
+    try:
+        return get_metrics_timeseries().query(resolution, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/model")
@@ -59,7 +48,11 @@ async def get_websocket_stats() -> Dict:
     
     return {
         "active_connections": ws_manager.get_active_connection_count(),
-        "total_connections": ws_manager.connection_count
+        "total_connections": ws_manager.connection_count,
+        "slow_disconnects": ws_manager.slow_disconnects,
+        "batching": ws_manager.get_batch_stats(),
+        "stats_stream": get_stats_stream().get_stats(),
+        "clients": ws_manager.get_client_stats()
     }
 
 
@@ -138,6 +138,12 @@ async def get_vm_status() -> VMStatus:
     )
 
 
+@router.get("/cache")
+async def get_vm_cache_stats() -> Dict:
+    """Get VM state cache hit/miss statistics"""
+    return get_vm_manager().get_cache_stats()
+
+
 @router.get("/ip")
 async def get_vm_ip() -> Dict:
     """Get VM IP address"""
@@ -0,0 +1,150 @@
+"""Alert aggregator - merges repeated detections into incidents before fan-out"""
+
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.models.detection import DetectionResult
+
+logger = logging.getLogger(__name__)
+
+IncidentKey = Tuple[str, str, int, str]
+
+
+@dataclass
+class Incident:
+    """Detections sharing (src_ip, dst_ip, dst_port, prediction) within a window"""
+    incident_id: str
+    detection: DetectionResult  # Latest detection merged into the incident
+    first_seen: datetime
+    last_seen: datetime
+    count: int = 1
+    peak_confidence: float = 0.0
+    packet_count: int = 0
+    byte_count: int = 0
+    last_update: float = 0.0  # monotonic time of last merge
+    last_emit: float = 0.0  # monotonic time of last notification
+    pending: bool = False  # merged detections not yet notified
+    
+    def merge(self, detection: DetectionResult, now: float):
+        """Merge a detection into this incident"""
+        self.count += 1
+        self.last_seen = detection.timestamp
+        self.packet_count += detection.packet_count
+        self.byte_count += detection.byte_count
+        if detection.confidence >= self.peak_confidence:
+            self.peak_confidence = detection.confidence
+            self.detection = detection
+        self.last_update = now
+        self.pending = True
+    
+    def to_detection(self) -> DetectionResult:
+        """Build the detection result sent to callbacks for this incident"""
+        return self.detection.model_copy(update={
+            'timestamp': self.last_seen,
+            'confidence': self.peak_confidence,
+            'packet_count': self.packet_count,
+            'byte_count': self.byte_count,
+            'incident_id': self.incident_id,
+            'count': self.count,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen
+        })
+
+
+class AlertAggregator:
+    """
+    Deduplicates detections into incidents
+    
+    The first detection for a key is emitted immediately. Later detections
+    within the window are merged and emitted at most once per window as an
+    incident update; an incident closes once no detection arrives for a window.
+    """
+    
+    def __init__(self, window: float = 5.0, max_incidents: int = 10000):
+        self.window = window
+        self.max_incidents = max_incidents
+        self.incidents: Dict[IncidentKey, Incident] = {}
+        
+        # Statistics
+        self.detections_received = 0
+        self.notifications_emitted = 0
+        self.incidents_opened = 0
+    
+    @staticmethod
+    def _get_key(detection: DetectionResult) -> IncidentKey:
+        return (detection.src_ip, detection.dst_ip, detection.dst_port, detection.prediction)
+    
+    def add(self, detection: DetectionResult) -> Optional[DetectionResult]:
+        """
+        Add a detection
+        Returns the incident to notify now (new incidents only), else None
+        """
+        now = time.monotonic()
+        self.detections_received += 1
+        key = self._get_key(detection)
+        
+        incident = self.incidents.get(key)
+        if incident is not None:
+            incident.merge(detection, now)
+            return None
+        
+        if len(self.incidents) >= self.max_incidents:
+            self._evict_oldest()
+        
+        incident = Incident(
+            incident_id=str(uuid.uuid4()),
+            detection=detection,
+            first_seen=detection.timestamp,
+            last_seen=detection.timestamp,
+            peak_confidence=detection.confidence,
+            packet_count=detection.packet_count,
+            byte_count=detection.byte_count,
+            last_update=now,
+            last_emit=now
+        )
+        self.incidents[key] = incident
+        self.incidents_opened += 1
+        self.notifications_emitted += 1
+        return incident.to_detection()
+    
+    def _evict_oldest(self):
+        """Drop the least recently updated incident"""
+        key = min(self.incidents, key=lambda k: self.incidents[k].last_update)
+        del self.incidents[key]
+    
+    def flush(self) -> List[DetectionResult]:
+        """Return incident updates that are due and close idle incidents"""
+        now = time.monotonic()
+        due = []
+        closed = []
+        
+        for key, incident in self.incidents.items():
+            idle = now - incident.last_update >= self.window
+            if incident.pending and (idle or now - incident.last_emit >= self.window):
+                incident.pending = False
+                incident.last_emit = now
+                due.append(incident.to_detection())
+            if idle:
+                closed.append(key)
+        
+        for key in closed:
+            del self.incidents[key]
+        
+        self.notifications_emitted += len(due)
+        return due
+    
+    def get_stats(self) -> Dict:
+        """Get aggregation statistics"""
+        suppressed = self.detections_received - self.notifications_emitted
+        return {
+            'window_seconds': self.window,
+            'open_incidents': len(self.incidents),
+            'incidents_opened': self.incidents_opened,
+            'detections_received': self.detections_received,
+            'notifications_emitted': self.notifications_emitted,
+            'suppressed': max(suppressed, 0)
+        }
@@ -4,10 +4,38 @@ import logging
 from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.attack import AttackType, AttackStatus
+from app.config import ATTACK_USE_WORKER_PROCESSES, ATTACK_WORKERS
 from app.services.attacks import *
 
 logger = logging.getLogger(__name__)
 
+# Attack type to class mapping
+ATTACK_CLASSES = {
+    AttackType.DDOS_HOIC: DDosHOIC,
+    AttackType.DDOS_LOIC_UDP: DDosLOICUDP,
+    AttackType.DDOS_LOIC_HTTP: DDosLOICHTTP,
+    AttackType.DOS_GOLDENEYE: DoSGoldenEye,
+    AttackType.DOS_HULK: DoSHulk,
+    AttackType.DOS_SLOWHTTPTEST: DoSSlowHTTPTest,
+    AttackType.DOS_SLOWLORIS: DoSSlowloris,
+    AttackType.BRUTE_FORCE_WEB: BruteForceWeb,
+    AttackType.BRUTE_FORCE_XSS: BruteForceXSS,
+    AttackType.FTP_BRUTEFORCE: FTPBruteForce,
+    AttackType.SSH_BRUTEFORCE: SSHBruteForce,
+    AttackType.SQL_INJECTION: SQLInjection
+}
+
+# Available attacks, built once from class-level metadata (no instances)
+ATTACK_CATALOG: List[Dict] = [
+    {
+        'name': attack_type.value,
+        'display_name': attack_type.value,
+        'description': f'{attack_type.value} attack',
+        'default_port': attack_class.DEFAULT_PORT
+    }
+    for attack_type, attack_class in ATTACK_CLASSES.items()
+]
+
 
 class AttackOrchestrator:
     """Coordinates and manages attack execution"""
@@ -15,22 +43,7 @@ class AttackOrchestrator:
     def __init__(self):
         self.active_attacks: Dict[str, BaseAttack] = {}
         self.attack_history: List[Dict] = []
-        
-        # Attack type to class mapping
-        self.attack_classes = {
-            AttackType.DDOS_HOIC: DDosHOIC,
-            AttackType.DDOS_LOIC_UDP: DDosLOICUDP,
-            AttackType.DDOS_LOIC_HTTP: DDosLOICHTTP,
-            AttackType.DOS_GOLDENEYE: DoSGoldenEye,
-            AttackType.DOS_HULK: DoSHulk,
-            AttackType.DOS_SLOWHTTPTEST: DoSSlowHTTPTest,
-            AttackType.DOS_SLOWLORIS: DoSSlowloris,
-            AttackType.BRUTE_FORCE_WEB: BruteForceWeb,
-            AttackType.BRUTE_FORCE_XSS: BruteForceXSS,
-            AttackType.FTP_BRUTEFORCE: FTPBruteForce,
-            AttackType.SSH_BRUTEFORCE: SSHBruteForce,
-            AttackType.SQL_INJECTION: SQLInjection
-        }
+        self.attack_classes = ATTACK_CLASSES
     
     async def start_attack(
         self,
@@ -49,13 +62,24 @@ class AttackOrchestrator:
             return None
         
         try:
-            # Create attack instance
-            attack = attack_class(
-                target_ip=target_ip,
-                target_port=target_port,
-                duration=duration,
-                **kwargs
-            )
+            # Create attack instance (in worker processes unless disabled)
+            workers = kwargs.pop('workers', ATTACK_WORKERS)
+            if ATTACK_USE_WORKER_PROCESSES:
+                attack = ProcessAttack(
+                    attack_class,
+                    target_ip=target_ip,
+                    target_port=target_port,
+                    workers=workers,
+                    duration=duration,
+                    **kwargs
+                )
+            else:
+                attack = attack_class(
+                    target_ip=target_ip,
+                    target_port=target_port,
+                    duration=duration,
+                    **kwargs
+                )
             
             # Start attack
             await attack.start()
@@ -125,15 +149,7 @@ class AttackOrchestrator:
     
     def get_available_attacks(self) -> List[Dict]:
         """Get list of available attack types"""
-        return [
-            {
-                'name': attack_type.value,
-                'display_name': attack_type.value,
-                'description': f'{attack_type.value} attack',
-                'default_port': attack_class(target_ip='0.0.0.0').get_default_port()
-            }
-            for attack_type, attack_class in self.attack_classes.items()
-        ]
+        return ATTACK_CATALOG
 
 
 # Global orchestrator instance
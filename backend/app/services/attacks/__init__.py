@@ -1,6 +1,7 @@
 """Attack modules for testing IDS"""
 
 from .base_attack import BaseAttack
+from .process_attack import ProcessAttack
 from .ddos_hoic import DDosHOIC
 from .ddos_loic_udp import DDosLOICUDP
 from .ddos_loic_http import DDosLOICHTTP
@@ -16,6 +17,7 @@ from .sql_injection import SQLInjection
 
 __all__ = [
     'BaseAttack',
+    'ProcessAttack',
     'DDosHOIC',
     'DDosLOICUDP',
     'DDosLOICHTTP',
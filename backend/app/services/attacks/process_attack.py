@@ -0,0 +1,220 @@
+"""Run an attack in worker processes so traffic generation uses all cores"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import signal
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Type
+
+from app.config import (
+    ATTACK_MAX_WORKERS,
+    ATTACK_STATUS_POLL_INTERVAL,
+    ATTACK_STOP_TIMEOUT,
+    LOG_FORMAT,
+    LOG_LEVEL,
+)
+from .base_attack import BaseAttack
+
+logger = logging.getLogger(__name__)
+
+# spawn: workers must not inherit the API's event loop, capture threads or sockets
+_mp_context = multiprocessing.get_context("spawn")
+
+
+def _run_worker(
+    module_name: str,
+    class_name: str,
+    target_ip: str,
+    target_port: Optional[int],
+    parameters: Dict[str, Any],
+    counters,
+    index: int,
+    rate_target,
+    ready
+):
+    """Worker process entry point: run one copy of the attack on a private event loop"""
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    # Ctrl+C in the server's terminal reaches the whole process group; the parent stops us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    attack_class = getattr(importlib.import_module(module_name), class_name)
+    attack = attack_class(target_ip=target_ip, target_port=target_port, **parameters)
+    attack.bind_counter(counters, index)
+    ready[index] = time.time()
+    
+    async def follow_rate():
+        """Apply rate changes the parent publishes (0 = unlimited)"""
+        current = rate_target.value
+        while True:
+            await asyncio.sleep(ATTACK_STATUS_POLL_INTERVAL)
+            if rate_target.value != current:
+                current = rate_target.value
+                attack.set_requested_rate(current or None)
+    
+    async def main():
+        task = asyncio.create_task(attack._execute_attack())
+        follower = asyncio.create_task(follow_rate())
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            follower.cancel()
+    
+    asyncio.run(main())
+
+
+class ProcessAttack(BaseAttack):
+    """
+    Runs `workers` copies of an attack, each in its own process with its own
+    event loop, so floods don't block the API and scale past one core.
+    
+    Each worker writes its packets_sent into one slot of a shared-memory array;
+    the parent sums the slots, so get_status() reports live totals exactly like
+    an in-process attack. Workers receive worker_index/worker_count parameters
+    so attacks can split their work between them. The achieved rate is
+    measured from when every worker has imported the app and built its attack
+    (spawn startup takes a noticeable fraction of a short run).
+    """
+    
+    def __init__(
+        self,
+        attack_class: Type[BaseAttack],
+        target_ip: str,
+        target_port: Optional[int] = None,
+        workers: int = 1,
+        **kwargs
+    ):
+        self.attack_class = attack_class
+        self.workers = max(1, min(int(workers), ATTACK_MAX_WORKERS))
+        if self.workers < int(workers):
+            logger.warning(f"{attack_class.__name__}: {workers} workers requested, limited to ATTACK_MAX_WORKERS={ATTACK_MAX_WORKERS}")
+        self.counters = None
+        self.ready = None
+        self.ready_time: Optional[datetime] = None
+        self.rate_target = None
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        # Parent-side instance for metadata only (type name, default port, rate)
+        self.template = attack_class(target_ip=target_ip, target_port=target_port, **kwargs)
+        super().__init__(target_ip, target_port, **kwargs)
+    
+    @property
+    def packets_sent(self) -> int:
+        if self.counters is None:
+            return self._packets_sent
+        return sum(self.counters)
+    
+    @packets_sent.setter
+    def packets_sent(self, value: int):
+        self._packets_sent = value
+    
+    def get_attack_type(self) -> str:
+        return self.template.get_attack_type()
+    
+    def get_default_port(self) -> int:
+        return self.template.get_default_port()
+    
+    def get_requested_rate(self) -> Optional[float]:
+        return self.template.get_requested_rate()
+    
+    def set_requested_rate(self, rate: Optional[float]):
+        """Retarget all workers; each picks the new rate up within one poll interval"""
+        self.parameters['rate'] = rate
+        self.template.parameters['rate'] = rate
+        if self.rate_target is not None:
+            self.rate_target.value = float(rate or 0.0)
+    
+    async def _execute_attack(self):
+        """Start the worker processes and wait until they all exit"""
+        self.counters = _mp_context.Array('Q', self.workers, lock=False)
+        self.rate_target = _mp_context.Value('d', float(self.get_requested_rate() or 0.0), lock=False)
+        self.ready = _mp_context.Array('d', self.workers, lock=False)
+        self.ready_time = None
+        self.processes = []
+        
+        for index in range(self.workers):
+            parameters = dict(self.parameters, worker_index=index, worker_count=self.workers)
+            process = _mp_context.Process(
+                target=_run_worker,
+                args=(
+                    self.attack_class.__module__,
+                    self.attack_class.__name__,
+                    self.target_ip,
+                    self.target_port,
+                    parameters,
+                    self.counters,
+                    index,
+                    self.rate_target,
+                    self.ready
+                ),
+                name=f"attack-{self.attack_id[:8]}-{index}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        
+        logger.info(f"{self.get_attack_type()}: Running in {self.workers} worker process(es)")
+        
+        try:
+            # Done when every worker has exited; one failing worker stops the rest
+            while True:
+                if self.ready_time is None and all(self.ready):
+                    self.ready_time = datetime.fromtimestamp(max(self.ready))
+                    logger.info(f"{self.get_attack_type()}: Workers ready after {self.get_startup_seconds()}s")
+                exitcodes = [process.exitcode for process in self.processes]
+                failed = [code for code in exitcodes if code]
+                if failed or None not in exitcodes:
+                    break
+                await asyncio.sleep(ATTACK_STATUS_POLL_INTERVAL)
+        finally:
+            await self._terminate_workers()
+        
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {self.workers} worker(s) failed (exit codes {failed})")
+    
+    def get_startup_seconds(self) -> Optional[float]:
+        """Seconds from start() until every worker was ready to send"""
+        if not self.start_time or not self.ready_time:
+            return None
+        return round((self.ready_time - self.start_time).total_seconds(), 3)
+    
+    def get_achieved_rate(self) -> Optional[float]:
+        """Average packets/requests per second since all workers were ready"""
+        if not self.ready_time:
+            return None
+        elapsed = ((self.end_time or datetime.now()) - self.ready_time).total_seconds()
+        return round(self.packets_sent / elapsed, 1) if elapsed > 0 else 0.0
+    
+    async def _terminate_workers(self):
+        """SIGTERM live workers, then SIGKILL any still running after ATTACK_STOP_TIMEOUT"""
+        alive = [p for p in self.processes if p.is_alive()]
+        if not alive:
+            return
+        
+        for process in alive:
+            process.terminate()
+        
+        deadline = asyncio.get_running_loop().time() + ATTACK_STOP_TIMEOUT
+        while any(p.is_alive() for p in alive):
+            if asyncio.get_running_loop().time() >= deadline:
+                for process in alive:
+                    if process.is_alive():
+                        logger.warning(f"{process.name} ignored SIGTERM, killing")
+                        process.kill()
+                break
+            await asyncio.sleep(0.05)
+        
+        for process in alive:
+            process.join(timeout=0.1)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get attack status (same fields as in-process attacks, plus worker counts)"""
+        status = super().get_status()
+        status['workers'] = self.workers
+        status['workers_alive'] = sum(1 for p in self.processes if p.is_alive())
+        status['startup_seconds'] = self.get_startup_seconds()
+        return status
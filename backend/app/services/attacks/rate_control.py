@@ -0,0 +1,228 @@
+"""Rate limiting for traffic generators"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Sustained bucket holds this many seconds of tokens, so short stalls are caught up
+RATE_CATCHUP_SECONDS = 1.0
+# ...but catch-up bursts are capped by a peak bucket at this multiple of the target
+RATE_PEAK_FACTOR = 2.0
+RATE_PEAK_BURST_SECONDS = 0.01
+
+# Closed-loop correction: measured every window, PI gains on the relative error
+RATE_CONTROL_WINDOW = 1.0
+RATE_CONTROL_KP = 0.3
+RATE_CONTROL_KI = 0.1
+RATE_CORRECTION_MIN = 0.5
+RATE_CORRECTION_MAX = 2.0
+
+RATE_METER_HISTORY = 60  # per-interval samples kept for jitter
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `capacity`.
+    
+    Callers take whole tokens (one per packet/request) and may take fewer than
+    asked for, so batch senders can send exactly what the budget allows. With a
+    parent, tokens must come from both buckets (hierarchical limiting).
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None, parent: Optional['TokenBucket'] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        # Default burst: ~10ms worth of tokens, at least one
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate / 100)
+        self.parent = parent
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def set_rate(self, rate: float):
+        """Change the fill rate (tokens accrued so far are kept)"""
+        self._refill(time.monotonic())
+        self.rate = float(rate)
+    
+    def take(self, count: int) -> int:
+        """Take up to count tokens; returns how many were granted"""
+        self._refill(time.monotonic())
+        granted = min(count, int(self.tokens))
+        if self.parent is not None and granted:
+            granted = self.parent.take(granted)
+        self.tokens -= granted
+        return granted
+    
+    def give_back(self, count: int):
+        """Return tokens that were taken but not used (e.g. a short send)"""
+        self.tokens = min(self.capacity, self.tokens + count)
+        if self.parent is not None:
+            self.parent.give_back(count)
+    
+    def delay(self, count: int = 1) -> float:
+        """Seconds until count tokens will be available"""
+        self._refill(time.monotonic())
+        missing = min(count, self.capacity) - self.tokens
+        own = max(0.0, missing / self.rate)
+        if self.parent is not None:
+            return max(own, self.parent.delay(count))
+        return own
+
+
+class RateController:
+    """
+    Paces an attack at `rate` units (packets, requests, attempts) per second.
+    
+    Two buckets in series: a sustained bucket at the target rate that banks up
+    to RATE_CATCHUP_SECONDS of tokens, and a peak bucket that caps how fast that
+    bank is spent. Once per window the issued rate is compared with the target
+    and both bucket rates are scaled by a PI correction, so timer overshoot and
+    rounding don't turn into a steady error. rate=None means unlimited (still
+    counted).
+    """
+    
+    def __init__(self, rate: Optional[float]):
+        self.target = float(rate) if rate else None
+        self.issued = 0
+        self.correction = 1.0
+        self._integral = 0.0
+        self._window_start: Optional[float] = None  # set on first use
+        self._window_issued = 0
+        self._lock = asyncio.Lock()
+        
+        self.peak: Optional[TokenBucket] = None
+        self.sustained: Optional[TokenBucket] = None
+        if self.target:
+            self._build_buckets()
+    
+    def _build_buckets(self):
+        self.peak = TokenBucket(
+            self.target * RATE_PEAK_FACTOR,
+            capacity=max(1.0, self.target * RATE_PEAK_FACTOR * RATE_PEAK_BURST_SECONDS)
+        )
+        self.sustained = TokenBucket(
+            self.target,
+            capacity=max(1.0, self.target * RATE_CATCHUP_SECONDS),
+            parent=self.peak
+        )
+        # Start empty: no initial burst above the target
+        self.sustained.tokens = 0.0
+    
+    def set_target(self, rate: Optional[float]):
+        """Change the target rate while running (e.g. scenario ramps); None = unlimited"""
+        self.target = float(rate) if rate else None
+        self.correction = 1.0
+        self._integral = 0.0
+        self._window_start = None
+        self._window_issued = 0
+        if not self.target:
+            self.peak = self.sustained = None
+        elif self.sustained is None:
+            self._build_buckets()
+        else:
+            self.sustained.capacity = max(1.0, self.target * RATE_CATCHUP_SECONDS)
+            self.sustained.tokens = min(self.sustained.tokens, self.sustained.capacity)
+            self.sustained.set_rate(self.target)
+            self.peak.capacity = max(1.0, self.target * RATE_PEAK_FACTOR * RATE_PEAK_BURST_SECONDS)
+            self.peak.tokens = min(self.peak.tokens, self.peak.capacity)
+            self.peak.set_rate(self.target * RATE_PEAK_FACTOR)
+    
+    @property
+    def limited(self) -> bool:
+        return self.sustained is not None
+    
+    def take(self, count: int) -> int:
+        """Take up to count units without waiting; returns how many were granted"""
+        granted = self.sustained.take(count) if self.limited else count
+        self._account(granted)
+        return granted
+    
+    def give_back(self, count: int):
+        """Return units taken but not used"""
+        self.issued -= count
+        self._window_issued -= count
+        if self.limited:
+            self.sustained.give_back(count)
+    
+    def delay(self, count: int = 1) -> float:
+        """Seconds until count units are available"""
+        return self.sustained.delay(count) if self.limited else 0.0
+    
+    def max_take(self, count: int) -> int:
+        """Cap count at what the buckets can ever grant in one take"""
+        if not self.limited:
+            return count
+        return max(1, min(count, int(self.sustained.capacity), int(self.peak.capacity)))
+    
+    async def acquire(self, count: int = 1):
+        """Wait until count units may be sent (callers are served in order)"""
+        if not self.limited:
+            self._account(count)
+            return
+        
+        async with self._lock:
+            needed = count
+            while True:
+                needed -= self.take(needed)
+                if needed <= 0:
+                    return
+                await asyncio.sleep(self.delay(needed))
+    
+    def _account(self, count: int):
+        self.issued += count
+        self._window_issued += count
+        
+        now = time.monotonic()
+        if self._window_start is None:
+            self._window_start = now
+        elapsed = now - self._window_start
+        if elapsed < RATE_CONTROL_WINDOW:
+            return
+        
+        if self.limited:
+            achieved = self._window_issued / elapsed
+            error = (self.target - achieved) / self.target
+            self._integral = max(-1.0, min(1.0, self._integral + error))
+            self.correction = max(
+                RATE_CORRECTION_MIN,
+                min(RATE_CORRECTION_MAX, 1.0 + RATE_CONTROL_KP * error + RATE_CONTROL_KI * self._integral)
+            )
+            self.sustained.set_rate(self.target * self.correction)
+            self.peak.set_rate(self.target * self.correction * RATE_PEAK_FACTOR)
+        
+        self._window_start = now
+        self._window_issued = 0
+    
+    def get_stats(self) -> Dict:
+        return {
+            'target': self.target,
+            'issued': self.issued,
+            'correction': round(self.correction, 3)
+        }
+
+
+class RateMeter:
+    """Samples a running total at intervals to measure rate stability (jitter)"""
+    
+    def __init__(self, history: int = RATE_METER_HISTORY):
+        self.rates = deque(maxlen=history)
+        self._last: Optional[tuple] = None
+    
+    def sample(self, total: int, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            last_total, last_time = self._last
+            if now > last_time:
+                self.rates.append((total - last_total) / (now - last_time))
+        self._last = (total, now)
+    
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the per-interval rate"""
+        return statistics.pstdev(self.rates) if len(self.rates) >= 2 else 0.0
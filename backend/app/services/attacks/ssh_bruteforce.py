@@ -1,69 +1,64 @@
 """SSH Brute Force attack implementation"""
 
-import asyncio
 import logging
 from .base_attack import BaseAttack
+from .brute_force import BruteForceEngine, StreamSession, credential_stream, resolve_wordlist
 
 logger = logging.getLogger(__name__)
 
+CLIENT_IDENT = b"SSH-2.0-OpenSSH_8.9p1\r\n"
+
+
+class SSHSession(StreamSession):
+    """
+    Simulated SSH login: identification exchange only, one attempt per
+    connection. Real password auth needs the SSH transport (key exchange),
+    which would need paramiko or asyncssh; the connect/banner burst is what
+    the IDS sees from SSH brute-forcing either way.
+    """
+    
+    max_attempts = 1
+    
+    async def attempt(self, username: str, password: str):
+        # Read banner, answer with ours
+        banner = await self.readline()
+        if not banner.startswith(b"SSH-"):
+            raise ConnectionError(f"not an SSH server: {banner[:40]!r}")
+        self.writer.write(CLIENT_IDENT)
+        await self.writer.drain()
+        return None
+
 
 class SSHBruteForce(BaseAttack):
     """SSH brute force attack"""
     
+    DEFAULT_PORT = 22
+    INTENSITY_RATES = {'low': 2, 'medium': 10, 'high': 50}
+    DEFAULT_USERNAMES = "ssh_usernames.txt"
+    DEFAULT_PASSWORDS = "ssh_passwords.txt"
+    
     def get_attack_type(self) -> str:
         return "SSH-Bruteforce"
     
-    def get_default_port(self) -> int:
-        return 22
-    
-    async def _try_login(self, username, password):
-        """Attempt SSH login"""
-        port = self.target_port or self.get_default_port()
-        
-        # Simulated SSH connection attempt
-        # In production, would use paramiko or asyncssh
-        try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(self.target_ip, port),
-                timeout=5
-            )
-            
-            # Read banner
-            await asyncio.wait_for(reader.read(1024), timeout=2)
-            
-            self.packets_sent += 1
-            
-            writer.close()
-            await writer.wait_closed()
-            
-        except Exception as e:
-            logger.debug(f"Login attempt failed: {username}:{password} - {e}")
-    
     async def _execute_attack(self):
         """Execute SSH brute force"""
-        duration = self.parameters.get('duration', 300)
-        
-        # Common usernames and passwords
-        usernames = ['root', 'admin', 'user', 'test', 'ubuntu', 'guest']
-        passwords = ['password', '123456', 'admin', 'root', '12345678', 'test']
-        
-        logger.info(f"SSH-BruteForce: Starting attack on {self.target_ip}:22")
+        port = self.target_port or self.get_default_port()
+        duration = self.parameters.get('duration') or 300
         
-        start_time = asyncio.get_event_loop().time()
+        logger.info(f"SSH-BruteForce: Starting attack on {self.target_ip}:{port}")
         
-        while (asyncio.get_event_loop().time() - start_time) < duration:
-            tasks = []
-            for username in usernames:
-                for password in passwords:
-                    task = self._try_login(username, password)
-                    tasks.append(task)
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            if self.packets_sent % 100 == 0:
-                logger.info(f"SSH-BruteForce: {self.packets_sent} attempts")
-            
-            await asyncio.sleep(1)
+        engine = BruteForceEngine(
+            credential_stream(
+                resolve_wordlist(self.parameters.get('usernames_file', self.DEFAULT_USERNAMES)),
+                resolve_wordlist(self.parameters.get('passwords_file', self.DEFAULT_PASSWORDS)),
+                worker_index=self.parameters.get('worker_index', 0),
+                worker_count=self.parameters.get('worker_count', 1)
+            ),
+            lambda: SSHSession(self.target_ip, port),
+            self.rate,
+            self.record_sent,
+            concurrency=self.parameters.get('concurrency', 10)
+        )
+        await engine.run(duration)
         
-        logger.info(f"SSH-BruteForce: Attack complete. Total attempts: {self.packets_sent}")
-
+        logger.info(f"SSH-BruteForce: Attack complete. Total attempts: {self.packets_sent} ({engine.get_stats()})")
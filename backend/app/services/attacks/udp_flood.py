@@ -0,0 +1,186 @@
+"""Batched UDP sender (sendmmsg on Linux, one send() per datagram elsewhere)"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import platform
+import random
+import socket
+import struct
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Linux caps a single sendmmsg call at UIO_MAXIOV messages
+MAX_BATCH = 1024
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_sendmmsg():
+    if platform.system() != 'Linux':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+# Errors that mean "nothing sent this time", not "give up"
+_TRANSIENT_ERRORS = {errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS, errno.EINTR}
+
+
+def sendmmsg_available() -> bool:
+    return _sendmmsg is not None
+
+
+def _pack_sockaddr(family: int, address: tuple) -> bytes:
+    """struct sockaddr_in / sockaddr_in6 for a resolved (host, port[, flowinfo, scope_id])"""
+    if family == socket.AF_INET6:
+        host, port, flowinfo, scope_id = address
+        return (struct.pack("=H", family) + struct.pack("!HI", port, flowinfo)
+                + socket.inet_pton(family, host) + struct.pack("=I", scope_id))
+    host, port = address
+    return struct.pack("=H", family) + struct.pack("!H", port) + socket.inet_pton(family, host) + bytes(8)
+
+
+class UDPBatchSender:
+    """
+    Sends batches of pre-built datagrams to one target from several
+    non-blocking sockets (one source port each).
+    
+    The payloads and the mmsghdr array pointing at them are built once, so a
+    batch costs a single syscall and no per-packet Python work. The sockets
+    are unconnected and every message carries the target address: connected
+    UDP sockets get ICMP port-unreachable back as ECONNREFUSED, which cuts
+    sendmmsg batches short when nothing listens on the target port.
+    """
+    
+    def __init__(
+        self,
+        target_ip: str,
+        target_port: int,
+        payload_size: int = 1024,
+        batch_size: int = 64,
+        num_sockets: int = 4,
+        num_payloads: int = 16
+    ):
+        self.batch_size = max(1, min(batch_size, MAX_BATCH))
+        self.use_sendmmsg = sendmmsg_available()
+        self.payloads = [random.randbytes(payload_size) for _ in range(max(1, num_payloads))]
+        
+        family = socket.AF_INET6 if ':' in target_ip else socket.AF_INET
+        self.address = socket.getaddrinfo(target_ip, target_port, family, socket.SOCK_DGRAM)[0][4]
+        self.sockets: List[socket.socket] = []
+        for _ in range(max(1, num_sockets)):
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            self.sockets.append(sock)
+        self._next_socket = 0
+        
+        self.syscalls = 0
+        self.would_block = 0
+        self.refused = 0
+        self.errors = 0
+        
+        if self.use_sendmmsg:
+            sockaddr = _pack_sockaddr(family, self.address)
+            self._sockaddr = ctypes.create_string_buffer(sockaddr, len(sockaddr))
+            self._buffers = [ctypes.create_string_buffer(p, len(p)) for p in self.payloads]
+            self._iovecs = (_IOVec * self.batch_size)()
+            self._msgs = (_MMsgHdr * self.batch_size)()
+            for i in range(self.batch_size):
+                buffer = self._buffers[i % len(self._buffers)]
+                self._iovecs[i].iov_base = ctypes.cast(buffer, ctypes.c_void_p)
+                self._iovecs[i].iov_len = len(buffer)
+                self._msgs[i].msg_hdr.msg_name = ctypes.cast(self._sockaddr, ctypes.c_void_p)
+                self._msgs[i].msg_hdr.msg_namelen = len(sockaddr)
+                self._msgs[i].msg_hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+                self._msgs[i].msg_hdr.msg_iovlen = 1
+    
+    def _pick_socket(self) -> socket.socket:
+        sock = self.sockets[self._next_socket]
+        self._next_socket = (self._next_socket + 1) % len(self.sockets)
+        return sock
+    
+    def send(self, count: Optional[int] = None) -> int:
+        """Send up to count datagrams (default: a full batch); returns how many went out"""
+        count = self.batch_size if count is None else max(0, min(count, self.batch_size))
+        if count == 0:
+            return 0
+        sock = self._pick_socket()
+        
+        if self.use_sendmmsg:
+            self.syscalls += 1
+            sent = _sendmmsg(sock.fileno(), self._msgs, count, socket.MSG_DONTWAIT)
+            if sent >= 0:
+                return sent
+            self._record_error(ctypes.get_errno())
+            return 0
+        
+        sent = 0
+        for i in range(count):
+            self.syscalls += 1
+            try:
+                sock.sendto(self.payloads[i % len(self.payloads)], self.address)
+                sent += 1
+            except OSError as e:
+                self._record_error(e.errno)
+                break
+        return sent
+    
+    def _record_error(self, err: int):
+        if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS):
+            self.would_block += 1
+        elif err == errno.ECONNREFUSED:
+            self.refused += 1  # ICMP port unreachable (not expected on unconnected sockets)
+        elif err in _TRANSIENT_ERRORS:
+            pass
+        else:
+            self.errors += 1
+            if self.errors == 1:
+                logger.warning(f"UDP send failed: {errno.errorcode.get(err, err)}")
+    
+    async def wait_writable(self, timeout: float = 0.01):
+        """Wait until the next socket can take more data (or timeout)"""
+        loop = asyncio.get_running_loop()
+        sock = self.sockets[self._next_socket]
+        ready = loop.create_future()
+        loop.add_writer(sock.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_writer(sock.fileno())
+    
+    def close(self):
+        for sock in self.sockets:
+            sock.close()
+        self.sockets = []
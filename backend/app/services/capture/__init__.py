@@ -1,8 +1,11 @@
 """Packet capture module"""
 
 from .packet_capture import PacketCapture
+from .clock import PacketClock
 from .flow_aggregator import FlowAggregator
 from .interface_manager import InterfaceManager
+from .cardinality import HyperLogLog, CardinalityMonitor
+from .pcap_recorder import PcapRecorder
 
-__all__ = ['PacketCapture', 'FlowAggregator', 'InterfaceManager']
+__all__ = ['PacketCapture', 'PacketClock', 'FlowAggregator', 'InterfaceManager', 'HyperLogLog', 'CardinalityMonitor', 'PcapRecorder']
 
@@ -0,0 +1,376 @@
+"""HyperLogLog cardinality estimators for scan and spoofing detection"""
+
+import math
+import time
+import logging
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+from dataclasses import dataclass
+
+from .clock import PacketClock, packet_time
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer - spreads Python hashes (ints hash to themselves) over 64 bits"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class HyperLogLog:
+    """
+    Fixed-memory distinct count estimator (2^precision one-byte registers)
+    
+    The harmonic sum and zero-register count are kept up to date as
+    registers grow, so count() is O(1).
+    """
+    
+    def __init__(self, precision: int = 10):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self._value_bits = 64 - precision
+        self._value_mask = (1 << self._value_bits) - 1
+        
+        m = self.num_registers
+        if m == 16:
+            self._alpha = 0.673
+        elif m == 32:
+            self._alpha = 0.697
+        elif m == 64:
+            self._alpha = 0.709
+        else:
+            self._alpha = 0.7213 / (1 + 1.079 / m)
+        self.clear()
+    
+    def _position(self, item: Hashable) -> Tuple[int, int]:
+        """Register index and rank for an item"""
+        h = _mix64(hash(item) & _MASK64)
+        return h >> self._value_bits, self._value_bits - (h & self._value_mask).bit_length() + 1
+    
+    def _update(self, index: int, rank: int) -> bool:
+        """Raise a register to rank, returns True if it changed"""
+        old = self.registers[index]
+        if rank <= old:
+            return False
+        self.registers[index] = rank
+        self._sum += 2.0 ** -rank - 2.0 ** -old
+        if old == 0:
+            self._zeros -= 1
+        return True
+    
+    def add(self, item: Hashable) -> bool:
+        """Add an item, returns True if a register changed"""
+        return self._update(*self._position(item))
+    
+    def merge(self, other: "HyperLogLog"):
+        """Merge another estimator of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self._sum = math.fsum(2.0 ** -r for r in self.registers)
+        self._zeros = self.registers.count(0)
+    
+    def copy_from(self, other: "HyperLogLog"):
+        """Become a copy of another estimator of the same precision"""
+        self.registers[:] = other.registers
+        self._sum = other._sum
+        self._zeros = other._zeros
+    
+    def count(self) -> int:
+        """Estimate number of distinct items added"""
+        return _estimate(self.num_registers, self._sum, self._zeros, self._alpha)
+    
+    def clear(self):
+        """Reset all registers"""
+        self.registers = bytearray(self.num_registers)
+        self._sum = float(self.num_registers)
+        self._zeros = self.num_registers
+
+
+def _estimate(m: int, total: float, zeros: int, alpha: float) -> int:
+    """HyperLogLog estimate with small-range (linear counting) correction"""
+    estimate = alpha * m * m / total
+    
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+    
+    return int(round(estimate))
+
+
+class WindowedHyperLogLog:
+    """
+    HyperLogLog with windowed decay
+    
+    Keeps a current and a previous window; the estimate covers the union of
+    both, so items older than two windows are forgotten. The union is kept
+    as its own estimator (updated on add, copied from the current window on
+    rotation), so counting never merges registers.
+    """
+    
+    def __init__(self, precision: int = 10, window: float = 10.0, now: Optional[float] = None):
+        self.window = window
+        self.current = HyperLogLog(precision)
+        self.previous = HyperLogLog(precision)
+        self.union = HyperLogLog(precision)
+        self.window_start = now if now is not None else time.time()
+        self.last_update = self.window_start
+    
+    def _rotate(self, now: float):
+        """Advance windows up to the given time"""
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+        
+        if elapsed >= 2 * self.window:
+            # Both windows expired
+            self.previous.clear()
+            self.union.clear()
+        else:
+            self.previous, self.current = self.current, self.previous
+            self.union.copy_from(self.previous)
+        self.current.clear()
+        self.window_start = now - (elapsed % self.window)
+    
+    def add(self, item: Hashable, now: Optional[float] = None) -> bool:
+        """Add an item, returns True if the estimate may have changed"""
+        now = now if now is not None else time.time()
+        self._rotate(now)
+        self.last_update = now
+        index, rank = self.current._position(item)
+        self.current._update(index, rank)
+        return self.union._update(index, rank)
+    
+    def count(self, now: Optional[float] = None) -> int:
+        """Estimate distinct items seen in the last one to two windows"""
+        now = now if now is not None else time.time()
+        self._rotate(now)
+        return self.union.count()
+    
+    def is_expired(self, now: float) -> bool:
+        """Check if nothing was added for two full windows"""
+        return now - self.last_update >= 2 * self.window
+
+
+class CardinalityTracker:
+    """Per-key windowed distinct-count estimators with a bounded key set"""
+    
+    def __init__(self, precision: int = 10, window: float = 10.0, max_keys: int = 10000):
+        self.precision = precision
+        self.window = window
+        self.max_keys = max_keys
+        self.estimators: Dict[Hashable, WindowedHyperLogLog] = {}
+        self.dirty_keys = set()
+        self.evicted_keys = 0
+        self._lock = threading.Lock()
+    
+    def add(self, key: Hashable, item: Hashable, now: Optional[float] = None):
+        """Record item under key"""
+        now = now if now is not None else time.time()
+        
+        with self._lock:
+            estimator = self.estimators.get(key)
+            if estimator is None:
+                if len(self.estimators) >= self.max_keys:
+                    self._evict(now)
+                estimator = WindowedHyperLogLog(self.precision, self.window, now)
+                self.estimators[key] = estimator
+            
+            if estimator.add(item, now):
+                self.dirty_keys.add(key)
+    
+    def _evict(self, now: float):
+        """Drop expired keys, or the least recently updated half if none expired"""
+        to_remove = [k for k, e in self.estimators.items() if e.is_expired(now)]
+        if not to_remove:
+            by_age = sorted(self.estimators.items(), key=lambda x: x[1].last_update)
+            to_remove = [k for k, _ in by_age[:max(1, len(by_age) // 2)]]
+        
+        for key in to_remove:
+            del self.estimators[key]
+            self.dirty_keys.discard(key)
+        self.evicted_keys += len(to_remove)
+    
+    def count(self, key: Hashable, now: Optional[float] = None) -> int:
+        """Estimate distinct items for key"""
+        with self._lock:
+            estimator = self.estimators.get(key)
+            return estimator.count(now) if estimator else 0
+    
+    def get_changed_counts(self, now: Optional[float] = None) -> List[Tuple[Hashable, int]]:
+        """Return (key, estimate) for keys whose estimate may have changed since last call"""
+        now = now if now is not None else time.time()
+        
+        with self._lock:
+            keys = self.dirty_keys
+            self.dirty_keys = set()
+            return [
+                (key, self.estimators[key].count(now))
+                for key in keys
+                if key in self.estimators
+            ]
+    
+    def cleanup(self, now: Optional[float] = None):
+        """Drop keys that have fully decayed"""
+        now = now if now is not None else time.time()
+        
+        with self._lock:
+            expired = [k for k, e in self.estimators.items() if e.is_expired(now)]
+            for key in expired:
+                del self.estimators[key]
+                self.dirty_keys.discard(key)
+    
+    def get_key_count(self) -> int:
+        """Get number of tracked keys"""
+        return len(self.estimators)
+    
+    def clear(self):
+        """Drop all keys"""
+        with self._lock:
+            self.estimators.clear()
+            self.dirty_keys = set()
+
+
+@dataclass
+class CardinalityIndicator:
+    """A scan or spoofing indicator raised by the cardinality monitor"""
+    kind: str  # "Port Scan" or "Spoofed Source Flood"
+    src_ip: str
+    dst_ip: str
+    dst_port: int
+    protocol: str
+    distinct_count: int
+    threshold: int
+    timestamp: float
+
+
+class CardinalityMonitor:
+    """
+    Tracks distinct destination ports per source (port scans) and distinct
+    sources per destination ip:port (spoofed-source floods)
+    """
+    
+    def __init__(
+        self,
+        precision: int = 10,
+        window: float = 10.0,
+        max_keys: int = 10000,
+        port_scan_threshold: int = 100,
+        spoof_source_threshold: int = 500,
+        clock: Optional[PacketClock] = None
+    ):
+        # Windows run on capture time, shared with the flow aggregator when given
+        self.clock = clock or PacketClock()
+        self.port_scan_threshold = port_scan_threshold
+        self.spoof_source_threshold = spoof_source_threshold
+        self.window = window
+        
+        # src_ip -> distinct dst ports
+        self.ports_per_src = CardinalityTracker(precision, window, max_keys)
+        # (dst_ip, dst_port, protocol) -> distinct src ips
+        self.srcs_per_dst = CardinalityTracker(precision, window, max_keys)
+        
+        # Last destination seen per scanning source (for reporting)
+        self._last_dst: Dict[str, str] = {}
+        # Keys already alerted, with alert time (one alert per window)
+        self._alerted: Dict[Hashable, float] = {}
+        self.indicator_count = 0
+    
+    def add_packet(self, packet_info: Dict):
+        """Feed a packet (as extracted by PacketCapture)"""
+        protocol = packet_info.get('protocol')
+        if protocol not in ('TCP', 'UDP'):
+            return
+        
+        now = self.clock.observe(packet_time(packet_info))
+        src_ip = packet_info.get('src_ip', '')
+        dst_ip = packet_info.get('dst_ip', '')
+        dst_port = packet_info.get('dst_port', 0)
+        
+        # Only count connection attempts for TCP: SYN without ACK
+        flags = packet_info.get('flags', {})
+        if protocol == 'TCP' and not (flags.get('S') and not flags.get('A')):
+            return
+        
+        self.ports_per_src.add(src_ip, dst_port, now)
+        self._last_dst[src_ip] = dst_ip
+        self.srcs_per_dst.add((dst_ip, dst_port, protocol), src_ip, now)
+    
+    def _should_alert(self, key: Hashable, now: float) -> bool:
+        """Rate-limit alerts to one per key per window"""
+        last = self._alerted.get(key)
+        if last is not None and now - last < self.window:
+            return False
+        self._alerted[key] = now
+        return True
+    
+    def get_indicators(self) -> List[CardinalityIndicator]:
+        """Evaluate changed estimators and return new scan/spoofing indicators"""
+        now = self.clock.now()
+        indicators = []
+        
+        for src_ip, count in self.ports_per_src.get_changed_counts(now):
+            if count >= self.port_scan_threshold and self._should_alert(('scan', src_ip), now):
+                indicators.append(CardinalityIndicator(
+                    kind="Port Scan",
+                    src_ip=src_ip,
+                    dst_ip=self._last_dst.get(src_ip, ''),
+                    dst_port=0,
+                    protocol='TCP/UDP',
+                    distinct_count=count,
+                    threshold=self.port_scan_threshold,
+                    timestamp=now
+                ))
+        
+        for (dst_ip, dst_port, protocol), count in self.srcs_per_dst.get_changed_counts(now):
+            key = ('spoof', dst_ip, dst_port, protocol)
+            if count >= self.spoof_source_threshold and self._should_alert(key, now):
+                indicators.append(CardinalityIndicator(
+                    kind="Spoofed Source Flood",
+                    src_ip='*',
+                    dst_ip=dst_ip,
+                    dst_port=dst_port,
+                    protocol=protocol,
+                    distinct_count=count,
+                    threshold=self.spoof_source_threshold,
+                    timestamp=now
+                ))
+        
+        self.indicator_count += len(indicators)
+        return indicators
+    
+    def cleanup(self):
+        """Drop decayed estimators and stale alert state"""
+        now = self.clock.now()
+        self.ports_per_src.cleanup(now)
+        self.srcs_per_dst.cleanup(now)
+        
+        self._alerted = {k: t for k, t in self._alerted.items() if now - t < self.window}
+        self._last_dst = {
+            k: v for k, v in list(self._last_dst.items()) if k in self.ports_per_src.estimators
+        }
+    
+    def reset(self):
+        """Forget all estimators and alert state (new capture or replay)"""
+        self.ports_per_src.clear()
+        self.srcs_per_dst.clear()
+        self._last_dst = {}
+        self._alerted = {}
+    
+    def get_stats(self) -> Dict:
+        """Get monitor statistics"""
+        return {
+            'tracked_sources': self.ports_per_src.get_key_count(),
+            'tracked_destinations': self.srcs_per_dst.get_key_count(),
+            'evicted_keys': self.ports_per_src.evicted_keys + self.srcs_per_dst.evicted_keys,
+            'indicators_raised': self.indicator_count,
+            'port_scan_threshold': self.port_scan_threshold,
+            'spoof_source_threshold': self.spoof_source_threshold,
+            'window_seconds': self.window
+        }
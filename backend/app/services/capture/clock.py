@@ -0,0 +1,54 @@
+"""Packet-driven clock for flow accounting"""
+
+import time
+import threading
+from typing import Optional
+
+
+class PacketClock:
+    """
+    Capture time, driven by packet timestamps
+    
+    now() is the newest packet timestamp observed, advanced between packets
+    by wall-clock time x rate so idle flows still time out: rate=1.0 for
+    live capture, the replay speed for paced replays and 0 for full-speed
+    replays (time only moves with packets). It never goes backwards, so
+    reordered packets can't rewind timeouts. Before the first packet it
+    reads the wall clock.
+    """
+    
+    def __init__(self, rate: float = 1.0):
+        self._lock = threading.Lock()
+        self.reset(rate)
+    
+    def reset(self, rate: float = 1.0):
+        """Start over (new capture or replay)"""
+        with self._lock:
+            self.rate = rate
+            self._time: Optional[float] = None
+            self._observed_at = 0.0
+    
+    def _now(self) -> float:
+        if self._time is None:
+            return time.time()
+        if not self.rate:
+            return self._time
+        return self._time + (time.monotonic() - self._observed_at) * self.rate
+    
+    def observe(self, timestamp: float) -> float:
+        """Advance to a packet's capture timestamp; returns the clock's time"""
+        with self._lock:
+            current = self._now() if self._time is not None else timestamp
+            self._time = max(current, timestamp)
+            self._observed_at = time.monotonic()
+            return self._time
+    
+    def now(self) -> float:
+        """Current capture time"""
+        with self._lock:
+            return self._now()
+
+
+def packet_time(packet_info: dict) -> float:
+    """Capture timestamp of an extracted packet (wall clock if it has none)"""
+    return float(packet_info.get('timestamp') or 0) or time.time()
@@ -1,12 +1,13 @@
 """Flow aggregator - groups packets into network flows"""
 
-import time
 import logging
 from typing import Dict, Optional, Tuple, List
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from .clock import PacketClock, packet_time
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,8 +58,9 @@ class Flow:
     completed: bool = False
     
     def add_packet(self, packet_info: Dict, is_forward: bool):
-        """Add a packet to this flow"""
-        current_time = time.time()
+        """Add a packet to this flow (timed by its capture timestamp)"""
+        # Reordered packets count at the latest time seen (no negative IATs)
+        current_time = max(packet_time(packet_info), self.last_seen)
         
         if self.start_time == 0:
             self.start_time = current_time
@@ -116,16 +118,22 @@ class Flow:
 
 
 class FlowAggregator:
-    """Aggregates packets into flows"""
+    """
+    Aggregates packets into flows
+    
+    All timeouts run on a PacketClock (capture time), so they behave the same
+    for live capture and replays, and don't stretch when processing lags.
+    """
     
-    def __init__(self, flow_timeout: int = 60, max_flows: int = 10000):
+    def __init__(self, flow_timeout: int = 60, max_flows: int = 10000, clock: Optional[PacketClock] = None):
         self.flow_timeout = flow_timeout
         self.max_flows = max_flows
+        self.clock = clock or PacketClock()
         self.flows: Dict[str, Flow] = {}
         self.completed_flows: List[Flow] = []
         self.flow_count = 0
         self._cleanup_interval = 0.5  # Cleanup every 0.5 seconds (VERY aggressive)
-        self._last_cleanup_time = time.time()
+        self._last_cleanup_time: Optional[float] = None
         
     def _get_flow_key(self, packet_info: Dict) -> Tuple[str, bool]:
         """
@@ -153,9 +161,9 @@ class FlowAggregator:
         Add packet to flow aggregator
         Returns completed flow if any
         """
-        # Periodically cleanup old flows
-        current_time = time.time()
-        if current_time - self._last_cleanup_time > self._cleanup_interval:
+        # Periodically cleanup old flows (a clock reset restarts the interval)
+        current_time = self.clock.observe(packet_time(packet_info))
+        if self._last_cleanup_time is None or abs(current_time - self._last_cleanup_time) > self._cleanup_interval:
             self._cleanup_old_flows()
             self._last_cleanup_time = current_time
         
@@ -203,7 +211,6 @@ class FlowAggregator:
             return completed
         
         # Also complete flows that have enough packets for analysis (helps with attack detection)
-        current_time = time.time()
         if flow.total_packets >= 10 and current_time - flow.start_time >= 0.5:  # 10 packets and 0.5 seconds old
             flow.finalize()
             completed = self.flows.pop(flow_id)
@@ -223,7 +230,7 @@ class FlowAggregator:
     
     def _cleanup_old_flows(self, force: bool = False):
         """Remove old flows that have timed out"""
-        current_time = time.time()
+        current_time = self.clock.now()
         
         to_remove = []
         if force:
@@ -262,6 +269,13 @@ class FlowAggregator:
         
         return flows
     
+    def flush(self):
+        """Complete every active flow (end of a capture or replay)"""
+        for flow in self.flows.values():
+            flow.finalize()
+            self.completed_flows.append(flow)
+        self.flows.clear()
+    
     def get_active_flow_count(self) -> int:
         """Get number of active flows"""
         return len(self.flows)
@@ -274,4 +288,5 @@ class FlowAggregator:
         """Clear all flows"""
         self.flows.clear()
         self.completed_flows.clear()
+        self._last_cleanup_time = None
 
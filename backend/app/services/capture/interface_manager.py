@@ -1,11 +1,14 @@
 """Network interface management for packet capture"""
 
-import subprocess
+import asyncio
 import logging
 import os
 import platform
 import socket
-from typing import Optional, List
+from typing import Callable, Dict, Optional, List
+
+from app.config import INTERFACE_COMMAND_TIMEOUT
+from .netlink import InterfaceEvent, NetlinkMonitor, route_get, is_available as netlink_available
 
 logger = logging.getLogger(__name__)
 
@@ -13,57 +16,170 @@ logger = logging.getLogger(__name__)
 IS_MACOS = platform.system() == 'Darwin'
 IS_LINUX = platform.system() == 'Linux'
 
+SYS_CLASS_NET = "/sys/class/net"
+
+
+async def _run_command(*cmd: str, timeout: float = INTERFACE_COMMAND_TIMEOUT) -> Optional[str]:
+    """Run a command without blocking the event loop; stdout on success, else None"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        logger.debug(f"Command not found: {cmd[0]}")
+        return None
+    
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+        return None
+    
+    if process.returncode != 0:
+        return None
+    return stdout.decode(errors='replace')
+
+
+def _parse_ifconfig_names(output: str) -> List[str]:
+    """Interface names from macOS ifconfig output"""
+    interfaces = []
+    for line in output.split('\n'):
+        if line and not line.startswith(' ') and not line.startswith('\t'):
+            iface = line.split(':')[0].strip()
+            if iface:
+                interfaces.append(iface)
+    return interfaces
+
+
+def _parse_ip_link_names(output: str) -> List[str]:
+    """Interface names from `ip link show` output"""
+    interfaces = []
+    for line in output.split('\n'):
+        if ':' in line and not line.startswith(' '):
+            parts = line.split(':')
+            if len(parts) >= 2:
+                interfaces.append(parts[1].strip().split('@')[0])
+    return interfaces
+
+
+def _parse_route_interface(output: str) -> Optional[str]:
+    """Interface from `route -n get` (macOS) or `ip route get` (Linux) output"""
+    for line in output.split('\n'):
+        if 'interface:' in line.lower():
+            parts = line.split(':')
+            if len(parts) >= 2:
+                return parts[1].strip()
+        parts = line.split()
+        for i, part in enumerate(parts):
+            if part == 'dev' and i + 1 < len(parts):
+                return parts[i + 1]
+    return None
+
 
 class InterfaceManager:
-    """Manages network interface discovery and permissions"""
+    """
+    Manages network interface discovery and permissions (all lookups are async)
+    
+    On Linux, interfaces come from /sys/class/net and routes from rtnetlink, so
+    no processes are spawned. While watching, results are cached and the cache
+    is invalidated by kernel link/route change events, which are also passed on
+    to listeners (e.g. to rebind capture when the Multipass bridge comes back).
+    """
     
     def __init__(self):
         self.interface = None
         self.vm_ip = None
+        self.use_netlink = IS_LINUX and netlink_available()
+        self.monitor: Optional[NetlinkMonitor] = None
+        self.change_listeners: List[Callable[[InterfaceEvent], None]] = []
+        
+        # Caches (only used while watching, so they can't go stale)
+        self._interfaces_cache: Optional[List[str]] = None
+        self._route_cache: Dict[str, Optional[str]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @property
+    def is_watching(self) -> bool:
+        return self.monitor is not None
+    
+    def add_change_listener(self, listener: Callable[[InterfaceEvent], None]):
+        """Register a callback for link/route changes (while watching)"""
+        self.change_listeners.append(listener)
+    
+    def start_watching(self) -> bool:
+        """Subscribe to kernel link/route changes (Linux only); True if watching"""
+        if self.monitor is not None:
+            return True
+        if not self.use_netlink:
+            return False
+        
+        monitor = NetlinkMonitor()
+        monitor.add_listener(self._on_change)
+        try:
+            monitor.start()
+        except OSError as e:
+            logger.warning(f"Cannot watch interface changes: {e}")
+            return False
+        self.monitor = monitor
+        return True
+    
+    def stop_watching(self):
+        """Stop watching and drop cached results"""
+        if self.monitor is not None:
+            self.monitor.stop()
+            self.monitor = None
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        self._interfaces_cache = None
+        self._route_cache.clear()
+    
+    def _on_change(self, event: InterfaceEvent):
+        self.invalidate_cache()
+        logger.debug(f"Interface change: {event}")
+        for listener in self.change_listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Interface change listener failed: {e}")
+    
+    async def list_interfaces(self) -> List[str]:
+        """List all available network interfaces"""
+        try:
+            if IS_LINUX and os.path.isdir(SYS_CLASS_NET):
+                # Plain directory read - no subprocess needed
+                if self._interfaces_cache is not None:
+                    self.cache_hits += 1
+                    return list(self._interfaces_cache)
+                self.cache_misses += 1
+                interfaces = sorted(os.listdir(SYS_CLASS_NET))
+                if self.is_watching:
+                    self._interfaces_cache = interfaces
+                return list(interfaces)
+            
+            if IS_MACOS:
+                output = await _run_command("ifconfig")
+                return _parse_ifconfig_names(output) if output else []
+            
+            output = await _run_command("ip", "-o", "link", "show")
+            return _parse_ip_link_names(output) if output else []
+        
+        except Exception as e:
+            logger.error(f"Error listing interfaces: {e}")
+            return []
     
-    def detect_multipass_interface(self) -> Optional[str]:
+    async def detect_multipass_interface(self) -> Optional[str]:
         """Auto-detect Multipass bridge interface"""
         try:
             # Common multipass interfaces
             candidate_interfaces = ["multipass0", "mpqemubr0", "br-multipass"]
             
-            # Get all network interfaces
-            if IS_MACOS:
-                # Use ifconfig on macOS
-                result = subprocess.run(
-                    ["ifconfig"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                available_interfaces = []
-                current_iface = None
-                for line in result.stdout.split('\n'):
-                    if line and not line.startswith(' ') and not line.startswith('\t'):
-                        # New interface line
-                        parts = line.split(':')
-                        if len(parts) > 0:
-                            current_iface = parts[0].strip()
-                            if current_iface:
-                                available_interfaces.append(current_iface)
-            else:
-                # Use ip command on Linux
-                result = subprocess.run(
-                    ["ip", "link", "show"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                available_interfaces = []
-                for line in result.stdout.split('\n'):
-                    if ':' in line and not line.startswith(' '):
-                        parts = line.split(':')
-                        if len(parts) >= 2:
-                            iface = parts[1].strip()
-                            available_interfaces.append(iface)
-            
+            available_interfaces = await self.list_interfaces()
             logger.info(f"Available interfaces: {available_interfaces}")
             
             # Check for multipass interfaces
@@ -86,57 +202,45 @@ class InterfaceManager:
             
             logger.warning("No Multipass interface found, using default")
             return None
-            
+        
         except Exception as e:
             logger.error(f"Error detecting interface: {e}")
             return None
     
-    def get_interface_for_vm(self, vm_ip: str) -> Optional[str]:
+    async def get_interface_for_vm(self, vm_ip: str) -> Optional[str]:
         """Get network interface that routes to VM IP"""
+        if vm_ip in self._route_cache:
+            self.cache_hits += 1
+            return self._route_cache[vm_ip]
+        self.cache_misses += 1
+        
+        if self.use_netlink:
+            try:
+                interface = route_get(vm_ip)
+                if interface:
+                    logger.info(f"Found interface for {vm_ip}: {interface} (netlink)")
+                if self.is_watching:
+                    self._route_cache[vm_ip] = interface
+                return interface
+            except (OSError, ValueError) as e:
+                logger.debug(f"Netlink route lookup failed, falling back to ip route: {e}")
+        
         try:
             if IS_MACOS:
-                # On macOS, use route command
-                result = subprocess.run(
-                    ["route", "-n", "get", vm_ip],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                # Parse output: "interface: en0"
-                for line in result.stdout.split('\n'):
-                    if 'interface:' in line.lower():
-                        parts = line.split(':')
-                        if len(parts) >= 2:
-                            interface = parts[1].strip()
-                            logger.info(f"Found interface for {vm_ip}: {interface}")
-                            return interface
+                output = await _run_command("route", "-n", "get", vm_ip)
             else:
-                # Use ip route on Linux
-                result = subprocess.run(
-                    ["ip", "route", "get", vm_ip],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                # Parse output: "... dev eth0 ..."
-                for line in result.stdout.split('\n'):
-                    if 'dev' in line:
-                        parts = line.split()
-                        for i, part in enumerate(parts):
-                            if part == 'dev' and i + 1 < len(parts):
-                                interface = parts[i + 1]
-                                logger.info(f"Found interface for {vm_ip}: {interface}")
-                                return interface
-            
-            return None
+                output = await _run_command("ip", "route", "get", vm_ip)
             
+            interface = _parse_route_interface(output) if output else None
+            if interface:
+                logger.info(f"Found interface for {vm_ip}: {interface}")
+            return interface
+        
         except Exception as e:
             logger.error(f"Error finding interface for VM: {e}")
             return None
     
-    def check_capture_permissions(self) -> bool:
+    async def check_capture_permissions(self) -> bool:
         """Check if we have permissions for packet capture"""
         try:
             # Check if running as root
@@ -157,28 +261,20 @@ class InterfaceManager:
                     return False
             else:
                 # On Linux, check for CAP_NET_RAW capability
-                try:
-                    result = subprocess.run(
-                        ["getcap", "/usr/bin/python3"],
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    if "cap_net_raw" in result.stdout:
-                        logger.info("Python has CAP_NET_RAW, capture permissions OK")
-                        return True
-                except FileNotFoundError:
-                    pass
+                output = await _run_command("getcap", "/usr/bin/python3")
+                if output and "cap_net_raw" in output:
+                    logger.info("Python has CAP_NET_RAW, capture permissions OK")
+                    return True
                 
                 logger.warning("No capture permissions detected")
                 logger.info("Hint: Run with sudo or: sudo setcap cap_net_raw+eip /usr/bin/python3")
                 return False
-            
+        
         except Exception as e:
             logger.error(f"Error checking permissions: {e}")
             return False
     
-    def get_interface(self, vm_ip: Optional[str] = None, interface_name: Optional[str] = None) -> Optional[str]:
+    async def get_interface(self, vm_ip: Optional[str] = None, interface_name: Optional[str] = None) -> Optional[str]:
         """Get the network interface to use for capture"""
         
         # If explicit interface provided, use it
@@ -189,14 +285,14 @@ class InterfaceManager:
         
         # If VM IP provided, find interface that routes to it
         if vm_ip:
-            iface = self.get_interface_for_vm(vm_ip)
+            iface = await self.get_interface_for_vm(vm_ip)
             if iface:
                 self.interface = iface
                 self.vm_ip = vm_ip
                 return iface
         
         # Auto-detect multipass interface
-        iface = self.detect_multipass_interface()
+        iface = await self.detect_multipass_interface()
         if iface:
             self.interface = iface
             return iface
@@ -204,89 +300,37 @@ class InterfaceManager:
         # Fallback: try to get default interface
         if IS_MACOS:
             # On macOS, try to get default route interface
-            try:
-                result = subprocess.run(
-                    ["route", "-n", "get", "default"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                for line in result.stdout.split('\n'):
-                    if 'interface:' in line.lower():
-                        parts = line.split(':')
-                        if len(parts) >= 2:
-                            default_iface = parts[1].strip()
-                            logger.info(f"Using default route interface: {default_iface}")
-                            self.interface = default_iface
-                            return default_iface
-            except Exception as e:
-                logger.debug(f"Could not get default interface: {e}")
-        
-        # Last resort: try common interface names
-        common_interfaces = ["en0", "eth0", "wlan0", "en1"]
-        for iface in common_interfaces:
-            try:
-                # Try to get interface address to verify it exists
-                if IS_MACOS:
-                    result = subprocess.run(
-                        ["ifconfig", iface],
-                        capture_output=True,
-                        text=True
-                    )
-                    if result.returncode == 0:
-                        logger.info(f"Found interface: {iface}")
-                        self.interface = iface
-                        return iface
-            except Exception:
-                continue
-        
-        # Final fallback - but warn that "any" doesn't work on macOS
-        if IS_MACOS:
+            output = await _run_command("route", "-n", "get", "default")
+            default_iface = _parse_route_interface(output) if output else None
+            if default_iface:
+                logger.info(f"Using default route interface: {default_iface}")
+                self.interface = default_iface
+                return default_iface
+            
+            # Last resort: try common interface names
+            available_interfaces = await self.list_interfaces()
+            for iface in ["en0", "eth0", "wlan0", "en1"]:
+                if iface in available_interfaces:
+                    logger.info(f"Found interface: {iface}")
+                    self.interface = iface
+                    return iface
+            
+            # "any" doesn't work on macOS
             logger.error("Could not find suitable network interface. Please specify one manually.")
             logger.error("On macOS, you cannot use 'any' interface. Try: en0, en1, or the Multipass bridge interface.")
             return None
-        else:
-            logger.warning("Using fallback interface: any")
-            return "any"
+        
+        logger.warning("Using fallback interface: any")
+        return "any"
     
-    def list_interfaces(self) -> List[str]:
-        """List all available network interfaces"""
-        try:
-            if IS_MACOS:
-                result = subprocess.run(
-                    ["ifconfig"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                interfaces = []
-                for line in result.stdout.split('\n'):
-                    if line and not line.startswith(' ') and not line.startswith('\t'):
-                        parts = line.split(':')
-                        if len(parts) > 0:
-                            iface = parts[0].strip()
-                            if iface:
-                                interfaces.append(iface)
-            else:
-                result = subprocess.run(
-                    ["ip", "-o", "link", "show"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                interfaces = []
-                for line in result.stdout.split('\n'):
-                    if line.strip():
-                        parts = line.split(':')
-                        if len(parts) >= 2:
-                            iface = parts[1].strip()
-                            interfaces.append(iface)
-            
-            return interfaces
-            
-        except Exception as e:
-            logger.error(f"Error listing interfaces: {e}")
-            return []
-
+    def get_stats(self) -> Dict:
+        """Get interface resolution statistics"""
+        return {
+            'interface': self.interface,
+            'vm_ip': self.vm_ip,
+            'netlink': self.use_netlink,
+            'watching': self.is_watching,
+            'change_events': self.monitor.events_received if self.monitor else 0,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses
+        }
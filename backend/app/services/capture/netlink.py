@@ -0,0 +1,216 @@
+"""Minimal rtnetlink client (Linux) - route lookups and link/route change events"""
+
+import socket
+import struct
+import asyncio
+import logging
+import ipaddress
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NETLINK_ROUTE = 0
+
+# Message types
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+
+NLM_F_REQUEST = 0x01
+
+# Multicast groups
+RTMGRP_LINK = 0x01
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_ROUTE = 0x400
+
+# Attributes
+IFLA_IFNAME = 3
+RTA_DST = 1
+RTA_OIF = 4
+
+IFF_UP = 0x1
+IFF_LOWER_UP = 0x10000
+
+NLMSGHDR = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+RTMSG = struct.Struct("=BBBBBBBBI")  # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+IFINFOMSG = struct.Struct("=BxHiII")  # family, type, index, flags, change
+RTATTR = struct.Struct("=HH")  # len, type
+
+_seq = itertools.count(1)
+
+
+def is_available() -> bool:
+    """True if rtnetlink sockets can be opened here"""
+    if not hasattr(socket, 'AF_NETLINK'):
+        return False
+    try:
+        socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE).close()
+        return True
+    except OSError:
+        return False
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _pack_attr(attr_type: int, value: bytes) -> bytes:
+    length = RTATTR.size + len(value)
+    return RTATTR.pack(length, attr_type) + value + b"\0" * (_align(length) - length)
+
+
+def _parse_attrs(data: bytes, offset: int) -> Dict[int, bytes]:
+    attrs = {}
+    while offset + RTATTR.size <= len(data):
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[attr_type] = data[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def _parse_messages(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Yield (type, body) for each netlink message in a datagram"""
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        yield msg_type, data[offset + NLMSGHDR.size:offset + length]
+        offset += _align(length)
+
+
+def _index_to_name(index: int) -> Optional[str]:
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return None
+
+
+def route_get(ip: str, timeout: float = 1.0) -> Optional[str]:
+    """Output interface the kernel would use to reach ip (RTM_GETROUTE, like `ip route get`)"""
+    address = ipaddress.ip_address(ip)
+    family = socket.AF_INET if address.version == 4 else socket.AF_INET6
+    payload = RTMSG.pack(family, address.max_prefixlen, 0, 0, 0, 0, 0, 0, 0)
+    payload += _pack_attr(RTA_DST, address.packed)
+    request = NLMSGHDR.pack(NLMSGHDR.size + len(payload), RTM_GETROUTE, NLM_F_REQUEST, next(_seq), 0) + payload
+    
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+        sock.settimeout(timeout)
+        sock.bind((0, 0))
+        sock.send(request)
+        data = sock.recv(65536)
+    
+    for msg_type, body in _parse_messages(data):
+        if msg_type == NLMSG_ERROR:
+            (error,) = struct.unpack_from("=i", body)
+            if error:
+                logger.debug(f"Netlink route lookup for {ip} failed: errno {-error}")
+                return None
+        elif msg_type == RTM_NEWROUTE:
+            attrs = _parse_attrs(body, RTMSG.size)
+            if RTA_OIF in attrs:
+                (index,) = struct.unpack("=I", attrs[RTA_OIF][:4])
+                return _index_to_name(index)
+    return None
+
+
+@dataclass
+class InterfaceEvent:
+    """A link or route change reported by the kernel"""
+    kind: str  # "link" or "route"
+    action: str  # "new" or "del"
+    interface: Optional[str]
+    is_up: Optional[bool] = None  # links only: administratively up with carrier
+
+
+class NetlinkMonitor:
+    """Subscribes to rtnetlink link/route groups and reports changes on the event loop"""
+    
+    def __init__(self):
+        self.sock: Optional[socket.socket] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.listeners: List[Callable[[InterfaceEvent], None]] = []
+        self.events_received = 0
+    
+    def add_listener(self, listener: Callable[[InterfaceEvent], None]):
+        """Register a callback invoked (on the loop) for every change event"""
+        self.listeners.append(listener)
+    
+    def start(self):
+        """Open the multicast socket and watch it from the running event loop"""
+        if self.sock is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.setblocking(False)
+        self.sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE))
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
+        logger.info("Watching link/route changes via netlink")
+    
+    def stop(self):
+        """Stop watching"""
+        if self.sock is None:
+            return
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+        self.sock = None
+    
+    def _on_readable(self):
+        while self.sock is not None:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                # ENOBUFS: kernel dropped events - listeners should resync
+                logger.warning(f"Netlink receive error: {e}")
+                self._notify(InterfaceEvent(kind="link", action="new", interface=None))
+                return
+            
+            for msg_type, body in _parse_messages(data):
+                event = self._parse_event(msg_type, body)
+                if event is not None:
+                    self._notify(event)
+    
+    def _parse_event(self, msg_type: int, body: bytes) -> Optional[InterfaceEvent]:
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            _, _, index, flags, _ = IFINFOMSG.unpack_from(body, 0)
+            attrs = _parse_attrs(body, IFINFOMSG.size)
+            name = attrs.get(IFLA_IFNAME, b"").rstrip(b"\0").decode() or _index_to_name(index)
+            is_up = msg_type == RTM_NEWLINK and bool(flags & IFF_UP) and bool(flags & IFF_LOWER_UP)
+            return InterfaceEvent(
+                kind="link",
+                action="new" if msg_type == RTM_NEWLINK else "del",
+                interface=name,
+                is_up=is_up
+            )
+        
+        if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+            attrs = _parse_attrs(body, RTMSG.size)
+            name = None
+            if RTA_OIF in attrs:
+                (index,) = struct.unpack("=I", attrs[RTA_OIF][:4])
+                name = _index_to_name(index)
+            return InterfaceEvent(
+                kind="route",
+                action="new" if msg_type == RTM_NEWROUTE else "del",
+                interface=name
+            )
+        
+        return None
+    
+    def _notify(self, event: InterfaceEvent):
+        self.events_received += 1
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Interface change listener failed: {e}")
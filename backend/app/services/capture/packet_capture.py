@@ -7,6 +7,9 @@ from scapy.all import sniff, IP, TCP, UDP, ICMP
 from scapy.packet import Packet
 import threading
 
+from .cardinality import CardinalityMonitor
+from .pcap_recorder import PcapRecorder
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,10 +21,14 @@ class PacketCapture:
         interface: str = "any",
         packet_callback: Optional[Callable] = None,
         vm_ip: Optional[str] = None,
-        buffer_size: int = 1000
+        buffer_size: int = 1000,
+        cardinality_monitor: Optional[CardinalityMonitor] = None,
+        recorder: Optional[PcapRecorder] = None
     ):
         self.interface = interface
         self.packet_callback = packet_callback
+        self.cardinality_monitor = cardinality_monitor
+        self.recorder = recorder
         self.vm_ip = vm_ip
         self.buffer_size = buffer_size
         self.is_capturing = False
@@ -29,6 +36,11 @@ class PacketCapture:
         self.packet_count = 0
         self.byte_count = 0
         
+        # Readiness: set by the capture thread once sniffing started (or failed)
+        self.ready = threading.Event()
+        self._ready_async: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
     def _extract_packet_info(self, packet: Packet) -> Optional[Dict]:
         """Extract relevant information from packet"""
         try:
@@ -45,7 +57,7 @@ class PacketCapture:
                 'dst_port': 0,
                 'length': len(packet),
                 'flags': {},
-                'timestamp': packet.time if hasattr(packet, 'time') else 0
+                'timestamp': float(packet.time) if hasattr(packet, 'time') else 0
             }
             
             # TCP
@@ -99,6 +111,10 @@ class PacketCapture:
     def _packet_handler(self, packet: Packet):
         """Handle captured packet"""
         try:
+            # Raw frames go to the ring recorder before any filtering
+            if self.recorder:
+                self.recorder.record(packet)
+            
             packet_info = self._extract_packet_info(packet)
             
             if packet_info and self._should_capture_packet(packet_info):
@@ -109,6 +125,10 @@ class PacketCapture:
                 if self.packet_count == 1:
                     logger.info(f"✓ First packet captured: {packet_info['src_ip']} → {packet_info['dst_ip']}")
                 
+                # Feed distinct-count estimators
+                if self.cardinality_monitor:
+                    self.cardinality_monitor.add_packet(packet_info)
+                
                 # Call callback if provided
                 if self.packet_callback:
                     self.packet_callback(packet_info)
@@ -149,7 +169,8 @@ class PacketCapture:
                     prn=self._packet_handler,
                     store=False,
                     filter=bpf_filter,
-                    stop_filter=lambda x: not self.is_capturing
+                    stop_filter=lambda x: not self.is_capturing,
+                    started_callback=self._signal_ready
                 )
             except OSError as e:
                 if "BIOCSETIF" in str(e) or "Operation not permitted" in str(e):
@@ -193,9 +214,20 @@ class PacketCapture:
             import traceback
             logger.error(traceback.format_exc())
             self.is_capturing = False
+        finally:
+            # Wake waiters if sniffing never started
+            self._signal_ready()
+    
+    def _signal_ready(self):
+        """Mark startup finished (called from the capture thread)"""
+        if self.ready.is_set():
+            return
+        self.ready.set()
+        if self._loop is not None and self._ready_async is not None:
+            self._loop.call_soon_threadsafe(self._ready_async.set)
     
     def start(self):
-        """Start packet capture"""
+        """Start packet capture (returns immediately; see wait_until_ready)"""
         if self.is_capturing:
             logger.warning("Capture already running")
             return
@@ -203,6 +235,13 @@ class PacketCapture:
         self.is_capturing = True
         self.packet_count = 0
         self.byte_count = 0
+        self.ready.clear()
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._ready_async = asyncio.Event()
+        except RuntimeError:
+            self._loop = None
+            self._ready_async = None
         
         # Start capture in separate thread
         self.capture_thread = threading.Thread(
@@ -211,26 +250,32 @@ class PacketCapture:
         )
         self.capture_thread.start()
         
-        # Give it a moment to start and check for immediate errors
-        import time
-        time.sleep(0.5)
-        
-        if not self.is_capturing:
-            logger.error("Packet capture failed to start - check permissions")
-            return
-        
-        logger.info("Packet capture started")
-        
         # Log a reminder after a few seconds if no packets captured
         def check_capture():
-            time.sleep(5)
             if self.is_capturing and self.packet_count == 0:
                 logger.warning("No packets captured yet. This may indicate:")
                 logger.warning("  1. No traffic on the interface")
                 logger.warning("  2. Permission issues (run with sudo on macOS)")
                 logger.warning("  3. Interface not receiving traffic")
         
-        threading.Thread(target=check_capture, daemon=True).start()
+        reminder = threading.Timer(5, check_capture)
+        reminder.daemon = True
+        reminder.start()
+    
+    async def wait_until_ready(self, timeout: float) -> bool:
+        """Wait (without blocking the loop) for the sniffer to start; True if capturing"""
+        if self._ready_async is not None:
+            try:
+                await asyncio.wait_for(self._ready_async.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Packet capture not ready after {timeout}s, continuing")
+        
+        if not self.is_capturing:
+            logger.error("Packet capture failed to start - check permissions")
+            return False
+        
+        logger.info("Packet capture started")
+        return True
     
     def stop(self):
         """Stop packet capture"""
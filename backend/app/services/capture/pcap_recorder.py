@@ -0,0 +1,378 @@
+"""Rotating pcap ring-buffer recorder with snapshots around detections"""
+
+import re
+import struct
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from scapy.config import conf
+from scapy.packet import Packet
+
+from app.config import (
+    PCAP_SAVE_DIR,
+    PCAP_RING_DIR,
+    PCAP_RING_FILES,
+    PCAP_RING_FILE_SIZE,
+    PCAP_RING_FILE_SECONDS,
+    PCAP_RING_QUEUE_SIZE,
+    PCAP_RING_FLUSH_INTERVAL,
+    PCAP_SNAPSHOT_BEFORE,
+    PCAP_SNAPSHOT_AFTER,
+    PCAP_SNAPSHOT_MAX_SECONDS,
+    PCAP_SNAPSHOT_HISTORY
+)
+from .clock import PacketClock
+
+logger = logging.getLogger(__name__)
+
+# Classic pcap (microsecond timestamps, native little-endian as written here)
+_PCAP_HEADER = struct.Struct("<IHHiIII")
+_RECORD_HEADER = struct.Struct("<IIII")
+_PCAP_MAGIC = 0xA1B2C3D4
+_SNAPLEN = 262144
+_DLT_EN10MB = 1
+_FILE_BUFFER = 1024 * 1024
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _open_pcap(path: Path, linktype: int) -> BinaryIO:
+    handle = open(path, "wb", buffering=_FILE_BUFFER)
+    handle.write(_PCAP_HEADER.pack(_PCAP_MAGIC, 2, 4, 0, 0, _SNAPLEN, linktype))
+    return handle
+
+
+def _write_record(handle: BinaryIO, ts: float, frame: bytes) -> int:
+    sec = int(ts)
+    usec = int(round((ts - sec) * 1_000_000))
+    if usec >= 1_000_000:
+        sec, usec = sec + 1, usec - 1_000_000
+    handle.write(_RECORD_HEADER.pack(sec, usec, len(frame), len(frame)))
+    handle.write(frame)
+    return _RECORD_HEADER.size + len(frame)
+
+
+def _read_records(path: Path):
+    """(timestamp, frame) for each record of a pcap written by this module"""
+    with open(path, "rb", buffering=_FILE_BUFFER) as handle:
+        handle.seek(_PCAP_HEADER.size)
+        while True:
+            header = handle.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            sec, usec, caplen, _ = _RECORD_HEADER.unpack(header)
+            frame = handle.read(caplen)
+            if len(frame) < caplen:
+                return
+            yield sec + usec / 1_000_000, frame
+
+
+@dataclass
+class _Segment:
+    """One ring file"""
+    path: Path
+    linktype: int
+    first_ts: float
+    last_ts: float
+    size: int = _PCAP_HEADER.size
+    packets: int = 0
+    handle: Optional[BinaryIO] = None
+
+
+class PcapRecorder:
+    """
+    Records every captured frame into a ring of pcap files and cuts snapshots
+    
+    The capture thread only appends (timestamp, frame) to a bounded deque;
+    a writer thread drains it every PCAP_RING_FLUSH_INTERVAL through buffered
+    files, rotating on size or capture-time age and deleting the oldest file
+    beyond PCAP_RING_FILES. A snapshot request covers [before, after] seconds
+    around the current capture time: on its next pass the writer opens a
+    permanent file in PCAP_SAVE_DIR, copies the "before" frames the ring still
+    holds and then appends matching frames as they are drained, closing it
+    once the capture clock passes the end (or on stop). Rotation can't lose
+    frames a snapshot waits for, and the file can be replayed by name.
+    """
+    
+    def __init__(
+        self,
+        clock: Optional[PacketClock] = None,
+        ring_dir: Path = PCAP_RING_DIR,
+        snapshot_dir: Path = PCAP_SAVE_DIR,
+        max_files: int = PCAP_RING_FILES,
+        file_size: int = PCAP_RING_FILE_SIZE,
+        file_seconds: float = PCAP_RING_FILE_SECONDS,
+        queue_size: int = PCAP_RING_QUEUE_SIZE
+    ):
+        self.clock = clock or PacketClock()
+        self.ring_dir = Path(ring_dir)
+        self.snapshot_dir = Path(snapshot_dir)
+        self.max_files = max(2, max_files)
+        self.file_size = file_size
+        self.file_seconds = file_seconds
+        self.queue_size = queue_size
+        
+        # Hot path state: deque appends/pops are atomic, so no lock here
+        self._pending: deque = deque()
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        
+        self.segments: deque = deque()
+        self._segment_seq = 0
+        self._linktypes: Dict[type, int] = {}
+        
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_queue: List[Dict] = []  # requested, not yet closed
+        self._active: List[Tuple[Dict, BinaryIO, int]] = []  # open snapshot files (writer thread only)
+        self._snapshot_seq = 0
+        self.snapshots: deque = deque(maxlen=PCAP_SNAPSHOT_HISTORY)
+        
+        self.is_recording = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def record(self, packet: Packet):
+        """Queue a captured frame (called from the capture thread; no I/O)"""
+        if not self.is_recording:
+            return
+        if len(self._pending) >= self.queue_size:
+            self.frames_dropped += 1
+            return
+        self._pending.append((float(packet.time), packet.original or bytes(packet), type(packet)))
+    
+    def start(self):
+        """Start a fresh ring (files from a previous capture are removed)"""
+        if self.is_recording:
+            return
+        self.ring_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.ring_dir.glob("ring_*.pcap"):
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"Cannot remove old ring file {path.name}: {e}")
+        
+        self._pending.clear()
+        self.segments.clear()
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self._stop.clear()
+        self.is_recording = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Pcap ring recorder started ({self.max_files} x "
+                    f"{self.file_size // (1024 * 1024)} MB / {self.file_seconds}s in {self.ring_dir})")
+    
+    def stop(self):
+        """Write what is queued, cut pending snapshots and close the ring (blocking)"""
+        if not self.is_recording:
+            return
+        self.is_recording = False
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        logger.info(f"Pcap ring recorder stopped: {self.frames_recorded} frames, "
+                    f"{self.frames_dropped} dropped")
+    
+    def request_snapshot(
+        self,
+        label: str,
+        before: float = PCAP_SNAPSHOT_BEFORE,
+        after: float = PCAP_SNAPSHOT_AFTER,
+        details: Optional[Dict] = None
+    ) -> Optional[str]:
+        """
+        Keep the frames around the current capture time; returns the snapshot
+        file name (an open snapshot whose window overlaps is extended instead)
+        """
+        if not self.is_recording:
+            return None
+        now = self.clock.now()
+        start, end = now - before, now + after
+        
+        with self._snapshot_lock:
+            for snapshot in self._snapshot_queue:
+                if snapshot['label'] == label and start <= snapshot['end'] \
+                        and end - snapshot['start'] <= PCAP_SNAPSHOT_MAX_SECONDS:
+                    snapshot['end'] = max(snapshot['end'], end)
+                    snapshot['triggers'] += 1
+                    return snapshot['name']
+            
+            self._snapshot_seq += 1
+            stamp = datetime.fromtimestamp(now).strftime("%Y%m%d-%H%M%S")
+            name = f"snapshot_{stamp}_{_UNSAFE_CHARS.sub('_', label).strip('_')}_{self._snapshot_seq}.pcap"
+            snapshot = {
+                'name': name,
+                'label': label,
+                'start': start,
+                'end': end,
+                'triggers': 1,
+                'status': 'pending',
+                'packets': 0,
+                'bytes': 0,
+                'truncated': False,
+                'details': details or {}
+            }
+            self._snapshot_queue.append(snapshot)
+            self.snapshots.append(snapshot)
+        logger.info(f"Pcap snapshot requested: {name} ({before:.0f}s before, {after:.0f}s after)")
+        return name
+    
+    def _writer_loop(self):
+        """Drain queued frames into the ring and snapshots (writer thread)"""
+        try:
+            while not self._stop.wait(PCAP_RING_FLUSH_INTERVAL):
+                # New snapshots copy the ring before this pass can rotate it away
+                self._open_snapshots()
+                self._drain()
+                self._close_snapshots(final=False)
+            self._open_snapshots()
+            self._drain()
+            self._close_snapshots(final=True)
+        except Exception as e:
+            logger.error(f"Pcap recorder error: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            self.is_recording = False
+        finally:
+            for segment in self.segments:
+                if segment.handle:
+                    segment.handle.close()
+                    segment.handle = None
+            for snapshot, handle, _ in self._active:
+                handle.close()
+                snapshot['status'] = 'failed'
+            self._active = []
+    
+    def _linktype(self, layer: type) -> int:
+        linktype = self._linktypes.get(layer)
+        if linktype is None:
+            linktype = conf.l2types.layer2num.get(layer, _DLT_EN10MB)
+            self._linktypes[layer] = linktype
+        return linktype
+    
+    def _drain(self):
+        """Write every queued frame to the ring (and open snapshots), rotating as needed"""
+        pending = self._pending
+        active = self._active
+        segment = self.segments[-1] if self.segments else None
+        while pending:
+            ts, frame, layer = pending.popleft()
+            linktype = self._linktype(layer)
+            if (
+                segment is None
+                or segment.linktype != linktype
+                or segment.size >= self.file_size
+                or ts - segment.first_ts >= self.file_seconds
+            ):
+                segment = self._rotate(ts, linktype)
+            written = _write_record(segment.handle, ts, frame)
+            segment.size += written
+            segment.packets += 1
+            segment.last_ts = max(segment.last_ts, ts)
+            self.frames_recorded += 1
+            self.bytes_written += written
+            
+            for snapshot, handle, snapshot_linktype in active:
+                if snapshot_linktype == linktype and snapshot['start'] <= ts <= snapshot['end']:
+                    snapshot['bytes'] += _write_record(handle, ts, frame)
+                    snapshot['packets'] += 1
+        if segment is not None and segment.handle:
+            segment.handle.flush()
+    
+    def _rotate(self, ts: float, linktype: int) -> _Segment:
+        """Close the current ring file, open the next and drop the oldest"""
+        if self.segments and self.segments[-1].handle:
+            self.segments[-1].handle.close()
+            self.segments[-1].handle = None
+        
+        self._segment_seq += 1
+        path = self.ring_dir / f"ring_{self._segment_seq:06d}.pcap"
+        segment = _Segment(path=path, linktype=linktype, first_ts=ts, last_ts=ts)
+        segment.handle = _open_pcap(path, linktype)
+        self.segments.append(segment)
+        
+        while len(self.segments) > self.max_files:
+            oldest = self.segments.popleft()
+            try:
+                oldest.path.unlink()
+            except OSError as e:
+                logger.warning(f"Cannot remove ring file {oldest.path.name}: {e}")
+        return segment
+    
+    def _open_snapshots(self):
+        """Open newly requested snapshots"""
+        with self._snapshot_lock:
+            queued = list(self._snapshot_queue)
+        opened = {id(snapshot) for snapshot, _, _ in self._active}
+        for snapshot in queued:
+            if id(snapshot) not in opened and snapshot['status'] == 'pending':
+                try:
+                    self._open_snapshot(snapshot)
+                except OSError as e:
+                    snapshot['status'] = 'failed'
+                    logger.error(f"Cannot write pcap snapshot {snapshot['name']}: {e}")
+    
+    def _close_snapshots(self, final: bool):
+        """Close snapshots whose window has passed (all of them when stopping)"""
+        now = self.clock.now()
+        with self._snapshot_lock:
+            due = [s for s in self._snapshot_queue if final or s['status'] == 'failed' or now >= s['end']]
+            self._snapshot_queue = [s for s in self._snapshot_queue if s not in due]
+        for snapshot in due:
+            self._close_snapshot(snapshot)
+    
+    def _open_snapshot(self, snapshot: Dict):
+        """Create the snapshot file and copy the frames the ring still holds"""
+        if not self.segments:
+            return  # nothing recorded yet - opened on a later pass
+        start = snapshot['start']
+        snapshot['truncated'] = self.segments[0].first_ts > start
+        linktype = self.segments[-1].linktype
+        handle = _open_pcap(self.snapshot_dir / snapshot['name'], linktype)
+        for segment in self.segments:
+            if segment.linktype != linktype or segment.last_ts < start:
+                continue
+            for ts, frame in _read_records(segment.path):
+                if start <= ts <= snapshot['end']:
+                    snapshot['bytes'] += _write_record(handle, ts, frame)
+                    snapshot['packets'] += 1
+        snapshot['status'] = 'recording'
+        self._active.append((snapshot, handle, linktype))
+    
+    def _close_snapshot(self, snapshot: Dict):
+        """Finish a snapshot file (an empty one is removed)"""
+        entry = next((item for item in self._active if item[0] is snapshot), None)
+        if entry is None:
+            if snapshot['status'] == 'pending':
+                snapshot['status'] = 'empty'
+            return
+        self._active.remove(entry)
+        entry[1].close()
+        
+        path = self.snapshot_dir / snapshot['name']
+        if not snapshot['packets']:
+            path.unlink(missing_ok=True)
+            snapshot['status'] = 'empty'
+            return
+        snapshot['status'] = 'written'
+        logger.info(f"Pcap snapshot written: {path.name} ({snapshot['packets']} packets)")
+    
+    def get_stats(self) -> Dict:
+        """Get recorder statistics and recent snapshots"""
+        segments = list(self.segments)
+        return {
+            'is_recording': self.is_recording,
+            'frames_recorded': self.frames_recorded,
+            'frames_dropped': self.frames_dropped,
+            'frames_queued': len(self._pending),
+            'megabytes_written': round(self.bytes_written / 1024 / 1024, 2),
+            'ring_files': len(segments),
+            'ring_seconds': round(segments[-1].last_ts - segments[0].first_ts, 1) if segments else 0.0,
+            'snapshots': [dict(snapshot) for snapshot in list(self.snapshots)]
+        }
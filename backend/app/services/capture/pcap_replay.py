@@ -0,0 +1,160 @@
+"""Offline packet source - replays pcap/pcapng files through the capture pipeline"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Callable, Dict, List, Union
+from scapy.utils import PcapReader
+from scapy.error import Scapy_Exception
+
+from app.config import PCAP_SAVE_DIR
+from .packet_capture import PacketCapture
+from .cardinality import CardinalityMonitor
+from .pcap_recorder import PcapRecorder
+
+logger = logging.getLogger(__name__)
+
+PACING_SLEEP_MAX = 0.2  # seconds; long gaps are slept in slices so stop() stays responsive
+
+
+def resolve_pcap(name: Union[str, Path]) -> Path:
+    """Absolute paths are used as-is; bare names are looked up in PCAP_SAVE_DIR"""
+    path = Path(name)
+    return path if path.is_absolute() else PCAP_SAVE_DIR / path
+
+
+def resolve_saved_pcap(name: str) -> Path:
+    """Resolve a name inside PCAP_SAVE_DIR (for API callers); ValueError if it escapes"""
+    root = PCAP_SAVE_DIR.resolve()
+    path = (root / name).resolve()
+    if Path(name).is_absolute() or not path.is_relative_to(root):
+        raise ValueError(f"Capture file must be inside {PCAP_SAVE_DIR}: {name}")
+    return path
+
+
+class PcapReplay(PacketCapture):
+    """
+    Replays capture files instead of sniffing an interface
+    
+    Packets are streamed (one in memory at a time) through the same handler
+    as live capture, so filtering, cardinality and flow aggregation behave
+    identically. speed=0 replays as fast as the pipeline takes packets;
+    speed=1.0 paces packets on their capture timestamps (2.0 = twice as fast).
+    Files are played back to back in the order given; later files have their
+    timestamps shifted to continue the first file's timeline, so capture time
+    (and with it flow timeouts) keeps moving forward.
+    """
+    
+    def __init__(
+        self,
+        files: List[Union[str, Path]],
+        speed: float = 0.0,
+        packet_callback: Optional[Callable] = None,
+        vm_ip: Optional[str] = None,
+        cardinality_monitor: Optional[CardinalityMonitor] = None,
+        recorder: Optional[PcapRecorder] = None
+    ):
+        super().__init__(
+            interface="offline",
+            packet_callback=packet_callback,
+            vm_ip=vm_ip,
+            cardinality_monitor=cardinality_monitor,
+            recorder=recorder
+        )
+        self.files = [resolve_pcap(f) for f in files]
+        self.speed = max(0.0, speed)
+        self.finished = False  # reading ended (done, failed or stopped)
+        self.error: Optional[str] = None
+        self.packets_read = 0
+        self.current_file: Optional[Path] = None
+        self.replay_position = 0.0  # capture seconds into the replay
+        self.wall_started: Optional[float] = None
+        self.wall_finished: Optional[float] = None
+    
+    def _pace(self, position: float):
+        """Sleep until a packet at this replay position is due"""
+        due = self.wall_started + position / self.speed
+        while self.is_capturing:
+            delay = due - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(min(delay, PACING_SLEEP_MAX))
+    
+    def _capture_loop(self):
+        """Read the files in order (runs in separate thread)"""
+        try:
+            missing = [str(path) for path in self.files if not path.is_file()]
+            if missing:
+                self.error = f"Capture files not found: {', '.join(missing)}"
+                logger.error(self.error)
+                self.is_capturing = False
+                return
+            
+            logger.info(f"Replaying {len(self.files)} capture file(s) at "
+                        f"{'full speed' if not self.speed else f'{self.speed}x'}")
+            self._signal_ready()
+            self.wall_started = time.monotonic()
+            
+            offset = 0.0
+            origin = None
+            for path in self.files:
+                self.current_file = path
+                first_ts = None
+                shift = 0.0
+                with PcapReader(str(path)) as reader:
+                    for packet in reader:
+                        if not self.is_capturing:
+                            return
+                        ts = float(packet.time)
+                        if first_ts is None:
+                            first_ts = ts
+                            if origin is None:
+                                origin = ts
+                            shift = origin + offset - first_ts
+                        if shift:
+                            packet.time = ts + shift
+                        self.replay_position = offset + max(0.0, ts - first_ts)
+                        if self.speed:
+                            self._pace(self.replay_position)
+                        self.packets_read += 1
+                        self._packet_handler(packet)
+                offset = self.replay_position
+            
+            self.wall_finished = time.monotonic()
+            logger.info(f"Replay finished: {self.packets_read} packets in "
+                        f"{self.wall_finished - self.wall_started:.1f}s "
+                        f"({self.replay_position:.1f}s of capture)")
+        
+        except (OSError, Scapy_Exception) as e:
+            self.error = f"Cannot read capture file {self.current_file}: {e}"
+            logger.error(self.error)
+            self.is_capturing = False
+        except Exception as e:
+            self.error = f"Replay error: {e}"
+            logger.error(self.error)
+            import traceback
+            logger.error(traceback.format_exc())
+            self.is_capturing = False
+        finally:
+            # Terminal in every case, so the engine never waits on a dead replay
+            self.finished = True
+            if self.wall_finished is None and self.wall_started is not None:
+                self.wall_finished = time.monotonic()
+            self._signal_ready()
+    
+    def get_stats(self) -> Dict:
+        """Get replay statistics (capture fields plus progress)"""
+        stats = super().get_stats()
+        elapsed = ((self.wall_finished or time.monotonic()) - self.wall_started) if self.wall_started else 0.0
+        stats.update({
+            'source': 'offline',
+            'files': [str(path) for path in self.files],
+            'current_file': str(self.current_file) if self.current_file else None,
+            'speed': self.speed,
+            'finished': self.finished,
+            'error': self.error,
+            'packets_read': self.packets_read,
+            'replay_position': round(self.replay_position, 3),
+            'packets_per_second': round(self.packets_read / elapsed, 1) if elapsed > 0 else 0.0
+        })
+        return stats
@@ -1,5 +1,6 @@
 """Detection Engine - orchestrates the detection pipeline"""
 
+import time
 import asyncio
 import logging
 from datetime import datetime
@@ -9,14 +10,31 @@ from collections import defaultdict
 from app.config import (
     DETECTION_CONFIDENCE_THRESHOLD,
     BATCH_SIZE,
-    DETECTION_INTERVAL
+    DETECTION_INTERVAL,
+    ALERT_AGGREGATION_WINDOW,
+    MAX_OPEN_INCIDENTS,
+    CARDINALITY_PRECISION,
+    CARDINALITY_WINDOW,
+    CARDINALITY_MAX_KEYS,
+    PORT_SCAN_THRESHOLD,
+    SPOOF_SOURCE_THRESHOLD,
+    CAPTURE_START_TIMEOUT,
+    CAPTURE_REBIND_DELAY,
+    PCAP_RING_ENABLED
 )
 from app.services.capture.packet_capture import PacketCapture
+from app.services.capture.clock import PacketClock
+from app.services.capture.pcap_replay import PcapReplay
 from app.services.capture.flow_aggregator import FlowAggregator, Flow
 from app.services.capture.interface_manager import InterfaceManager
+from app.services.capture.netlink import InterfaceEvent
+from app.services.capture.cardinality import CardinalityMonitor
+from app.services.capture.pcap_recorder import PcapRecorder
 from app.services.feature_extractor import FeatureExtractor
 from app.services.ids_model import get_model_service
 from app.services.heuristic_detector import detect_attack_heuristic
+from app.services.alert_aggregator import AlertAggregator
+from app.services.metrics_timeseries import get_metrics_timeseries
 from app.models.detection import DetectionResult
 
 logger = logging.getLogger(__name__)
@@ -31,10 +49,30 @@ class DetectionEngine:
         
         # Components
         self.interface_manager = InterfaceManager()
-        self.flow_aggregator = FlowAggregator()
+        self.interface_manager.add_change_listener(self._on_interface_change)
+        # Capture time shared by flow timeouts and cardinality windows
+        self.clock = PacketClock()
+        self.flow_aggregator = FlowAggregator(clock=self.clock)
         self.feature_extractor = FeatureExtractor()
         self.model_service = get_model_service()
         self.packet_capture: Optional[PacketCapture] = None
+        self.cardinality_monitor = CardinalityMonitor(
+            precision=CARDINALITY_PRECISION,
+            window=CARDINALITY_WINDOW,
+            max_keys=CARDINALITY_MAX_KEYS,
+            port_scan_threshold=PORT_SCAN_THRESHOLD,
+            spoof_source_threshold=SPOOF_SOURCE_THRESHOLD,
+            clock=self.clock
+        )
+        # Optional raw-frame ring with snapshots around new incidents
+        self.pcap_recorder: Optional[PcapRecorder] = PcapRecorder(clock=self.clock) if PCAP_RING_ENABLED else None
+        self.alert_aggregator = AlertAggregator(
+            window=ALERT_AGGREGATION_WINDOW,
+            max_incidents=MAX_OPEN_INCIDENTS
+        )
+        self.metrics = get_metrics_timeseries()
+        self._last_packet_count = 0
+        self._last_byte_count = 0
         
         # Detection statistics
         self.total_flows = 0
@@ -48,6 +86,15 @@ class DetectionEngine:
         
         # Processing task
         self.processing_task = None
+        
+        # Capture target, kept for rebinding after link/route changes
+        self._vm_ip: Optional[str] = None
+        self._requested_interface: Optional[str] = None
+        self._rebind_task: Optional[asyncio.Task] = None
+        self.capture_rebinds = 0
+        
+        # Offline replay (None = live capture)
+        self.replay_speed: Optional[float] = None
     
     def register_detection_callback(self, callback):
         """Register a callback for detection events"""
@@ -56,9 +103,11 @@ class DetectionEngine:
     async def start_monitoring(
         self,
         vm_ip: Optional[str] = None,
-        interface: Optional[str] = None
+        interface: Optional[str] = None,
+        pcap_files: Optional[List[str]] = None,
+        replay_speed: float = 0.0
     ) -> bool:
-        """Start the detection engine"""
+        """Start the detection engine (live capture, or offline replay of pcap_files)"""
         if self.is_running:
             logger.warning("Detection engine already running")
             return False
@@ -69,8 +118,13 @@ class DetectionEngine:
                 logger.error("Model not loaded")
                 return False
             
+            if pcap_files:
+                return await self._start_replay(pcap_files, replay_speed, vm_ip)
+            self.replay_speed = None
+            self._reset_timeline(1.0)
+            
             # Get network interface
-            iface = self.interface_manager.get_interface(vm_ip, interface)
+            iface = await self.interface_manager.get_interface(vm_ip, interface)
             if not iface:
                 logger.error("Failed to detect network interface")
                 return False
@@ -78,18 +132,18 @@ class DetectionEngine:
             logger.info(f"Using network interface: {iface}")
             
             # Check capture permissions
-            if not self.interface_manager.check_capture_permissions():
+            if not await self.interface_manager.check_capture_permissions():
                 logger.warning("May not have capture permissions - some features may not work")
             
-            # Create packet capture
-            self.packet_capture = PacketCapture(
-                interface=iface,
-                packet_callback=self._packet_callback,
-                vm_ip=vm_ip
-            )
+            self._start_recorder()
+            if not await self._start_capture(iface, vm_ip):
+                await self._stop_recorder()
+                return False
             
-            # Start packet capture
-            self.packet_capture.start()
+            # Follow link/route changes so capture can rebind on its own
+            self._vm_ip = vm_ip
+            self._requested_interface = interface
+            self.interface_manager.start_watching()
             
             # Start processing loop
             self.is_running = True
@@ -98,12 +152,71 @@ class DetectionEngine:
             
             logger.info("Detection engine started")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to start detection engine: {e}")
             self.is_running = False
             return False
     
+    def _reset_timeline(self, rate: float):
+        """Drop flow and cardinality state from a previous run and restart capture time"""
+        self.clock.reset(rate)
+        self.flow_aggregator.clear()
+        self.cardinality_monitor.reset()
+    
+    def _start_recorder(self):
+        """Start a fresh pcap ring, if recording is enabled"""
+        if self.pcap_recorder:
+            self.pcap_recorder.start()
+    
+    async def _stop_recorder(self):
+        """Stop the pcap ring (writes pending snapshots, so off the event loop)"""
+        if self.pcap_recorder:
+            await asyncio.to_thread(self.pcap_recorder.stop)
+    
+    async def _start_replay(self, pcap_files: List[str], speed: float, vm_ip: Optional[str]) -> bool:
+        """Feed the pipeline from capture files instead of an interface"""
+        # Paced replays advance capture time between packets at the replay speed
+        self._reset_timeline(max(0.0, speed))
+        self._start_recorder()
+        replay = PcapReplay(
+            pcap_files,
+            speed=speed,
+            packet_callback=self._packet_callback,
+            vm_ip=vm_ip,
+            cardinality_monitor=self.cardinality_monitor,
+            recorder=self.pcap_recorder
+        )
+        replay.start()
+        if not await replay.wait_until_ready(CAPTURE_START_TIMEOUT):
+            await self._stop_recorder()
+            return False
+        
+        self.packet_capture = replay
+        self._last_packet_count = 0
+        self._last_byte_count = 0
+        self.replay_speed = replay.speed
+        
+        self.is_running = True
+        self.start_time = datetime.now()
+        self.processing_task = asyncio.create_task(self._processing_loop())
+        
+        logger.info(f"Detection engine started (offline replay of {len(pcap_files)} file(s))")
+        return True
+    
+    async def _finish_replay(self):
+        """Stop once a replay has been read and every flow processed"""
+        self.is_running = False
+        if self.packet_capture.is_capturing:
+            self.packet_capture.stop()
+        await self._flush_incidents()
+        await self._stop_recorder()
+        if self.packet_capture.error:
+            logger.warning(f"Offline replay ended early ({self.packet_capture.error}): "
+                           f"{self.total_flows} flows, {self.attack_count} attacks")
+        else:
+            logger.info(f"Offline replay complete: {self.total_flows} flows, {self.attack_count} attacks")
+    
     async def stop_monitoring(self) -> bool:
         """Stop the detection engine"""
         if not self.is_running:
@@ -114,6 +227,10 @@ class DetectionEngine:
             logger.info("Stopping detection engine...")
             
             self.is_running = False
+            self.interface_manager.stop_watching()
+            if self._rebind_task:
+                self._rebind_task.cancel()
+                self._rebind_task = None
             
             # Stop packet capture
             if self.packet_capture:
@@ -127,13 +244,77 @@ class DetectionEngine:
                 except asyncio.CancelledError:
                     pass
             
+            # Deliver pending incident updates
+            await self._flush_incidents()
+            
+            # Write the ring's pending snapshots
+            await self._stop_recorder()
+            
             logger.info("Detection engine stopped")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error stopping detection engine: {e}")
             return False
     
+    async def _start_capture(self, iface: str, vm_ip: Optional[str]) -> bool:
+        """Create and start packet capture on an interface"""
+        capture = PacketCapture(
+            interface=iface,
+            packet_callback=self._packet_callback,
+            vm_ip=vm_ip,
+            cardinality_monitor=self.cardinality_monitor,
+            recorder=self.pcap_recorder
+        )
+        
+        # Readiness is signalled by the capture thread
+        capture.start()
+        if not await capture.wait_until_ready(CAPTURE_START_TIMEOUT):
+            return False
+        
+        self.packet_capture = capture
+        self._last_packet_count = 0
+        self._last_byte_count = 0
+        return True
+    
+    def _on_interface_change(self, event: InterfaceEvent):
+        """Schedule a capture rebind when the capture interface or routing changes"""
+        if not self.is_running or self.packet_capture is None:
+            return
+        
+        current = self.packet_capture.interface
+        if event.kind == "link" and event.interface == current and not event.is_up:
+            logger.warning(f"Capture interface {current} went down")
+            return
+        
+        relevant = (
+            event.interface is None  # events were lost
+            or event.interface == current
+            or (event.kind == "route" and self._vm_ip and not self._requested_interface)
+        )
+        if relevant and (self._rebind_task is None or self._rebind_task.done()):
+            self._rebind_task = asyncio.create_task(self._rebind_capture())
+    
+    async def _rebind_capture(self):
+        """Restart capture if it died or the route to the VM moved to another interface"""
+        await asyncio.sleep(CAPTURE_REBIND_DELAY)
+        if not self.is_running:
+            return
+        
+        iface = await self.interface_manager.get_interface(self._vm_ip, self._requested_interface)
+        capture = self.packet_capture
+        if not iface or (capture and capture.interface == iface and capture.is_capturing):
+            return
+        
+        logger.info(f"Rebinding packet capture: {capture.interface if capture else None} -> {iface}")
+        if capture and capture.is_capturing:
+            await asyncio.to_thread(capture.stop)
+        
+        if await self._start_capture(iface, self._vm_ip):
+            self.capture_rebinds += 1
+        else:
+            logger.error(f"Failed to rebind packet capture to {iface}")
+    
     def _packet_callback(self, packet_info: Dict):
         """Callback for captured packets"""
         # Add packet to flow aggregator
@@ -152,6 +333,15 @@ class DetectionEngine:
             while self.is_running:
                 iteration += 1
                 
+                self._record_traffic_metrics()
+                
+                # End of a replay (read through, failed or stopped): every remaining flow is complete
+                replay_done = isinstance(self.packet_capture, PcapReplay) and (
+                    self.packet_capture.finished or not self.packet_capture.is_capturing
+                )
+                if replay_done:
+                    self.flow_aggregator.flush()
+                
                 # Get completed flows (also triggers timeout cleanup)
                 flows = self.flow_aggregator.get_completed_flows(limit=BATCH_SIZE)
                 
@@ -164,9 +354,21 @@ class DetectionEngine:
                         active = self.flow_aggregator.get_active_flow_count()
                         logger.info(f"No completed flows. Active flows: {active}")
                 
-                # Sleep before next iteration
-                await asyncio.sleep(DETECTION_INTERVAL)
+                # Scan / spoofing indicators from distinct-count estimators
+                await self._process_cardinality_indicators()
+                if iteration % 10 == 0:
+                    self.cardinality_monitor.cleanup()
                 
+                # Send aggregated incident updates that are due
+                await self._flush_incidents()
+                
+                if replay_done and not flows:
+                    await self._finish_replay()
+                    break
+                
+                # Sleep before next iteration (full-speed replays drain their backlog without pausing)
+                await asyncio.sleep(0 if flows and self.replay_speed == 0 else DETECTION_INTERVAL)
+        
         except asyncio.CancelledError:
             logger.info("Processing loop cancelled")
         except Exception as e:
@@ -174,63 +376,114 @@ class DetectionEngine:
             import traceback
             logger.error(traceback.format_exc())
     
+    def _record_traffic_metrics(self):
+        """Record packets/bytes captured since the last call"""
+        if not self.packet_capture:
+            return
+        
+        packets = self.packet_capture.packet_count
+        byte_count = self.packet_capture.byte_count
+        self.metrics.record_traffic(
+            packets - self._last_packet_count,
+            byte_count - self._last_byte_count
+        )
+        self._last_packet_count = packets
+        self._last_byte_count = byte_count
+    
+    def classify_flows(self, flows: List[Flow]) -> List[Dict]:
+        """
+        Classify completed flows: rule-based heuristics first, then the model
+        (heuristics only if no model is loaded). Returns one verdict per flow,
+        in order, or [] if no features could be extracted.
+        """
+        features_df = self.feature_extractor.extract_features_from_flows(flows)
+        
+        if features_df.empty:
+            logger.warning("No features extracted from flows")
+            return []
+        
+        logger.debug(f"Extracted features shape: {features_df.shape}")
+        
+        # Run inference
+        if self.model_service.is_loaded:
+            inference_start = time.perf_counter()
+            predictions, probabilities = self.model_service.predict(features_df)
+            self.metrics.record_inference(time.perf_counter() - inference_start)
+            class_names = self.model_service.get_class_names()
+        else:
+            predictions, probabilities, class_names = ["Benign"] * len(flows), None, ["Benign"]
+        self.metrics.record_flows(len(flows))
+        
+        # Log prediction summary
+        prediction_counts = {}
+        for pred in predictions:
+            prediction_counts[pred] = prediction_counts.get(pred, 0) + 1
+        logger.info(f"Predictions: {prediction_counts}")
+        
+        verdicts = []
+        for i, flow in enumerate(flows):
+            # HEURISTIC DETECTION FIRST (rule-based)
+            is_heuristic_attack, h_type, h_conf, h_reason = detect_attack_heuristic(flow)
+            
+            if is_heuristic_attack:
+                verdicts.append({
+                    'flow': flow,
+                    'source': 'heuristic',
+                    'prediction': f"Heuristic: {h_type}",
+                    'attack_type': h_type,
+                    'confidence': h_conf,
+                    'probabilities': [h_conf] + [0.0] * (len(class_names) - 1),
+                    'is_attack': True,
+                    'reason': h_reason
+                })
+                continue
+            
+            prediction = predictions[i]
+            verdicts.append({
+                'flow': flow,
+                'source': 'model',
+                'prediction': prediction,
+                'attack_type': prediction,
+                'confidence': float(probabilities[i].max()) if probabilities is not None else 1.0,
+                'probabilities': probabilities[i].tolist() if probabilities is not None else [1.0],
+                'is_attack': self.model_service.is_attack(prediction),
+                'reason': None
+            })
+        
+        return verdicts
+    
     async def _process_flows(self, flows: List[Flow]):
         """Process flows through detection pipeline"""
         try:
             logger.info(f"Processing {len(flows)} flows for detection")
             
-            # Extract features
-            features_df = self.feature_extractor.extract_features_from_flows(flows)
-            
-            if features_df.empty:
-                logger.warning("No features extracted from flows")
-                return
-            
-            logger.debug(f"Extracted features shape: {features_df.shape}")
-            
-            # Run inference
-            predictions, probabilities = self.model_service.predict(features_df)
-            
-            # Log prediction summary
-            prediction_counts = {}
-            for pred in predictions:
-                prediction_counts[pred] = prediction_counts.get(pred, 0) + 1
-            logger.info(f"Predictions: {prediction_counts}")
+            verdicts = self.classify_flows(flows)
             
             # Process results
             class_names = self.model_service.get_class_names()
-            for i, flow in enumerate(flows):
-                prediction = predictions[i]
-                confidence = float(probabilities[i].max())
+            for verdict in verdicts:
+                flow = verdict['flow']
+                prediction = verdict['prediction']
+                confidence = verdict['confidence']
                 
                 # Update statistics
                 self.total_flows += 1
                 self.total_detections += 1
                 
-                is_attack = self.model_service.is_attack(prediction)
-                
-                # Check for suspicious activity (any attack probability > 10%)
-                attack_probs = {}
-                for j, prob in enumerate(probabilities[i]):
-                    if prob > 0.10 and class_names[j] != 'Benign':
-                        attack_probs[class_names[j]] = float(prob)
-                
-                # HEURISTIC DETECTION FIRST (rule-based)
-                is_heuristic_attack, h_type, h_conf, h_reason = detect_attack_heuristic(flow)
-                
-                if is_heuristic_attack:
-                    logger.warning(f"🚨 HEURISTIC DETECTION: {h_type} ({h_conf:.1%})")
+                if verdict['source'] == 'heuristic':
+                    h_type = verdict['attack_type']
+                    logger.warning(f"🚨 HEURISTIC DETECTION: {h_type} ({confidence:.1%})")
                     logger.warning(f"   {flow.src_ip}:{flow.src_port} → {flow.dst_ip}:{flow.dst_port}")
-                    logger.warning(f"   Reason: {h_reason}")
+                    logger.warning(f"   Reason: {verdict['reason']}")
                     logger.warning(f"   Packets: {flow.total_packets}, Bytes: {flow.total_bytes}, Duration: {flow.duration:.2f}s")
                     
                     # Send heuristic detection to frontend
                     detection = DetectionResult(
                         flow_id=flow.flow_id,
                         timestamp=datetime.now(),
-                        prediction=f"Heuristic: {h_type}",
-                        confidence=h_conf,
-                        probabilities=[h_conf] + [0.0] * (len(class_names) - 1),
+                        prediction=prediction,
+                        confidence=confidence,
+                        probabilities=verdict['probabilities'],
                         src_ip=flow.src_ip,
                         dst_ip=flow.dst_ip,
                         src_port=flow.src_port,
@@ -244,9 +497,17 @@ class DetectionEngine:
                     
                     self.attack_count += 1
                     self.attack_distribution[h_type] += 1
-                    await self._notify_detection(detection)
+                    await self._emit_detection(detection)
                     continue  # Skip ML processing if heuristic caught it
                 
+                is_attack = verdict['is_attack']
+                
+                # Check for suspicious activity (any attack probability > 10%)
+                attack_probs = {}
+                for j, prob in enumerate(verdict['probabilities']):
+                    if prob > 0.10 and j < len(class_names) and class_names[j] != 'Benign':
+                        attack_probs[class_names[j]] = float(prob)
+                
                 # Log suspicious activity (ML sees attack patterns but not confident)
                 if attack_probs:
                     logger.warning(f"⚠️  SUSPICIOUS ACTIVITY: {flow.src_ip}:{flow.src_port} → {flow.dst_ip}:{flow.dst_port}")
@@ -274,7 +535,7 @@ class DetectionEngine:
                         timestamp=datetime.now(),
                         prediction=prediction,
                         confidence=confidence,
-                        probabilities=probabilities[i].tolist(),
+                        probabilities=verdict['probabilities'],
                         src_ip=flow.src_ip,
                         dst_ip=flow.dst_ip,
                         src_port=flow.src_port,
@@ -286,12 +547,65 @@ class DetectionEngine:
                         is_attack=True
                     )
                     
-                    await self._notify_detection(detection)
+                    await self._emit_detection(detection)
                     logger.info(f"ML attack processed: {prediction} (confidence: {confidence:.2%})")
-                
+        
         except Exception as e:
             logger.error(f"Error processing flows: {e}")
     
+    async def _process_cardinality_indicators(self):
+        """Turn HyperLogLog scan/spoofing indicators into detections"""
+        indicators = self.cardinality_monitor.get_indicators()
+        class_names = self.model_service.get_class_names()
+        
+        for indicator in indicators:
+            ratio = indicator.distinct_count / max(indicator.threshold, 1)
+            confidence = min(0.95, 0.55 + ratio * 0.1)
+            
+            logger.warning(f"🚨 CARDINALITY DETECTION: {indicator.kind} ({confidence:.1%})")
+            logger.warning(f"   {indicator.src_ip} → {indicator.dst_ip}:{indicator.dst_port}, "
+                           f"~{indicator.distinct_count} distinct (threshold {indicator.threshold})")
+            
+            detection = DetectionResult(
+                flow_id=f"{indicator.kind}:{indicator.src_ip}-{indicator.dst_ip}:{indicator.dst_port}",
+                timestamp=datetime.now(),
+                prediction=f"Heuristic: {indicator.kind}",
+                confidence=confidence,
+                probabilities=[confidence] + [0.0] * (max(len(class_names), 1) - 1),
+                src_ip=indicator.src_ip,
+                dst_ip=indicator.dst_ip,
+                src_port=0,
+                dst_port=indicator.dst_port,
+                protocol=indicator.protocol,
+                packet_count=indicator.distinct_count,
+                byte_count=0,
+                duration=float(self.cardinality_monitor.window),
+                is_attack=True
+            )
+            
+            self.attack_count += 1
+            self.attack_distribution[indicator.kind] += 1
+            await self._emit_detection(detection)
+    
+    async def _emit_detection(self, detection: DetectionResult):
+        """Pass detection through the alert aggregator, notifying only new incidents"""
+        self.metrics.record_detection(detection.prediction)
+        incident = self.alert_aggregator.add(detection)
+        if incident:
+            if self.pcap_recorder:
+                self.pcap_recorder.request_snapshot(incident.prediction, details={
+                    'incident_id': incident.incident_id,
+                    'src_ip': incident.src_ip,
+                    'dst_ip': incident.dst_ip,
+                    'dst_port': incident.dst_port
+                })
+            await self._notify_detection(incident)
+    
+    async def _flush_incidents(self):
+        """Notify callbacks of incident updates merged since the last notification"""
+        for incident in self.alert_aggregator.flush():
+            await self._notify_detection(incident)
+    
     async def _notify_detection(self, detection: DetectionResult):
         """Notify all registered callbacks of detection"""
         for callback in self.detection_callbacks:
@@ -318,7 +632,13 @@ class DetectionEngine:
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'uptime_seconds': uptime,
             'active_flows': self.flow_aggregator.get_active_flow_count(),
-            'capture_stats': self.packet_capture.get_stats() if self.packet_capture else {}
+            'source': 'live' if self.replay_speed is None else 'offline',
+            'capture_stats': self.packet_capture.get_stats() if self.packet_capture else {},
+            'interfaces': self.interface_manager.get_stats(),
+            'capture_rebinds': self.capture_rebinds,
+            'cardinality': self.cardinality_monitor.get_stats(),
+            'recorder': self.pcap_recorder.get_stats() if self.pcap_recorder else None,
+            'alerts': self.alert_aggregator.get_stats()
         }
 
 
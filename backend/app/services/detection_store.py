@@ -0,0 +1,363 @@
+"""Detection store - persists detections to SQLite with batched writes"""
+
+import queue
+import sqlite3
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from app.config import (
+    DETECTION_DB_PATH,
+    DETECTION_STORE_BATCH_SIZE,
+    DETECTION_STORE_FLUSH_INTERVAL,
+    DETECTION_STORE_QUEUE_SIZE
+)
+from app.models.detection import DetectionResult
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    flow_id TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    src_ip TEXT NOT NULL,
+    dst_ip TEXT NOT NULL,
+    src_port INTEGER NOT NULL,
+    dst_port INTEGER NOT NULL,
+    protocol TEXT NOT NULL,
+    packet_count INTEGER NOT NULL,
+    byte_count INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    is_attack INTEGER NOT NULL,
+    incident_id TEXT UNIQUE,
+    count INTEGER NOT NULL DEFAULT 1,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts);
+CREATE INDEX IF NOT EXISTS idx_detections_src_ip ON detections (src_ip);
+CREATE INDEX IF NOT EXISTS idx_detections_prediction ON detections (prediction);
+"""
+
+# Incident updates overwrite the incident's existing row
+INSERT_SQL = """
+INSERT INTO detections (
+    ts, flow_id, prediction, confidence, src_ip, dst_ip, src_port, dst_port,
+    protocol, packet_count, byte_count, duration, is_attack,
+    incident_id, count, first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(incident_id) DO UPDATE SET
+    ts = excluded.ts,
+    flow_id = excluded.flow_id,
+    confidence = excluded.confidence,
+    src_port = excluded.src_port,
+    packet_count = excluded.packet_count,
+    byte_count = excluded.byte_count,
+    duration = excluded.duration,
+    count = excluded.count,
+    last_seen = excluded.last_seen
+"""
+
+COLUMNS = [
+    'id', 'ts', 'flow_id', 'prediction', 'confidence', 'src_ip', 'dst_ip',
+    'src_port', 'dst_port', 'protocol', 'packet_count', 'byte_count',
+    'duration', 'is_attack', 'incident_id', 'count', 'first_seen', 'last_seen'
+]
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+
+def _from_epoch(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+
+class DetectionStore:
+    """
+    SQLite (WAL) detection store
+    
+    Writes are queued and group-committed by a dedicated writer thread so the
+    event loop never blocks on disk. Reads use short-lived connections in a
+    worker thread and paginate by rowid (keyset), which stays fast on large tables.
+    """
+    
+    def __init__(
+        self,
+        db_path: Path = DETECTION_DB_PATH,
+        batch_size: int = DETECTION_STORE_BATCH_SIZE,
+        flush_interval: float = DETECTION_STORE_FLUSH_INTERVAL,
+        queue_size: int = DETECTION_STORE_QUEUE_SIZE
+    ):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self.writer_thread: Optional[threading.Thread] = None
+        self.is_running = False
+        
+        # Statistics
+        self.rows_written = 0
+        self.batches_committed = 0
+        self.dropped = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def start(self):
+        """Create schema and start the writer thread"""
+        if self.is_running:
+            return
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        self.is_running = True
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+        logger.info(f"Detection store started ({self.db_path})")
+    
+    def stop(self):
+        """Flush queued detections and stop the writer thread"""
+        if not self.is_running:
+            return
+        
+        self.is_running = False
+        self.queue.put(None)  # Wake the writer
+        if self.writer_thread:
+            self.writer_thread.join(timeout=10)
+        logger.info(f"Detection store stopped. Rows written: {self.rows_written}")
+    
+    def add(self, detection: DetectionResult):
+        """Queue a detection for writing (non-blocking, drops when the queue is full)"""
+        row = (
+            detection.timestamp.timestamp(),
+            detection.flow_id,
+            detection.prediction,
+            detection.confidence,
+            detection.src_ip,
+            detection.dst_ip,
+            detection.src_port,
+            detection.dst_port,
+            detection.protocol,
+            detection.packet_count,
+            detection.byte_count,
+            detection.duration,
+            int(detection.is_attack),
+            detection.incident_id,
+            detection.count,
+            _to_epoch(detection.first_seen),
+            _to_epoch(detection.last_seen)
+        )
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _writer_loop(self):
+        """Drain the queue and commit rows in batches"""
+        conn = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                
+                batch = []
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                
+                # Group-commit whatever else is already queued
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        continue
+                    batch.append(item)
+                
+                if batch:
+                    self._write_batch(conn, batch)
+                
+                if stopping and not self.queue.empty():
+                    # Drain remaining rows before exiting
+                    stopping = False
+                    self.queue.put(None)
+        finally:
+            conn.close()
+    
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[tuple]):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, batch)
+            self.rows_written += len(batch)
+            self.batches_committed += 1
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} detections: {e}")
+    
+    def _query(
+        self,
+        limit: int,
+        before_id: Optional[int],
+        src_ip: Optional[str],
+        dst_ip: Optional[str],
+        prediction: Optional[str],
+        start_time: Optional[float],
+        end_time: Optional[float],
+        attacks_only: bool
+    ) -> Dict:
+        conditions = []
+        params: List = []
+        
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        if src_ip:
+            conditions.append("src_ip = ?")
+            params.append(src_ip)
+        if dst_ip:
+            conditions.append("dst_ip = ?")
+            params.append(dst_ip)
+        if prediction:
+            conditions.append("prediction = ?")
+            params.append(prediction)
+        if start_time is not None:
+            conditions.append("ts >= ?")
+            params.append(start_time)
+        if end_time is not None:
+            conditions.append("ts < ?")
+            params.append(end_time)
+        if attacks_only:
+            conditions.append("is_attack = 1")
+        
+        sql = f"SELECT {', '.join(COLUMNS)} FROM detections"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        items = []
+        for row in rows:
+            item = dict(zip(COLUMNS, row))
+            item['timestamp'] = _from_epoch(item.pop('ts'))
+            item['first_seen'] = _from_epoch(item['first_seen'])
+            item['last_seen'] = _from_epoch(item['last_seen'])
+            item['is_attack'] = bool(item['is_attack'])
+            items.append(item)
+        
+        return {
+            'items': items,
+            'next_cursor': rows[-1][0] if has_more and rows else None
+        }
+    
+    async def query(
+        self,
+        limit: int = 100,
+        before_id: Optional[int] = None,
+        src_ip: Optional[str] = None,
+        dst_ip: Optional[str] = None,
+        prediction: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        attacks_only: bool = False
+    ) -> Dict:
+        """Query detections newest first; pass next_cursor back as before_id for the next page"""
+        if not self.db_path.exists():
+            return {'items': [], 'next_cursor': None}
+        
+        return await asyncio.to_thread(
+            self._query,
+            limit,
+            before_id,
+            src_ip,
+            dst_ip,
+            prediction,
+            _to_epoch(start_time),
+            _to_epoch(end_time),
+            attacks_only
+        )
+    
+    def _window_summary(self, start_time: float, end_time: float) -> Dict[str, Dict]:
+        # Only incidents that began in the window count; ones still active from before it are carried over
+        sql = (
+            "SELECT prediction,"
+            " SUM(CASE WHEN COALESCE(first_seen, ts) >= ? THEN count ELSE 0 END),"
+            " MIN(CASE WHEN COALESCE(first_seen, ts) >= ? THEN COALESCE(first_seen, ts) END),"
+            " SUM(CASE WHEN COALESCE(first_seen, ts) < ? THEN count ELSE 0 END)"
+            " FROM detections"
+            " WHERE is_attack = 1 AND COALESCE(first_seen, ts) < ? AND ts >= ?"
+            " GROUP BY prediction"
+        )
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                sql, (start_time, start_time, start_time, end_time, start_time)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            prediction: {'count': count, 'first_seen': first_seen, 'carried_over': carried_over}
+            for prediction, count, first_seen, carried_over in rows
+        }
+    
+    async def window_summary(self, start_time: float, end_time: float) -> Dict[str, Dict]:
+        """
+        Attack detections in [start_time, end_time) (epoch seconds), per predicted label:
+        count and first_seen cover incidents that began in the window, carried_over
+        counts detections of incidents already active when it opened
+        """
+        if not self.db_path.exists():
+            return {}
+        return await asyncio.to_thread(self._window_summary, start_time, end_time)
+    
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            'is_running': self.is_running,
+            'db_path': str(self.db_path),
+            'rows_written': self.rows_written,
+            'batches_committed': self.batches_committed,
+            'queued': self.queue.qsize(),
+            'dropped': self.dropped
+        }
+
+
+# Global detection store instance
+_detection_store = None
+
+
+def get_detection_store() -> DetectionStore:
+    """Get or create global detection store instance"""
+    global _detection_store
+    if _detection_store is None:
+        _detection_store = DetectionStore()
+    return _detection_store
@@ -0,0 +1,179 @@
+"""In-process time-series metrics with 1 s / 1 min / 1 h rollups"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+from collections import defaultdict
+
+from app.config import TIMESERIES_TIERS
+
+logger = logging.getLogger(__name__)
+
+
+class MetricBucket:
+    """Counters for one time slot"""
+    
+    __slots__ = (
+        'start', 'packets', 'bytes', 'flows', 'detections',
+        'latency_sum', 'latency_count', 'latency_max'
+    )
+    
+    def __init__(self, start: int):
+        self.start = start
+        self.packets = 0
+        self.bytes = 0
+        self.flows = 0
+        self.detections: Dict[str, int] = defaultdict(int)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latency_max = 0.0
+    
+    def to_dict(self, resolution: int) -> Dict:
+        return {
+            'timestamp': self.start,
+            'packets': self.packets,
+            'bytes': self.bytes,
+            'flows': self.flows,
+            'packets_per_second': self.packets / resolution,
+            'bytes_per_second': self.bytes / resolution,
+            'flows_per_second': self.flows / resolution,
+            'detections': dict(self.detections),
+            'inference_count': self.latency_count,
+            'inference_latency_avg_ms': (
+                self.latency_sum / self.latency_count * 1000 if self.latency_count else 0.0
+            ),
+            'inference_latency_max_ms': self.latency_max * 1000
+        }
+
+
+class RingSeries:
+    """Fixed-size ring of buckets at one resolution"""
+    
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self.size = size
+        self.slots: List[Optional[MetricBucket]] = [None] * size
+    
+    def bucket(self, now: float) -> MetricBucket:
+        """Get (or recycle) the bucket covering now"""
+        start = int(now) // self.resolution * self.resolution
+        index = (start // self.resolution) % self.size
+        bucket = self.slots[index]
+        if bucket is None or bucket.start != start:
+            bucket = MetricBucket(start)
+            self.slots[index] = bucket
+        return bucket
+    
+    def range(self, start: float, end: float, fill: bool = True) -> List[Dict]:
+        """Buckets in [start, end), oldest first; missing slots are zero-filled"""
+        oldest = int(end) // self.resolution * self.resolution - (self.size - 1) * self.resolution
+        first = max(int(start) // self.resolution * self.resolution, oldest)
+        
+        points = []
+        for slot_start in range(first, int(end) + 1, self.resolution):
+            if slot_start >= end:
+                break
+            bucket = self.slots[(slot_start // self.resolution) % self.size]
+            if bucket is not None and bucket.start == slot_start:
+                points.append(bucket.to_dict(self.resolution))
+            elif fill:
+                points.append(MetricBucket(slot_start).to_dict(self.resolution))
+        return points
+
+
+class MetricsTimeSeries:
+    """
+    Per-second counters for packets, bytes, flows, detections by class and
+    inference latency, rolled up into coarser tiers at write time so range
+    queries never recompute from raw data
+    """
+    
+    def __init__(self, tiers: Dict[str, tuple] = TIMESERIES_TIERS):
+        # name -> (resolution seconds, number of slots)
+        self.tiers = {
+            name: RingSeries(resolution, size)
+            for name, (resolution, size) in tiers.items()
+        }
+    
+    def _buckets(self, now: Optional[float]) -> List[MetricBucket]:
+        now = now if now is not None else time.time()
+        return [series.bucket(now) for series in self.tiers.values()]
+    
+    def record_traffic(self, packets: int, byte_count: int, now: Optional[float] = None):
+        """Record captured packets and bytes"""
+        if not packets and not byte_count:
+            return
+        for bucket in self._buckets(now):
+            bucket.packets += packets
+            bucket.bytes += byte_count
+    
+    def record_flows(self, count: int, now: Optional[float] = None):
+        """Record processed flows"""
+        for bucket in self._buckets(now):
+            bucket.flows += count
+    
+    def record_detection(self, prediction: str, now: Optional[float] = None):
+        """Record an emitted (attack) detection of the given class; benign flows are only counted in flows"""
+        for bucket in self._buckets(now):
+            bucket.detections[prediction] += 1
+    
+    def record_inference(self, latency: float, now: Optional[float] = None):
+        """Record one model inference latency (seconds)"""
+        for bucket in self._buckets(now):
+            bucket.latency_sum += latency
+            bucket.latency_count += 1
+            if latency > bucket.latency_max:
+                bucket.latency_max = latency
+    
+    def query(
+        self,
+        resolution: str = "1s",
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict:
+        """Range query on a tier; defaults to the whole ring ending now"""
+        series = self.tiers.get(resolution)
+        if series is None:
+            raise ValueError(f"Unknown resolution: {resolution} (available: {list(self.tiers)})")
+        
+        end = end if end is not None else time.time()
+        if start is None:
+            start = end - series.resolution * series.size
+        
+        return {
+            'resolution': resolution,
+            'resolution_seconds': series.resolution,
+            'start': start,
+            'end': end,
+            'points': series.range(start, end)
+        }
+    
+    def get_current_rates(self, window: int = 5) -> Dict:
+        """Average rates over the last complete seconds"""
+        series = self.tiers.get("1s")
+        if series is None:
+            return {}
+        
+        end = int(time.time())
+        points = series.range(end - window, end)
+        seconds = max(len(points), 1)
+        
+        return {
+            'window_seconds': window,
+            'packets_per_second': sum(p['packets'] for p in points) / seconds,
+            'bytes_per_second': sum(p['bytes'] for p in points) / seconds,
+            'flows_per_second': sum(p['flows'] for p in points) / seconds,
+            'detections_per_second': sum(sum(p['detections'].values()) for p in points) / seconds
+        }
+
+
+# Global metrics time-series instance
+_metrics = None
+
+
+def get_metrics_timeseries() -> MetricsTimeSeries:
+    """Get or create global metrics time-series instance"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsTimeSeries()
+    return _metrics
@@ -0,0 +1,352 @@
+"""Scenario runner - timed, mixed attack campaigns with ground-truth labels"""
+
+import asyncio
+import json
+import logging
+import re
+import statistics
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import (
+    SCENARIO_DETECTION_GRACE,
+    SCENARIO_DIR,
+    SCENARIO_RUN_DIR,
+    SCENARIO_RUN_HISTORY,
+)
+from app.models.scenario import BENIGN_LABEL, Scenario, ScenarioPhase
+from app.services.attack_orchestrator import get_attack_orchestrator
+from app.services.detection_store import get_detection_store
+
+logger = logging.getLogger(__name__)
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _ramp_steps(phase: ScenarioPhase) -> List[tuple]:
+    """(offset into the phase, rate) for each ramp step after the first"""
+    ramp = phase.ramp
+    if ramp is None or ramp.steps < 2:
+        return []
+    return [
+        (
+            phase.duration * i / ramp.steps,
+            ramp.start_rate + (ramp.end_rate - ramp.start_rate) * i / (ramp.steps - 1)
+        )
+        for i in range(1, ramp.steps)
+    ]
+
+
+class ScenarioRunner:
+    """
+    Runs one scenario at a time: every phase is scheduled at its offset from
+    the scenario start on the event loop clock, started through the attack
+    orchestrator, ramped by retargeting the running attack's rate, and stopped
+    at its end. Each phase leaves a ground-truth label (wall-clock start/end,
+    attack id, rate steps) that is written to SCENARIO_RUN_DIR, so detections
+    can be scored against it afterwards.
+    """
+    
+    def __init__(self, scenario_dir: Path = SCENARIO_DIR, run_dir: Path = SCENARIO_RUN_DIR):
+        self.scenario_dir = Path(scenario_dir)
+        self.run_dir = Path(run_dir)
+        self.current: Optional[Dict] = None
+        self.task: Optional[asyncio.Task] = None
+        self.runs: "OrderedDict[str, Dict]" = OrderedDict()
+    
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+    
+    def list_scenarios(self) -> List[Dict]:
+        """Saved scenarios (invalid files are skipped)"""
+        scenarios = []
+        for path in sorted(self.scenario_dir.glob("*.json")):
+            try:
+                scenario = Scenario.model_validate_json(path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping invalid scenario {path.name}: {e}")
+                continue
+            scenarios.append({
+                'name': path.stem,
+                'title': scenario.name,
+                'description': scenario.description,
+                'duration': scenario.duration,
+                'phases': len(scenario.phases)
+            })
+        return scenarios
+    
+    def load_scenario(self, name: str) -> Scenario:
+        """Load a saved scenario by file name (without .json)"""
+        if not _SAFE_NAME.match(name):
+            raise ValueError(f"Invalid scenario name: {name}")
+        path = self.scenario_dir / f"{name}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Scenario not found: {name}")
+        return Scenario.model_validate_json(path.read_text())
+    
+    async def start(self, scenario: Scenario, target_ip: Optional[str] = None) -> Dict:
+        """Start a scenario run in the background; returns the run record"""
+        if self.is_running:
+            raise RuntimeError("A scenario is already running")
+        target_ip = target_ip or scenario.target_ip
+        if not target_ip:
+            raise ValueError("No target_ip given and the scenario has none")
+        
+        run = {
+            'run_id': str(uuid.uuid4()),
+            'scenario': scenario.name,
+            'target_ip': target_ip,
+            'status': 'running',
+            'started_at': time.time(),
+            'ended_at': None,
+            'duration': scenario.duration,
+            'labels': [
+                {
+                    'phase': phase.name,
+                    'label': phase.label,
+                    'attack_type': phase.attack_type.value if phase.attack_type else None,
+                    'offset': phase.start,
+                    'planned_duration': phase.duration,
+                    'status': 'pending',
+                    'start': None,
+                    'end': None,
+                    'attack_id': None,
+                    'rate_steps': [],
+                    'packets_sent': None,
+                    'error': None
+                }
+                for phase in scenario.phases
+            ],
+            'definition': scenario.model_dump(mode='json')
+        }
+        self.current = run
+        self._save(run)
+        self.task = asyncio.create_task(self._run(run, scenario))
+        logger.info(f"Scenario '{scenario.name}' started (run {run['run_id']}, {scenario.duration:.0f}s)")
+        return run
+    
+    async def stop(self) -> bool:
+        """Stop the running scenario (its active attacks are stopped)"""
+        if not self.is_running:
+            return False
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        return True
+    
+    async def _run(self, run: Dict, scenario: Scenario):
+        t0 = asyncio.get_running_loop().time()
+        phases = [
+            asyncio.create_task(self._run_phase(run, label, phase, t0))
+            for label, phase in zip(run['labels'], scenario.phases)
+        ]
+        try:
+            await asyncio.gather(*phases)
+            run['status'] = 'completed'
+        except asyncio.CancelledError:
+            run['status'] = 'stopped'
+            raise
+        except Exception as e:
+            run['status'] = 'failed'
+            run['error'] = str(e)
+            logger.error(f"Scenario run {run['run_id']} failed: {e}")
+        finally:
+            for task in phases:
+                task.cancel()
+            await asyncio.gather(*phases, return_exceptions=True)
+            run['ended_at'] = time.time()
+            self._save(run)
+            self.runs[run['run_id']] = run
+            while len(self.runs) > SCENARIO_RUN_HISTORY:
+                self.runs.popitem(last=False)
+            logger.info(f"Scenario '{run['scenario']}' {run['status']} (run {run['run_id']})")
+    
+    async def _sleep_until(self, deadline: float):
+        delay = deadline - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _run_phase(self, run: Dict, label: Dict, phase: ScenarioPhase, t0: float):
+        """Run one phase on schedule, recording its ground-truth label"""
+        await self._sleep_until(t0 + phase.start)
+        orchestrator = get_attack_orchestrator()
+        attack = None
+        label['status'] = 'running'
+        label['start'] = time.time()
+        try:
+            if phase.attack_type is not None:
+                kwargs = dict(phase.parameters)
+                if phase.intensity:
+                    kwargs['intensity'] = phase.intensity
+                rate = phase.ramp.start_rate if phase.ramp else phase.rate
+                if rate:
+                    kwargs['rate'] = rate
+                if phase.workers:
+                    kwargs['workers'] = phase.workers
+                
+                attack = await orchestrator.start_attack(
+                    phase.attack_type,
+                    run['target_ip'],
+                    phase.target_port,
+                    duration=phase.duration,
+                    **kwargs
+                )
+                if attack is None:
+                    raise RuntimeError(f"could not start {phase.attack_type.value}")
+                label['attack_id'] = attack.attack_id
+                label['rate_steps'].append({'time': time.time(), 'rate': attack.get_requested_rate()})
+                
+                for offset, step_rate in _ramp_steps(phase):
+                    await self._sleep_until(t0 + phase.start + offset)
+                    attack.set_requested_rate(step_rate)
+                    label['rate_steps'].append({'time': time.time(), 'rate': step_rate})
+            
+            await self._sleep_until(t0 + phase.end)
+            label['status'] = 'completed'
+        except asyncio.CancelledError:
+            label['status'] = 'stopped'
+            raise
+        except Exception as e:
+            label['status'] = 'failed'
+            label['error'] = str(e)
+            logger.error(f"Scenario phase '{phase.name}' failed: {e}")
+        finally:
+            if attack is not None:
+                if attack.attack_id in orchestrator.active_attacks:
+                    await orchestrator.stop_attack(attack.attack_id)
+                label['packets_sent'] = attack.packets_sent
+            label['end'] = time.time()
+    
+    def _save(self, run: Dict):
+        try:
+            path = self.run_dir / f"{run['run_id']}.json"
+            path.write_text(json.dumps(run, indent=2))
+        except OSError as e:
+            logger.error(f"Cannot write scenario labels: {e}")
+    
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """A run record (labels included), from memory or SCENARIO_RUN_DIR"""
+        if self.current is not None and self.current['run_id'] == run_id:
+            return self.current
+        if run_id in self.runs:
+            return self.runs[run_id]
+        if not _SAFE_NAME.match(run_id):
+            return None
+        path = self.run_dir / f"{run_id}.json"
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+    
+    def get_status(self) -> Dict:
+        """Current (or last) run with per-phase progress"""
+        run = self.current
+        if run is None:
+            return {'is_running': False, 'run': None}
+        ended = run['ended_at'] or time.time()
+        return {
+            'is_running': self.is_running,
+            'run': {
+                'run_id': run['run_id'],
+                'scenario': run['scenario'],
+                'target_ip': run['target_ip'],
+                'status': run['status'],
+                'elapsed': round(ended - run['started_at'], 1),
+                'duration': run['duration'],
+                'phases': [
+                    {key: label[key] for key in ('phase', 'label', 'status', 'attack_id', 'packets_sent')}
+                    for label in run['labels']
+                ]
+            }
+        }
+    
+    async def score_run(self, run_id: str, grace: float = SCENARIO_DETECTION_GRACE) -> Optional[Dict]:
+        """
+        Score stored detections against a run's labels: an attack phase is
+        detected if an incident with its label begins in [start, end + grace);
+        latency is from phase start to the first such incident. Attack
+        incidents beginning during benign phases count as false positives
+        unless an attack with that label overlaps the phase. Incidents still
+        active from an earlier phase are reported as carried_over only.
+        """
+        run = self.get_run(run_id)
+        if run is None:
+            return None
+        store = get_detection_store()
+        
+        phases = []
+        for label in run['labels']:
+            if label['start'] is None:
+                continue
+            end = (label['end'] or time.time()) + grace
+            summary = await store.window_summary(label['start'], end)
+            predictions = {prediction: entry['count'] for prediction, entry in summary.items() if entry['count']}
+            carried_over = {
+                prediction: entry['carried_over'] for prediction, entry in summary.items() if entry['carried_over']
+            }
+            
+            if label['label'] == BENIGN_LABEL:
+                # Detections of an attack that overlaps this window (or just ended) are not false positives
+                explained = {
+                    other['label'] for other in run['labels']
+                    if other['label'] != BENIGN_LABEL and other['start'] is not None
+                    and other['start'] < end and (other['end'] or time.time()) + grace > label['start']
+                }
+                phases.append({
+                    'phase': label['phase'],
+                    'label': label['label'],
+                    'false_positives': sum(
+                        count for prediction, count in predictions.items() if prediction not in explained
+                    ),
+                    'predictions': predictions,
+                    'carried_over': carried_over
+                })
+                continue
+            
+            match = summary.get(label['label']) if label['label'] in predictions else None
+            phases.append({
+                'phase': label['phase'],
+                'label': label['label'],
+                'detected': match is not None,
+                'detected_as_attack': bool(predictions),
+                'latency': round(match['first_seen'] - label['start'], 3) if match else None,
+                'matching_detections': match['count'] if match else 0,
+                'predictions': predictions,
+                'carried_over': carried_over
+            })
+        
+        attack_phases = [phase for phase in phases if 'detected' in phase]
+        latencies = [phase['latency'] for phase in attack_phases if phase['latency'] is not None]
+        return {
+            'run_id': run['run_id'],
+            'scenario': run['scenario'],
+            'status': run['status'],
+            'grace': grace,
+            'attack_phases': len(attack_phases),
+            'recall': round(len(latencies) / len(attack_phases), 4) if attack_phases else None,
+            'attack_recall': round(
+                sum(1 for phase in attack_phases if phase['detected_as_attack']) / len(attack_phases), 4
+            ) if attack_phases else None,
+            'mean_latency': round(statistics.mean(latencies), 3) if latencies else None,
+            'max_latency': max(latencies) if latencies else None,
+            'false_positives': sum(phase.get('false_positives', 0) for phase in phases),
+            'phases': phases
+        }
+
+
+# Global scenario runner instance
+_scenario_runner = None
+
+
+def get_scenario_runner() -> ScenarioRunner:
+    """Get or create global scenario runner instance"""
+    global _scenario_runner
+    if _scenario_runner is None:
+        _scenario_runner = ScenarioRunner()
+    return _scenario_runner
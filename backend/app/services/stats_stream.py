@@ -0,0 +1,215 @@
+"""Stats stream - computes dashboard stats once per tick and pushes them over /ws"""
+
+import copy
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import WebSocket
+
+from app.config import STATS_PUSH_INTERVAL, STATS_KEYFRAME_TICKS
+from app.services.detection_engine import get_detection_engine
+from app.services.metrics_timeseries import get_metrics_timeseries
+from app.websocket_manager import get_websocket_manager
+
+logger = logging.getLogger(__name__)
+
+
+def build_stats_summary() -> Dict:
+    """Detection statistics summary (shared by /api/stats/summary and the stream)"""
+    detection_engine = get_detection_engine()
+    stats = detection_engine.get_stats()
+    capture_stats = stats.get('capture_stats', {})
+    rates = get_metrics_timeseries().get_current_rates()
+    
+    return {
+        "monitoring": {
+            "is_running": stats['is_running'],
+            "uptime_seconds": stats['uptime_seconds'],
+            "start_time": stats['start_time']
+        },
+        "detection": {
+            "total_flows": stats['total_flows'],
+            "total_detections": stats['total_detections'],
+            "benign_count": stats['benign_count'],
+            "attack_count": stats['attack_count'],
+            "detection_rate": stats['detection_rate'],
+            "active_flows": stats['active_flows']
+        },
+        "attacks": {
+            "distribution": stats['attack_distribution']
+        },
+        "packets_captured": capture_stats.get('packet_count', 0),
+        "bytes_captured": capture_stats.get('byte_count', 0),
+        "capture_duration": stats['uptime_seconds'],
+        "packets_per_second": rates.get('packets_per_second', 0),
+        "bytes_per_second": rates.get('bytes_per_second', 0),
+        "avg_packets_per_second": capture_stats.get('packet_count', 0) / stats['uptime_seconds'] if stats['uptime_seconds'] > 0 else 0,
+        "capture": capture_stats
+    }
+
+
+def diff_stats(old: Dict, new: Dict, path: Optional[List[str]] = None) -> Dict[str, List]:
+    """
+    Changes from old to new as {'set': [[path, value], ...], 'unset': [path, ...]}
+    Nested dicts are diffed key by key; any other changed value is replaced whole.
+    """
+    path = path or []
+    delta = {'set': [], 'unset': []}
+    
+    for key, value in new.items():
+        key_path = path + [key]
+        if key not in old:
+            delta['set'].append([key_path, value])
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            child = diff_stats(old[key], value, key_path)
+            delta['set'].extend(child['set'])
+            delta['unset'].extend(child['unset'])
+        elif value != old[key]:
+            delta['set'].append([key_path, value])
+    
+    for key in old:
+        if key not in new:
+            delta['unset'].append(path + [key])
+    
+    return delta
+
+
+class StatsStream:
+    """
+    Periodic server-side stats push
+    
+    Each tick builds one snapshot from the registered sources and broadcasts
+    either a full "stats" keyframe or a "stats_delta" with only what changed,
+    so the per-tick cost does not grow with the number of dashboards. Deltas
+    carry a sequence number; clients that see a gap ask for a resync.
+    """
+    
+    def __init__(
+        self,
+        interval: float = STATS_PUSH_INTERVAL,
+        keyframe_ticks: int = STATS_KEYFRAME_TICKS
+    ):
+        self.interval = interval
+        self.keyframe_ticks = keyframe_ticks
+        self.sources: Dict[str, Callable[[], Any]] = {}
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.seq = 0
+        self.task: Optional[asyncio.Task] = None
+        self.is_running = False
+        
+        # Statistics
+        self.ticks = 0
+        self.keyframes_sent = 0
+        self.deltas_sent = 0
+        self.idle_ticks = 0
+    
+    def register_source(self, name: str, source: Callable[[], Any]):
+        """Add a named section to the snapshot (sync or async callable)"""
+        self.sources[name] = source
+    
+    def start(self):
+        """Start the push loop"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"Stats stream started (every {self.interval}s)")
+    
+    async def stop(self):
+        """Stop the push loop"""
+        self.is_running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        logger.info("Stats stream stopped")
+    
+    async def _run(self):
+        while self.is_running:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Error pushing stats: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def _collect(self) -> Dict[str, Any]:
+        snapshot = {}
+        for name, source in self.sources.items():
+            try:
+                value = source()
+                if asyncio.iscoroutine(value):
+                    value = await value
+                snapshot[name] = value
+            except Exception as e:
+                logger.error(f"Stats source {name} failed: {e}")
+                if self.snapshot and name in self.snapshot:
+                    snapshot[name] = self.snapshot[name]
+        return snapshot
+    
+    async def tick(self):
+        """Build one snapshot and push a keyframe or delta to subscribers"""
+        ws_manager = get_websocket_manager()
+        if not ws_manager.has_subscribers('stats'):
+            # Nobody is watching - don't compute anything; resync on next viewer
+            self.idle_ticks += 1
+            self.snapshot = None
+            return
+        
+        self.ticks += 1
+        snapshot = copy.deepcopy(await self._collect())
+        
+        if self.snapshot is None or self.ticks % self.keyframe_ticks == 0:
+            self.seq += 1
+            self.snapshot = snapshot
+            await ws_manager.broadcast_stats(snapshot, seq=self.seq)
+            self.keyframes_sent += 1
+            return
+        
+        delta = diff_stats(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if not delta['set'] and not delta['unset']:
+            return
+        
+        self.seq += 1
+        await ws_manager.broadcast_stats_delta(delta, self.seq)
+        self.deltas_sent += 1
+    
+    async def send_snapshot(self, websocket: WebSocket):
+        """Send the current full snapshot to one client (on connect or resync)"""
+        if self.snapshot is None:
+            return
+        await get_websocket_manager().send_personal_message({
+            'event_type': 'stats',
+            'seq': self.seq,
+            'data': self.snapshot
+        }, websocket)
+    
+    def get_stats(self) -> Dict:
+        """Get stream statistics"""
+        return {
+            'is_running': self.is_running,
+            'interval_seconds': self.interval,
+            'keyframe_ticks': self.keyframe_ticks,
+            'sources': list(self.sources),
+            'seq': self.seq,
+            'ticks': self.ticks,
+            'idle_ticks': self.idle_ticks,
+            'keyframes_sent': self.keyframes_sent,
+            'deltas_sent': self.deltas_sent
+        }
+
+
+# Global stats stream instance
+_stats_stream = None
+
+
+def get_stats_stream() -> StatsStream:
+    """Get or create global stats stream instance"""
+    global _stats_stream
+    if _stats_stream is None:
+        _stats_stream = StatsStream()
+    return _stats_stream
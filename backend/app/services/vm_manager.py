@@ -4,19 +4,102 @@ import subprocess
 import logging
 import asyncio
 import json
-from typing import Optional, Dict, List
+import time
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple
 from datetime import datetime
-from app.config import VM_NAME, VM_IP, VM_CPUS, VM_MEMORY, VM_DISK, VM_SERVICES
+from app.config import VM_NAME, VM_IP, VM_CPUS, VM_MEMORY, VM_DISK, VM_SERVICES, VM_STATE_CACHE_TTL
 from app.models.vm import VMInfo, VMState, VMServiceStatus
 
 logger = logging.getLogger(__name__)
 
 
 class VMManager:
-    """Manages Multipass VMs for IDS testing"""
+    """
+    Manages Multipass VMs for IDS testing
     
-    def __init__(self, vm_name: str = VM_NAME):
+    `multipass list/info` results are cached for a short TTL and concurrent
+    lookups share one in-flight subprocess; start/stop/create/delete
+    invalidate the cache.
+    """
+    
+    def __init__(self, vm_name: str = VM_NAME, cache_ttl: float = VM_STATE_CACHE_TTL):
         self.vm_name = vm_name
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[str, Tuple[float, Any]] = {}  # key -> (monotonic time, value)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._generation = 0
+        
+        # Cache statistics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_coalesced = 0
+    
+    async def _cached(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a fresh cached value, join an in-flight fetch, or start one"""
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+            self.cache_hits += 1
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.cache_coalesced += 1
+        else:
+            self.cache_misses += 1
+            generation = self._generation
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            
+            def store(done: asyncio.Task):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                # Don't cache results that raced with a state change
+                if not done.cancelled() and done.exception() is None and generation == self._generation:
+                    self._cache[key] = (time.monotonic(), done.result())
+            
+            task.add_done_callback(store)
+        
+        # Shield so one caller being cancelled doesn't cancel the shared fetch
+        return await asyncio.shield(task)
+    
+    def invalidate_cache(self):
+        """Drop cached VM state (after anything that changes it)"""
+        self._generation += 1
+        self._cache.clear()
+        self._inflight.clear()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get VM state cache statistics"""
+        lookups = self.cache_hits + self.cache_misses + self.cache_coalesced
+        return {
+            'ttl_seconds': self.cache_ttl,
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'coalesced': self.cache_coalesced,
+            'hit_rate': (self.cache_hits + self.cache_coalesced) / lookups if lookups else 0.0,
+            'cached_keys': list(self._cache),
+            'inflight': list(self._inflight)
+        }
+    
+    async def _multipass_json(self, *args: str) -> Optional[Dict]:
+        """Run `multipass <args> --format json`; parsed output or None on failure"""
+        try:
+            result = await asyncio.create_subprocess_exec(
+                'multipass', *args, '--format', 'json',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await result.communicate()
+            
+            if result.returncode != 0:
+                return None
+            
+            return json.loads(stdout.decode())
+            
+        except Exception as e:
+            logger.error(f"Error running multipass {args[0]}: {e}")
+            return None
     
     async def create_vm(
         self,
@@ -55,6 +138,7 @@ class VMManager:
             )
             
             stdout, stderr = await result.communicate()
+            self.invalidate_cache()
             
             if result.returncode != 0:
                 error_msg = stderr.decode() if stderr else "Unknown error"
@@ -151,6 +235,7 @@ class VMManager:
             )
             
             stdout, stderr = await result.communicate()
+            self.invalidate_cache()
             
             if result.returncode != 0:
                 logger.error(f"Failed to start VM: {stderr.decode()}")
@@ -176,6 +261,7 @@ class VMManager:
             )
             
             stdout, stderr = await result.communicate()
+            self.invalidate_cache()
             
             if result.returncode != 0:
                 logger.error(f"Failed to stop VM: {stderr.decode()}")
@@ -213,6 +299,7 @@ class VMManager:
                 stderr=asyncio.subprocess.PIPE
             )
             await result.communicate()
+            self.invalidate_cache()
             
             logger.info("VM deleted successfully")
             return True
@@ -224,19 +311,10 @@ class VMManager:
     async def vm_exists(self) -> bool:
         """Check if VM exists"""
         try:
-            cmd = ['multipass', 'list', '--format', 'json']
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await result.communicate()
-            
-            if result.returncode != 0:
+            data = await self._cached('list', lambda: self._multipass_json('list'))
+            if data is None:
                 return False
             
-            data = json.loads(stdout.decode())
             vms = data.get('list', [])
             
             for vm in vms:
@@ -252,19 +330,10 @@ class VMManager:
     async def get_vm_info(self) -> Optional[VMInfo]:
         """Get VM information"""
         try:
-            cmd = ['multipass', 'info', self.vm_name, '--format', 'json']
-            result = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await result.communicate()
-            
-            if result.returncode != 0:
+            data = await self._cached('info', lambda: self._multipass_json('info', self.vm_name))
+            if data is None:
                 return None
             
-            data = json.loads(stdout.decode())
             info = data.get('info', {}).get(self.vm_name, {})
             
             if not info:
@@ -1,26 +1,241 @@
 """WebSocket manager for real-time updates"""
 
 import json
+import time
 import logging
 import asyncio
-from typing import Set, Dict, Any
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Union
 from fastapi import WebSocket
 from datetime import datetime
 
+from app.wire_protocol import (
+    ENCODING_JSON,
+    ENCODING_COLUMNAR,
+    SUPPORTED_ENCODINGS,
+    encode_detection_batch
+)
+from app.ws_subscriptions import Subscription, DetectionFilter
+from app.config import (
+    WS_SEND_QUEUE_SIZE,
+    WS_QUEUE_FULL_POLICY,
+    WS_SEND_TIMEOUT,
+    WS_MAX_LAG,
+    WS_MAX_DROPPED,
+    WS_BATCH_INTERVAL,
+    WS_BATCH_MAX_EVENTS
+)
+
 logger = logging.getLogger(__name__)
 
+# State-like events where only the latest value matters (safe to coalesce)
+COALESCE_EVENTS = {'vm_status', 'stats', 'monitoring_status'}
+
+Payload = Union[Dict[str, Any], str, bytes]
+
+
+class ClientConnection:
+    """
+    A connected client with its own bounded send queue and writer task
+    
+    Broadcasts only enqueue, so a slow client never delays other clients or
+    the caller. When the queue is full the configured policy applies:
+    "drop_oldest", "drop_newest" or "coalesce" (replace a queued message of
+    the same state event, else drop the oldest).
+    """
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        manager: "WebSocketManager",
+        queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: str = WS_QUEUE_FULL_POLICY,
+        encoding: str = ENCODING_JSON
+    ):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.subscription = Subscription()
+        self.manager = manager
+        self.queue_size = queue_size
+        self.policy = policy
+        self.queue: deque = deque()  # (enqueue_time, event_type, payload)
+        self.has_messages = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        
+        # Metrics
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.messages_coalesced = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.last_send_duration = 0.0
+    
+    def start(self):
+        """Start the writer task"""
+        self.writer_task = asyncio.create_task(self._writer_loop())
+    
+    def enqueue(self, payload: Payload, event_type: Optional[str] = None):
+        """Queue a message without blocking"""
+        if self.closed:
+            return
+        
+        item = (time.monotonic(), event_type, payload)
+        
+        if len(self.queue) >= self.queue_size:
+            if self.policy == "drop_newest":
+                self._record_drop()
+                return
+            if self.policy == "coalesce" and event_type in COALESCE_EVENTS:
+                for i, (_, queued_type, _) in enumerate(self.queue):
+                    if queued_type == event_type:
+                        self.queue[i] = item
+                        self.messages_coalesced += 1
+                        return
+            self.queue.popleft()
+            self._record_drop()
+        
+        self.queue.append(item)
+        self.has_messages.set()
+    
+    def _record_drop(self):
+        self.messages_dropped += 1
+        if self.messages_dropped >= WS_MAX_DROPPED:
+            self.close("too many dropped messages")
+    
+    def get_lag(self) -> float:
+        """Age of the oldest queued message in seconds"""
+        if not self.queue:
+            return 0.0
+        return time.monotonic() - self.queue[0][0]
+    
+    async def _writer_loop(self):
+        """Send queued messages in order"""
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self.has_messages.clear()
+                    await self.has_messages.wait()
+                    continue
+                
+                enqueued_at, _, payload = self.queue.popleft()
+                lag = time.monotonic() - enqueued_at
+                if lag > WS_MAX_LAG:
+                    self.close(f"lagging {lag:.1f}s behind")
+                    break
+                
+                send_start = time.monotonic()
+                if isinstance(payload, bytes):
+                    await asyncio.wait_for(self.websocket.send_bytes(payload), WS_SEND_TIMEOUT)
+                elif isinstance(payload, str):
+                    await asyncio.wait_for(self.websocket.send_text(payload), WS_SEND_TIMEOUT)
+                else:
+                    await asyncio.wait_for(self.websocket.send_json(payload), WS_SEND_TIMEOUT)
+                self.last_send_duration = time.monotonic() - send_start
+                
+                self.messages_sent += 1
+                self.last_lag = lag
+                self.total_lag += lag
+                if lag > self.max_lag:
+                    self.max_lag = lag
+        
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.close(f"send timed out after {WS_SEND_TIMEOUT}s")
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client: {e}")
+            self.close("send error")
+        finally:
+            if self.close_reason:
+                await self._close_socket()
+    
+    def close(self, reason: str):
+        """Mark the client closed; the writer task closes the socket"""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        self.queue.clear()
+        self.has_messages.set()
+        logger.warning(f"Disconnecting slow WebSocket client: {reason}")
+        self.manager.disconnect(self.websocket)
+    
+    async def _close_socket(self):
+        try:
+            # 1013: try again later
+            await asyncio.wait_for(self.websocket.close(code=1013), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+    
+    def stop(self):
+        """Stop the writer task (client went away)"""
+        self.closed = True
+        self.queue.clear()
+        if self.writer_task and not self.writer_task.done():
+            self.writer_task.cancel()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-client lag and delivery metrics"""
+        client = self.websocket.client
+        return {
+            'client': f"{client.host}:{client.port}" if client else None,
+            'encoding': self.encoding,
+            'subscription': self.subscription.to_dict(),
+            'connected_seconds': round(time.time() - self.connected_at, 1),
+            'queue_depth': len(self.queue),
+            'queue_size': self.queue_size,
+            'current_lag_ms': round(self.get_lag() * 1000, 2),
+            'last_lag_ms': round(self.last_lag * 1000, 2),
+            'max_lag_ms': round(self.max_lag * 1000, 2),
+            'avg_lag_ms': round(self.total_lag / self.messages_sent * 1000, 2) if self.messages_sent else 0.0,
+            'last_send_ms': round(self.last_send_duration * 1000, 2),
+            'messages_sent': self.messages_sent,
+            'messages_dropped': self.messages_dropped,
+            'messages_coalesced': self.messages_coalesced
+        }
+
 
 class WebSocketManager:
     """Manages WebSocket connections and broadcasts"""
     
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(
+        self,
+        batch_interval: float = WS_BATCH_INTERVAL,
+        batch_max_events: int = WS_BATCH_MAX_EVENTS
+    ):
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
         self.connection_count = 0
+        
+        # Subscription index: event_type -> clients; _wildcard wants every event
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
+        self._wildcard: Set[ClientConnection] = set()
+        self.slow_disconnects = 0
+        
+        # Detection batching
+        self.batch_interval = batch_interval
+        self.batch_max_events = batch_max_events
+        self._pending_detections: List[Dict[str, Any]] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self.frames_sent = 0
+        self.detections_batched = 0
     
     async def connect(self, websocket: WebSocket):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
-        self.active_connections.add(websocket)
+        
+        # Wire encoding negotiated via /ws?encoding=...
+        encoding = websocket.query_params.get('encoding', ENCODING_JSON)
+        if encoding not in SUPPORTED_ENCODINGS:
+            encoding = ENCODING_JSON
+        
+        client = ClientConnection(websocket, self, encoding=encoding)
+        self.active_connections[websocket] = client
+        self._index(client)
+        client.start()
         self.connection_count += 1
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
         
@@ -28,49 +243,150 @@ class WebSocketManager:
         await self.send_personal_message({
             'event_type': 'connected',
             'message': 'Connected to IDS monitoring system',
+            'encoding': encoding,
             'timestamp': datetime.now().isoformat()
         }, websocket)
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
-        self.active_connections.discard(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        self._unindex(client)
+        if client.close_reason:
+            self.slow_disconnects += 1
+        else:
+            client.stop()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
     
-    async def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
+    def _index(self, client: ClientConnection):
+        event_types = client.subscription.event_types
+        if event_types is None:
+            self._wildcard.add(client)
+            return
+        for event_type in event_types:
+            self._subscribers.setdefault(event_type, set()).add(client)
+    
+    def _unindex(self, client: ClientConnection):
+        self._wildcard.discard(client)
+        for event_type in client.subscription.event_types or ():
+            clients = self._subscribers.get(event_type)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    del self._subscribers[event_type]
+    
+    def _clients_for(self, event_type: Optional[str]) -> List[ClientConnection]:
+        """Clients subscribed to an event type (index lookup, no per-client checks)"""
+        clients = list(self._wildcard)
+        if event_type is not None:
+            clients.extend(self._subscribers.get(event_type, ()))
+        return clients
+    
+    def has_subscribers(self, event_type: str) -> bool:
+        """True if any client would receive this event type"""
+        return bool(self._wildcard or self._subscribers.get(event_type))
+    
+    def update_subscription(self, websocket: WebSocket, message: Dict[str, Any]) -> Subscription:
+        """Replace a client's subscription (raises ValueError on invalid filters)"""
+        subscription = Subscription.from_message(message)
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            self._unindex(client)
+            client.subscription = subscription
+            self._index(client)
+            logger.info(f"Client {client.get_stats()['client']} subscription: {subscription.to_dict()}")
+        return subscription
+    
+    async def send_personal_message(self, message: Payload, websocket: WebSocket):
         """Send a message to a specific WebSocket"""
+        client = self.active_connections.get(websocket)
+        if client:
+            event_type = message.get('event_type') if isinstance(message, dict) else None
+            client.enqueue(message, event_type)
+            return
+        
         try:
             await websocket.send_json(message)
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+    
+    def _broadcast_now(self, message: Dict[str, Any]):
+        """Serialize once and enqueue the same frame for every client"""
+        event_type = message.get('event_type')
+        clients = self._clients_for(event_type)
+        if not clients:
+            return
+        
+        frame = json.dumps(message)
+        for client in clients:
+            client.enqueue(frame, event_type)
     
     async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast a message to all connected clients"""
-        if not self.active_connections:
+        """Broadcast a message to all connected clients (enqueue only, never blocks on clients)"""
+        self._broadcast_now(message)
+    
+    async def broadcast_detection(self, detection_data: Dict[str, Any]):
+        """Queue a detection for the next batched frame"""
+        self._pending_detections.append(detection_data)
+        
+        if len(self._pending_detections) >= self.batch_max_events:
+            self._flush_detections()
+        elif self._batch_timer is None:
+            loop = asyncio.get_running_loop()
+            self._batch_timer = loop.call_later(self.batch_interval, self._flush_detections)
+    
+    def _flush_detections(self):
+        """Send pending detections as one detection_batch frame"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        
+        if not self._pending_detections:
+            return
+        
+        batch = self._pending_detections
+        self._pending_detections = []
+        
+        clients = self._clients_for('detection_batch')
+        if not clients:
             return
         
-        disconnected = set()
+        # Clients with equal filters share one filtered subset
+        groups: Dict[DetectionFilter, List[ClientConnection]] = {}
+        for client in clients:
+            groups.setdefault(client.subscription.detections, []).append(client)
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.add(connection)
+        now = datetime.now()
+        for detection_filter, members in groups.items():
+            if detection_filter.is_passthrough():
+                subset = batch
+            else:
+                subset = detection_filter.apply(batch)
+            if not subset:
+                continue
+            
+            # Encode each wire format once per group, only if a member uses it
+            json_frame = None
+            binary_frame = None
+            for client in members:
+                if client.encoding == ENCODING_COLUMNAR:
+                    if binary_frame is None:
+                        binary_frame = encode_detection_batch(subset, now.timestamp())
+                    client.enqueue(binary_frame, 'detection_batch')
+                else:
+                    if json_frame is None:
+                        json_frame = json.dumps({
+                            'event_type': 'detection_batch',
+                            'timestamp': now.isoformat(),
+                            'count': len(subset),
+                            'data': subset
+                        })
+                    client.enqueue(json_frame, 'detection_batch')
         
-        # Remove disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
-    
-    async def broadcast_detection(self, detection_data: Dict[str, Any]):
-        """Broadcast detection event"""
-        message = {
-            'event_type': 'detection',
-            'timestamp': datetime.now().isoformat(),
-            'data': detection_data
-        }
-        await self.broadcast(message)
-        logger.debug(f"Broadcasted detection: {detection_data.get('prediction', 'Unknown')}")
+        self.frames_sent += 1
+        self.detections_batched += len(batch)
+        logger.debug(f"Broadcasted detection batch: {len(batch)} detections")
     
     async def broadcast_vm_status(self, vm_status: Dict[str, Any]):
         """Broadcast VM status update"""
@@ -92,16 +408,29 @@ class WebSocketManager:
         await self.broadcast(message)
         logger.debug(f"Broadcasted attack status: {attack_status.get('attack_type', 'Unknown')}")
     
-    async def broadcast_stats(self, stats: Dict[str, Any]):
-        """Broadcast statistics update"""
+    async def broadcast_stats(self, stats: Dict[str, Any], seq: Optional[int] = None):
+        """Broadcast a full statistics snapshot"""
         message = {
             'event_type': 'stats',
             'timestamp': datetime.now().isoformat(),
             'data': stats
         }
+        if seq is not None:
+            message['seq'] = seq
         await self.broadcast(message)
         logger.debug("Broadcasted stats")
     
+    async def broadcast_stats_delta(self, delta: Dict[str, Any], seq: int):
+        """Broadcast changes since the previous stats message (never coalesced)"""
+        message = {
+            'event_type': 'stats_delta',
+            'timestamp': datetime.now().isoformat(),
+            'seq': seq,
+            'data': delta
+        }
+        await self.broadcast(message)
+        logger.debug("Broadcasted stats delta")
+    
     async def broadcast_monitoring_status(self, is_running: bool, message_text: str = ""):
         """Broadcast monitoring status change"""
         message = {
@@ -118,6 +447,23 @@ class WebSocketManager:
     def get_active_connection_count(self) -> int:
         """Get number of active connections"""
         return len(self.active_connections)
+    
+    def get_batch_stats(self) -> Dict[str, Any]:
+        """Get detection batching statistics"""
+        return {
+            'batch_interval_ms': self.batch_interval * 1000,
+            'batch_max_events': self.batch_max_events,
+            'frames_sent': self.frames_sent,
+            'detections_batched': self.detections_batched,
+            'pending': len(self._pending_detections),
+            'subscription_groups': len({
+                client.subscription.detections for client in self.active_connections.values()
+            })
+        }
+    
+    def get_client_stats(self) -> list:
+        """Get per-client queue and lag metrics"""
+        return [client.get_stats() for client in self.active_connections.values()]
 
 
 # Global WebSocket manager instance
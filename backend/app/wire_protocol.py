@@ -0,0 +1,152 @@
+"""Compact binary (columnar) encoding for /ws detection batches
+
+Frame layout (little-endian):
+
+    magic       4s   b"IDSB"
+    version     u8
+    reserved    u8
+    count       u32  number of detections
+    timestamp   f64  frame time (unix seconds)
+    n_strings   u16  string table size
+    strings     n_strings x (u16 length, utf-8 bytes)
+    columns     one array of `count` values per column: NUMERIC_COLUMNS,
+                then STRING_COLUMNS
+
+String columns hold u16 indexes into the string table (0xFFFF = null) and
+missing float values are NaN. Clients opt in with /ws?encoding=columnar;
+all other events stay JSON text frames.
+"""
+
+import math
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+MAGIC = b"IDSB"
+VERSION = 1
+NULL_STRING = 0xFFFF
+
+ENCODING_JSON = "json"
+ENCODING_COLUMNAR = "columnar"
+SUPPORTED_ENCODINGS = (ENCODING_JSON, ENCODING_COLUMNAR)
+
+# (field, struct format) - order is the wire order
+NUMERIC_COLUMNS = [
+    ('timestamp', 'd'),
+    ('confidence', 'f'),
+    ('src_port', 'H'),
+    ('dst_port', 'H'),
+    ('packet_count', 'I'),
+    ('byte_count', 'd'),
+    ('count', 'I'),
+    ('first_seen', 'd'),
+    ('last_seen', 'd'),
+    ('is_attack', 'B'),
+]
+STRING_COLUMNS = ['flow_id', 'prediction', 'src_ip', 'dst_ip', 'protocol', 'incident_id']
+
+_TIME_FIELDS = ('timestamp', 'first_seen', 'last_seen')
+_HEADER = struct.Struct("<4sBBId")
+
+
+def _to_epoch(value: Any) -> float:
+    """Convert an ISO string / datetime / number to unix seconds (NaN if missing)"""
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def encode_detection_batch(detections: List[Dict[str, Any]], frame_time: float = None) -> bytes:
+    """Encode a list of detection dicts (as broadcast by main.detection_callback)"""
+    count = len(detections)
+    frame_time = frame_time if frame_time is not None else time.time()
+    
+    # String table
+    strings: Dict[str, int] = {}
+    string_columns = []
+    for field in STRING_COLUMNS:
+        refs = []
+        for d in detections:
+            value = d.get(field)
+            if value is None:
+                refs.append(NULL_STRING)
+                continue
+            index = strings.get(value)
+            if index is None:
+                index = len(strings)
+                if index >= NULL_STRING:
+                    raise ValueError("Too many distinct strings in one frame")
+                strings[value] = index
+            refs.append(index)
+        string_columns.append(refs)
+    
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, 0, count, frame_time),
+        struct.pack("<H", len(strings))
+    ]
+    for value in strings:
+        encoded = value.encode('utf-8')
+        parts.append(struct.pack("<H", len(encoded)))
+        parts.append(encoded)
+    
+    for field, fmt in NUMERIC_COLUMNS:
+        if field in _TIME_FIELDS:
+            values = [_to_epoch(d.get(field)) for d in detections]
+        elif fmt == 'B':
+            values = [1 if d.get(field) else 0 for d in detections]
+        elif fmt in ('f', 'd'):
+            values = [float(d.get(field) or 0.0) for d in detections]
+        else:
+            values = [int(d.get(field) or 0) for d in detections]
+        parts.append(struct.pack(f"<{count}{fmt}", *values))
+    
+    for refs in string_columns:
+        parts.append(struct.pack(f"<{count}H", *refs))
+    
+    return b"".join(parts)
+
+
+def decode_detection_batch(frame: bytes) -> Dict[str, Any]:
+    """Decode a columnar frame back into the JSON detection_batch message shape"""
+    magic, version, _, count, frame_time = _HEADER.unpack_from(frame, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a detection batch frame")
+    offset = _HEADER.size
+    
+    (n_strings,) = struct.unpack_from("<H", frame, offset)
+    offset += 2
+    strings = []
+    for _ in range(n_strings):
+        (length,) = struct.unpack_from("<H", frame, offset)
+        offset += 2
+        strings.append(frame[offset:offset + length].decode('utf-8'))
+        offset += length
+    
+    detections = [{} for _ in range(count)]
+    for field, fmt in NUMERIC_COLUMNS:
+        column = struct.unpack_from(f"<{count}{fmt}", frame, offset)
+        offset += struct.calcsize(f"<{count}{fmt}")
+        for d, value in zip(detections, column):
+            if field in _TIME_FIELDS:
+                value = None if math.isnan(value) else datetime.fromtimestamp(value).isoformat()
+            elif fmt == 'B':
+                value = bool(value)
+            d[field] = value
+    
+    for field in STRING_COLUMNS:
+        column = struct.unpack_from(f"<{count}H", frame, offset)
+        offset += 2 * count
+        for d, ref in zip(detections, column):
+            d[field] = None if ref == NULL_STRING else strings[ref]
+    
+    return {
+        'event_type': 'detection_batch',
+        'timestamp': datetime.fromtimestamp(frame_time).isoformat(),
+        'count': count,
+        'data': detections
+    }
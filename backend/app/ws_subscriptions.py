@@ -0,0 +1,136 @@
+"""Per-client /ws subscription filters"""
+
+import random
+import ipaddress
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+# Related events are subscribed to together ("detection" also gets batches,
+# "stats" also gets deltas)
+DETECTION_EVENTS = {'detection', 'detection_batch'}
+STATS_EVENTS = {'stats', 'stats_delta'}
+EVENT_GROUPS = (DETECTION_EVENTS, STATS_EVENTS)
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _parse_networks(values: Any, field: str) -> Tuple[Network, ...]:
+    if values is None:
+        return ()
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, (list, tuple, set)):
+        raise ValueError(f"{field} must be a string or a list")
+    try:
+        return tuple(ipaddress.ip_network(v, strict=False) for v in values)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid {field}: {e}")
+
+
+def _string_set(values: Any, field: str) -> Optional[FrozenSet[str]]:
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, (list, tuple, set)):
+        raise ValueError(f"{field} must be a string or a list")
+    if not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{field} must be a list of strings")
+    return frozenset(values)
+
+
+def _ip_in(ip: Optional[str], networks: Tuple[Network, ...]) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in networks)
+
+
+@dataclass(frozen=True)
+class DetectionFilter:
+    """Detection-level filter; clients with equal filters share one filtered frame"""
+    attack_classes: Optional[FrozenSet[str]] = None
+    min_confidence: float = 0.0
+    src_networks: Tuple[Network, ...] = ()
+    dst_networks: Tuple[Network, ...] = ()
+    sample_rate: float = 1.0
+    
+    def is_passthrough(self) -> bool:
+        """True if every detection matches"""
+        return (
+            self.attack_classes is None
+            and self.min_confidence <= 0
+            and not self.src_networks
+            and not self.dst_networks
+            and self.sample_rate >= 1.0
+        )
+    
+    def apply(self, batch: List[Dict]) -> List[Dict]:
+        """Filter a batch, keeping arrival order"""
+        result = []
+        for d in batch:
+            if self.attack_classes is not None and d.get('prediction') not in self.attack_classes:
+                continue
+            if d.get('confidence', 0.0) < self.min_confidence:
+                continue
+            if self.src_networks and not _ip_in(d.get('src_ip'), self.src_networks):
+                continue
+            if self.dst_networks and not _ip_in(d.get('dst_ip'), self.dst_networks):
+                continue
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                continue
+            result.append(d)
+        return result
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """What a client wants to receive (default: everything)"""
+    event_types: Optional[FrozenSet[str]] = None
+    detections: DetectionFilter = DetectionFilter()
+    
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "Subscription":
+        """
+        Build from a client message:
+        {"type": "subscribe", "event_types": [...], "attack_classes": [...],
+         "min_confidence": 0.5, "src_cidrs": [...], "dst_cidrs": [...], "sample_rate": 0.1}
+        """
+        event_types = _string_set(message.get('event_types'), 'event_types')
+        if event_types is not None:
+            for group in EVENT_GROUPS:
+                if event_types & group:
+                    event_types = event_types | group
+        
+        attack_classes = _string_set(message.get('attack_classes'), 'attack_classes')
+        
+        try:
+            min_confidence = float(message.get('min_confidence', 0.0))
+            sample_rate = float(message.get('sample_rate', 1.0))
+        except (TypeError, ValueError):
+            raise ValueError("min_confidence and sample_rate must be numbers")
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("sample_rate must be in (0, 1]")
+        
+        return cls(
+            event_types=event_types,
+            detections=DetectionFilter(
+                attack_classes=attack_classes,
+                min_confidence=min_confidence,
+                src_networks=_parse_networks(message.get('src_cidrs'), 'src_cidrs'),
+                dst_networks=_parse_networks(message.get('dst_cidrs'), 'dst_cidrs'),
+                sample_rate=sample_rate
+            )
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        f = self.detections
+        return {
+            'event_types': sorted(self.event_types) if self.event_types is not None else None,
+            'attack_classes': sorted(f.attack_classes) if f.attack_classes is not None else None,
+            'min_confidence': f.min_confidence,
+            'src_cidrs': [str(n) for n in f.src_networks],
+            'dst_cidrs': [str(n) for n in f.dst_networks],
+            'sample_rate': f.sample_rate
+        }
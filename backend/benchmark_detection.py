@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+End-to-end detection benchmark: replays labelled pcaps through the live
+pipeline (PacketCapture -> FlowAggregator -> FeatureExtractor -> model +
+heuristics) and reports sustained pps, drops, per-class precision/recall and
+time to first detection per attack as JSON.
+
+Ground truth comes from the pcap arguments (FILE=LABEL, default Benign) and
+from --labels: a scenario run record (logs/scenarios/<run_id>.json) or a JSON
+list of {"label", "start", "end", "ip"} windows in capture time (epoch
+seconds). A flow takes the label of its first packet. For generated attacks,
+record the target's traffic while a scenario runs and pass the run record.
+
+    python benchmark_detection.py hulk.pcap="DoS attacks-Hulk" normal.pcap
+    python benchmark_detection.py campaign.pcap --labels logs/scenarios/<run_id>.json
+"""
+
+import sys
+import os
+import json
+import time
+import queue
+import asyncio
+import argparse
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from scapy.utils import PcapReader
+
+from app.config import BATCH_SIZE, DETECTION_INTERVAL, DETECTION_CONFIDENCE_THRESHOLD, PACKET_BUFFER_SIZE
+from app.models.scenario import BENIGN_LABEL
+from app.services.capture.packet_capture import PacketCapture
+from app.services.detection_engine import DetectionEngine
+
+logger = logging.getLogger("benchmark_detection")
+
+_EOF = object()
+
+
+def parse_source(arg):
+    """FILE[=LABEL] -> (path, label)"""
+    path, _, label = arg.partition("=")
+    return Path(path), label or BENIGN_LABEL
+
+
+def load_windows(path):
+    """Labelled time windows: (start, end, label, ip or None)"""
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, dict) and 'labels' in data:
+        # Scenario run record: attack phases against the run's target
+        return [
+            (entry['start'], entry['end'] or float('inf'), entry['label'], data['target_ip'])
+            for entry in data['labels']
+            if entry['label'] != BENIGN_LABEL and entry['start'] is not None
+        ]
+    return [(w['start'], w['end'], w['label'], w.get('ip')) for w in data]
+
+
+class Replay:
+    """
+    Reads the pcaps in order into a bounded buffer (the capture backlog a live
+    sniffer would have) and feeds them to PacketCapture from a second thread.
+    With speed > 0 packets arrive on their capture schedule and are dropped
+    when the buffer is full; with speed 0 the reader waits instead.
+    """
+
+    def __init__(self, sources, windows, capture, speed, buffer_size):
+        self.sources = sources
+        self.windows = windows
+        self.capture = capture
+        self.speed = speed
+        self.buffer = queue.Queue(maxsize=buffer_size)
+
+        self.packets_read = 0
+        self.dropped = 0
+        self.clock = 0.0  # replay time (capture seconds) of the last packet handled
+        self.shift = 0.0  # timestamp shift of the current file (files continue the first one's timeline)
+        self.span = 0.0
+        self.wall_start = 0.0
+        self.wall_eof = None
+        self.done = threading.Event()
+        self.label_first_seen = {}
+        self.current_label = None
+
+    def now(self):
+        """Replay time, advancing with the wall clock once the pcaps are exhausted"""
+        if self.wall_eof is None:
+            return self.clock
+        return self.clock + (time.perf_counter() - self.wall_eof) * self.speed
+
+    def label_for(self, packet_info, default):
+        ts = float(packet_info['timestamp']) - self.shift
+        for start, end, label, ip in self.windows:
+            if start <= ts < end and (ip is None or ip in (packet_info['src_ip'], packet_info['dst_ip'])):
+                return label
+        return default
+
+    def _read(self):
+        offset = 0.0
+        origin = None
+        try:
+            for path, label in self.sources:
+                first_ts = None
+                shift = 0.0
+                with PcapReader(str(path)) as reader:
+                    for packet in reader:
+                        ts = float(packet.time)
+                        if first_ts is None:
+                            first_ts = ts
+                            if origin is None:
+                                origin = ts
+                            shift = origin + offset - first_ts
+                        if shift:
+                            packet.time = ts + shift
+                        position = offset + ts - first_ts
+                        self.span = max(self.span, position)
+                        self.packets_read += 1
+
+                        if self.speed:
+                            delay = self.wall_start + position / self.speed - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                            try:
+                                self.buffer.put_nowait((packet, label, position, shift))
+                            except queue.Full:
+                                self.dropped += 1
+                        else:
+                            self.buffer.put((packet, label, position, shift))
+                offset = self.span
+        finally:
+            self.buffer.put(_EOF)
+
+    def _handle(self):
+        while True:
+            item = self.buffer.get()
+            if item is _EOF:
+                break
+            packet, self.current_label, self.clock, self.shift = item
+            self.capture._packet_handler(packet)
+        self.wall_eof = time.perf_counter()
+        self.done.set()
+
+    def start(self):
+        self.wall_start = time.perf_counter()
+        threading.Thread(target=self._read, daemon=True).start()
+        threading.Thread(target=self._handle, daemon=True).start()
+
+
+def _ratio(a, b):
+    return round(a / b, 4) if b else None
+
+
+def _f1(precision, recall):
+    if not precision or not recall:
+        return 0.0 if precision is not None and recall is not None else None
+    return round(2 * precision * recall / (precision + recall), 4)
+
+
+async def run(args):
+    engine = DetectionEngine()
+    aggregator = engine.flow_aggregator
+    # Flow timeouts follow capture time; between packets it advances at the replay speed
+    engine.clock.reset(args.speed)
+    truth = {}  # id(flow) -> label of its first packet
+
+    def on_packet(packet_info):
+        label = replay.label_for(packet_info, replay.current_label)
+        if label != BENIGN_LABEL:
+            replay.label_first_seen.setdefault(label, replay.clock)
+        key, _ = aggregator._get_flow_key(packet_info)
+        completed = aggregator.add_packet(packet_info)
+        flow = completed or aggregator.flows.get(key)
+        if flow is not None and id(flow) not in truth:
+            truth[id(flow)] = label
+
+    capture = PacketCapture(
+        interface="replay",
+        packet_callback=on_packet,
+        vm_ip=args.vm_ip,
+        cardinality_monitor=engine.cardinality_monitor
+    )
+    sources = [parse_source(arg) for arg in args.pcaps]
+    windows = load_windows(args.labels) if args.labels else []
+    replay = Replay(sources, windows, capture, args.speed, args.buffer)
+    interval = args.interval if args.interval is not None else (DETECTION_INTERVAL if args.speed else 0.0)
+
+    confusion = defaultdict(lambda: defaultdict(int))
+    first_detection = {}
+    first_alert = {}
+    classified = 0
+    backlog_peak = 0
+    backlog_at_eof = None
+    sources_count = defaultdict(int)
+
+    replay.start()
+    processing_start = time.perf_counter()
+    while True:
+        finished = replay.done.is_set()
+        if finished:
+            if backlog_at_eof is None:
+                backlog_at_eof = len(aggregator.completed_flows) + aggregator.get_active_flow_count()
+            aggregator.flush()
+
+        flows = aggregator.get_completed_flows(limit=args.batch_size)
+        backlog_peak = max(backlog_peak, len(aggregator.completed_flows) + len(flows))
+        if flows:
+            verdicts = engine.classify_flows(flows)
+            now = replay.now()
+            for verdict in verdicts:
+                flow = verdict['flow']
+                label = truth.get(id(flow), BENIGN_LABEL)
+                alert = verdict['is_attack'] and (
+                    verdict['source'] == 'heuristic' or verdict['confidence'] >= DETECTION_CONFIDENCE_THRESHOLD
+                )
+                predicted = verdict['prediction'] if alert else BENIGN_LABEL
+                confusion[label][predicted] += 1
+                sources_count[verdict['source'] if alert else 'benign'] += 1
+                if label != BENIGN_LABEL and alert:
+                    first_alert.setdefault(label, now)
+                    if predicted == label:
+                        first_detection.setdefault(label, now)
+            for flow in flows:
+                truth.pop(id(flow), None)
+            classified += len(verdicts)
+        elif finished:
+            break
+
+        await asyncio.sleep(interval)
+    processing_seconds = time.perf_counter() - processing_start
+    capture_seconds = (replay.wall_eof or time.perf_counter()) - replay.wall_start
+
+    # Per-class precision/recall (heuristic predictions are their own classes)
+    labels = sorted(set(confusion) | {p for row in confusion.values() for p in row})
+    classes = {}
+    for label in labels:
+        tp = confusion[label].get(label, 0) if label in confusion else 0
+        support = sum(confusion[label].values()) if label in confusion else 0
+        predicted = sum(row.get(label, 0) for row in confusion.values())
+        precision, recall = _ratio(tp, predicted), _ratio(tp, support)
+        classes[label] = {
+            'support': support,
+            'predicted': predicted,
+            'precision': precision,
+            'recall': recall,
+            'f1': _f1(precision, recall)
+        }
+
+    # Attack vs benign
+    tp = sum(n for label, row in confusion.items() if label != BENIGN_LABEL for p, n in row.items() if p != BENIGN_LABEL)
+    fn = sum(row.get(BENIGN_LABEL, 0) for label, row in confusion.items() if label != BENIGN_LABEL)
+    fp = sum(n for p, n in confusion[BENIGN_LABEL].items() if p != BENIGN_LABEL) if BENIGN_LABEL in confusion else 0
+    tn = confusion[BENIGN_LABEL].get(BENIGN_LABEL, 0) if BENIGN_LABEL in confusion else 0
+    precision, recall = _ratio(tp, tp + fp), _ratio(tp, tp + fn)
+
+    handled = capture.packet_count
+    return {
+        'sources': [{'path': str(path), 'label': label} for path, label in sources],
+        'labels_file': args.labels,
+        'speed': args.speed,
+        'detection_interval': interval,
+        'batch_size': args.batch_size,
+        'model_loaded': engine.model_service.is_loaded,
+        'capture_seconds': round(replay.span, 3),
+        'wall_seconds': round(processing_seconds, 3),
+        'packets': {
+            'read': replay.packets_read,
+            'handled': replay.packets_read - replay.dropped,
+            'ip': handled,
+            'dropped': replay.dropped,
+            'drop_rate': _ratio(replay.dropped, replay.packets_read),
+            'pps_offered': round(replay.packets_read / replay.span, 1) if replay.span else None,
+            'pps_sustained': round((replay.packets_read - replay.dropped) / capture_seconds, 1) if capture_seconds else None
+        },
+        'flows': {
+            'classified': classified,
+            'flows_per_second': round(classified / processing_seconds, 1) if processing_seconds else None,
+            'backlog_peak': backlog_peak,
+            'backlog_at_eof': backlog_at_eof,
+            'alerts_by_source': dict(sources_count)
+        },
+        'binary': {
+            'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+            'precision': precision,
+            'recall': recall,
+            'f1': _f1(precision, recall)
+        },
+        'classes': classes,
+        'confusion': {label: dict(row) for label, row in confusion.items()},
+        'time_to_first_detection': {
+            label: {
+                'first_packet': round(first_seen, 3),
+                'exact': round(first_detection[label] - first_seen, 3) if label in first_detection else None,
+                'any_attack': round(first_alert[label] - first_seen, 3) if label in first_alert else None
+            }
+            for label, first_seen in sorted(replay.label_first_seen.items())
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay labelled pcaps through the detection pipeline")
+    parser.add_argument("pcaps", nargs="+", help="pcap/pcapng file, optionally FILE=LABEL (default Benign)")
+    parser.add_argument("--labels", help="scenario run record or JSON list of labelled time windows")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed multiplier; 0 = as fast as the pipeline accepts (no drops)")
+    parser.add_argument("--interval", type=float, default=None,
+                        help=f"seconds between flow batches (default {DETECTION_INTERVAL}, 0 when --speed 0)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="flows per batch")
+    parser.add_argument("--buffer", type=int, default=PACKET_BUFFER_SIZE, help="capture buffer in packets")
+    parser.add_argument("--vm-ip", help="only count packets to/from this address (like live capture)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
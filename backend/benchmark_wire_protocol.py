@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark /ws detection frame encodings: JSON vs columnar binary (vs MessagePack if installed)"""
+
+import sys
+import os
+import json
+import time
+import random
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.wire_protocol import encode_detection_batch, decode_detection_batch
+
+DETECTIONS = 10000
+BATCH_SIZE = 200  # WS_BATCH_MAX_EVENTS
+ROUNDS = 5
+
+PREDICTIONS = ["DoS attacks-Hulk", "DDoS attacks-LOIC-HTTP", "Heuristic: HTTP Flood", "Heuristic: SYN Flood"]
+
+
+def make_detection(i):
+    now = datetime.now().isoformat()
+    src_port = random.randint(1024, 65535)
+    return {
+        'flow_id': f"192.168.64.1:{src_port}-192.168.64.2:80-TCP",
+        'timestamp': now,
+        'prediction': random.choice(PREDICTIONS),
+        'confidence': random.random(),
+        'src_ip': "192.168.64.1",
+        'dst_ip': "192.168.64.2",
+        'src_port': src_port,
+        'dst_port': 80,
+        'protocol': "TCP",
+        'packet_count': random.randint(10, 500),
+        'byte_count': random.randint(600, 500000),
+        'is_attack': True,
+        'incident_id': f"incident-{i % 50}",
+        'count': random.randint(1, 1000),
+        'first_seen': now,
+        'last_seen': now
+    }
+
+
+def bench(name, encode, batches):
+    """Return (bytes per 10k detections, CPU seconds per 10k detections)"""
+    total_bytes = 0
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        for batch in batches:
+            total_bytes += len(encode(batch))
+    cpu = (time.process_time() - start) / ROUNDS
+    total_bytes //= ROUNDS
+    return {'encoding': name, 'bytes_per_10k': total_bytes, 'cpu_seconds_per_10k': round(cpu, 4)}
+
+
+def main():
+    detections = [make_detection(i) for i in range(DETECTIONS)]
+    batches = [detections[i:i + BATCH_SIZE] for i in range(0, DETECTIONS, BATCH_SIZE)]
+
+    # Sanity check round trip
+    decoded = decode_detection_batch(encode_detection_batch(batches[0]))
+    assert decoded['count'] == len(batches[0])
+    assert decoded['data'][0]['src_port'] == batches[0][0]['src_port']
+
+    encoders = [
+        ("json", lambda b: json.dumps({
+            'event_type': 'detection_batch',
+            'timestamp': datetime.now().isoformat(),
+            'count': len(b),
+            'data': b
+        }).encode()),
+        ("columnar", encode_detection_batch),
+    ]
+
+    try:
+        import msgpack
+        encoders.append(("msgpack", lambda b: msgpack.packb({
+            'event_type': 'detection_batch',
+            'count': len(b),
+            'data': b
+        })))
+    except ImportError:
+        pass
+
+    results = [bench(name, encode, batches) for name, encode in encoders]
+    baseline = results[0]['bytes_per_10k']
+    for r in results:
+        r['size_vs_json'] = round(r['bytes_per_10k'] / baseline, 3)
+
+    print(json.dumps({
+        'detections': DETECTIONS,
+        'batch_size': BATCH_SIZE,
+        'results': results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -57,11 +57,11 @@ async def test_2_interface_detection():
     print_header("TEST 2: Network Interface Detection")
     try:
         interface_manager = InterfaceManager()
-        interface = interface_manager.get_interface(vm_ip=DEFAULT_VM_IP)
+        interface = await interface_manager.get_interface(vm_ip=DEFAULT_VM_IP)
         print_result("Interface Detection", interface is not None, 
                     f"Interface: {interface}")
         
-        has_perms = interface_manager.check_capture_permissions()
+        has_perms = await interface_manager.check_capture_permissions()
         print_result("Capture Permissions", has_perms,
                     "Root privileges detected" if has_perms else "Run with sudo")
         
@@ -74,7 +74,7 @@ async def test_3_packet_capture():
     print_header("TEST 3: Packet Capture (10 seconds)")
     try:
         interface_manager = InterfaceManager()
-        interface = interface_manager.get_interface(vm_ip=DEFAULT_VM_IP)
+        interface = await interface_manager.get_interface(vm_ip=DEFAULT_VM_IP)
         
         packets_captured = []
         
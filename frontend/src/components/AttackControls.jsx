@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { attacksAPI } from '../services/api';
 import { DEFAULT_VM_IP } from '../utils/constants';
 
-const AttackControls = ({ vmStatus }) => {
+const AttackControls = ({ vmStatus, activeAttacks: pushedAttacks }) => {
   const [availableAttacks, setAvailableAttacks] = useState([]);
   const [selectedAttack, setSelectedAttack] = useState('');
   const [activeAttacks, setActiveAttacks] = useState([]);
@@ -11,10 +11,16 @@ const AttackControls = ({ vmStatus }) => {
 
   useEffect(() => {
     fetchAvailableAttacks();
-    const interval = setInterval(fetchActiveAttacks, 3000);
-    return () => clearInterval(interval);
+    fetchActiveAttacks();
   }, []);
 
+  // Active attacks are pushed by the server with each stats tick
+  useEffect(() => {
+    if (pushedAttacks) {
+      setActiveAttacks(pushedAttacks);
+    }
+  }, [pushedAttacks]);
+
   const fetchAvailableAttacks = async () => {
     try {
       const response = await attacksAPI.list();
@@ -10,7 +10,7 @@ import NotificationCenter from './NotificationCenter';
 import { useWebSocket } from '../hooks/useWebSocket';
 import { useDetections } from '../hooks/useDetections';
 import { useNotifications } from '../hooks/useNotifications';
-import { monitoringAPI, statsAPI } from '../services/api';
+import { monitoringAPI } from '../services/api';
 import { DEFAULT_VM_IP } from '../utils/constants';
 
 const Dashboard = () => {
@@ -19,9 +19,11 @@ const Dashboard = () => {
     detections,
     vmStatus,
     monitoringStatus,
+    stats,
+    activeAttacks,
+    realAttacks,
   } = useWebSocket();
 
-  const [stats, setStats] = useState(null);
   const { attackCounts, timelineData, totalAttacks, recentDetections } = useDetections(detections, stats);
   const { notifications, clearNotification, clearAll } = useNotifications(detections);
   const [isMonitoring, setIsMonitoring] = useState(false);
@@ -30,20 +32,6 @@ const Dashboard = () => {
     setIsMonitoring(monitoringStatus);
   }, [monitoringStatus]);
 
-  useEffect(() => {
-    // Fetch stats periodically
-    const interval = setInterval(async () => {
-      try {
-        const response = await statsAPI.getSummary();
-        setStats(response.data);
-      } catch (error) {
-        console.error('Error fetching stats:', error);
-      }
-    }, 5000);
-
-    return () => clearInterval(interval);
-  }, []);
-
   const handleStartMonitoring = async () => {
     try {
       // Use default VM IP if vmStatus doesn't have one
@@ -138,13 +126,13 @@ const Dashboard = () => {
           </div>
 
           <div className="grid-item attack-section">
-            <RealAttackControls />
+            <RealAttackControls activeAttacks={realAttacks} />
           </div>
         </div>
 
         <div className="grid-row">
           <div className="grid-item attack-section-sim">
-            <AttackControls vmStatus={vmStatus || { ipv4: DEFAULT_VM_IP }} />
+            <AttackControls vmStatus={vmStatus || { ipv4: DEFAULT_VM_IP }} activeAttacks={activeAttacks} />
           </div>
         </div>
 
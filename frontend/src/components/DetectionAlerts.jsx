@@ -19,7 +19,7 @@ const DetectionAlerts = ({ detections }) => {
         {recentDetections.length > 0 ? (
           recentDetections.map((detection, index) => (
             <div
-              key={detection.flow_id || index}
+              key={detection.incident_id || detection.flow_id || index}
               className={`alert-item ${detection.is_attack ? 'attack-alert' : 'benign-alert'}`}
               style={{ 
                 borderLeftColor: detection.is_attack 
@@ -51,6 +51,11 @@ const DetectionAlerts = ({ detections }) => {
                   <span className="meta-item">
                     <span className="meta-label">Packets:</span> {detection.packet_count}
                   </span>
+                  {detection.count > 1 && (
+                    <span className="meta-item">
+                      <span className="meta-label">Events:</span> {detection.count}
+                    </span>
+                  )}
                   <span className="meta-item">
                     <span className="meta-label">Time:</span> {new Date(detection.timestamp).toLocaleTimeString()}
                   </span>
@@ -10,7 +10,7 @@ const attackTypes = [
   { id: 'slowloris', name: 'Slowloris', description: 'Slow HTTP attack', color: '#9c27b0' },
 ];
 
-const RealAttackControls = () => {
+const RealAttackControls = ({ activeAttacks: pushedAttacks }) => {
   const [selectedAttack, setSelectedAttack] = useState('hulk');
   const [duration, setDuration] = useState(30);
   const [loading, setLoading] = useState(false);
@@ -18,11 +18,16 @@ const RealAttackControls = () => {
   const [message, setMessage] = useState('');
 
   useEffect(() => {
-    // Poll for active attacks
-    const interval = setInterval(fetchActiveAttacks, 2000);
-    return () => clearInterval(interval);
+    fetchActiveAttacks();
   }, []);
 
+  // Active attacks are pushed by the server with each stats tick
+  useEffect(() => {
+    if (pushedAttacks) {
+      setActiveAttacks(pushedAttacks);
+    }
+  }, [pushedAttacks]);
+
   const fetchActiveAttacks = async () => {
     try {
       const response = await axios.get(`${API_BASE_URL}/api/attack-launcher/active`);
@@ -25,13 +25,15 @@ export const useDetections = (detections, stats) => {
     recent.forEach((detection) => {
       if (detection.is_attack) {
         const attackType = detection.prediction;
-        counts[attackType] = (counts[attackType] || 0) + 1;
+        counts[attackType] = (counts[attackType] || 0) + (detection.count || 1);
       }
     });
     setAttackCounts(counts);
 
     // Calculate total attacks from recent
-    const total = recent.filter(d => d.is_attack).length;
+    const total = recent
+      .filter(d => d.is_attack)
+      .reduce((sum, d) => sum + (d.count || 1), 0);
     setTotalAttacks(total);
 
     // Generate timeline data (last 100 recent detections for chart)
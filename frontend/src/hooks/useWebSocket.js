@@ -1,13 +1,35 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import wsService from '../services/websocket';
 import { WS_EVENTS } from '../utils/constants';
 
+// Apply a stats_delta ({ set: [[path, value]], unset: [path] }) to a snapshot
+const applyStatsDelta = (snapshot, delta) => {
+  const next = { ...snapshot };
+  const parentOf = (path) => {
+    let node = next;
+    for (let i = 0; i < path.length - 1; i++) {
+      const key = path[i];
+      node[key] = { ...(node[key] || {}) };
+      node = node[key];
+    }
+    return node;
+  };
+  delta.set.forEach(([path, value]) => {
+    parentOf(path)[path[path.length - 1]] = value;
+  });
+  delta.unset.forEach((path) => {
+    delete parentOf(path)[path[path.length - 1]];
+  });
+  return next;
+};
+
 export const useWebSocket = () => {
   const [isConnected, setIsConnected] = useState(false);
   const [detections, setDetections] = useState([]);
   const [vmStatus, setVmStatus] = useState(null);
   const [attackStatus, setAttackStatus] = useState(null);
   const [stats, setStats] = useState(null);
+  const statsSeq = useRef(null);
   const [monitoringStatus, setMonitoringStatus] = useState(false);
 
   useEffect(() => {
@@ -19,14 +41,41 @@ export const useWebSocket = () => {
       setIsConnected(data.status === 'connected');
     };
 
-    // Detection event handler - increased buffer to 1000 for better tracking
-    const handleDetection = (data) => {
+    // Merge new detections (newest last) into the list, newest first.
+    // Buffer increased to 1000 for better tracking; incident updates
+    // replace the earlier entry for the same incident
+    const mergeDetections = (incoming) => {
       setDetections((prev) => {
-        const newDetections = [data.data, ...prev].slice(0, 1000);
-        return newDetections;
+        const incidentIds = new Set(
+          incoming.filter((d) => d.incident_id).map((d) => d.incident_id)
+        );
+        const rest = incidentIds.size > 0
+          ? prev.filter((d) => !incidentIds.has(d.incident_id))
+          : prev;
+        const seen = new Set();
+        const newest = [];
+        for (let i = incoming.length - 1; i >= 0; i--) {
+          const d = incoming[i];
+          if (d.incident_id) {
+            if (seen.has(d.incident_id)) continue;
+            seen.add(d.incident_id);
+          }
+          newest.push(d);
+        }
+        return [...newest, ...rest].slice(0, 1000);
       });
     };
 
+    // Detection event handler
+    const handleDetection = (data) => {
+      mergeDetections([data.data]);
+    };
+
+    // Batched detection frame handler
+    const handleDetectionBatch = (data) => {
+      mergeDetections(data.data);
+    };
+
     // VM status handler
     const handleVMStatus = (data) => {
       setVmStatus(data.data);
@@ -37,11 +86,23 @@ export const useWebSocket = () => {
       setAttackStatus(data.data);
     };
 
-    // Stats handler
+    // Stats handler - full snapshot pushed by the server
     const handleStats = (data) => {
+      statsSeq.current = data.seq ?? null;
       setStats(data.data);
     };
 
+    // Stats delta handler - ask for a full snapshot if one was missed
+    const handleStatsDelta = (data) => {
+      if (statsSeq.current === null || data.seq !== statsSeq.current + 1) {
+        statsSeq.current = null;
+        wsService.send({ type: 'stats_resync' });
+        return;
+      }
+      statsSeq.current = data.seq;
+      setStats((prev) => applyStatsDelta(prev || {}, data.data));
+    };
+
     // Monitoring status handler
     const handleMonitoringStatus = (data) => {
       setMonitoringStatus(data.data.is_running);
@@ -50,18 +111,22 @@ export const useWebSocket = () => {
     // Register listeners
     wsService.on('connection', handleConnection);
     wsService.on(WS_EVENTS.DETECTION, handleDetection);
+    wsService.on(WS_EVENTS.DETECTION_BATCH, handleDetectionBatch);
     wsService.on(WS_EVENTS.VM_STATUS, handleVMStatus);
     wsService.on(WS_EVENTS.ATTACK_STATUS, handleAttackStatus);
     wsService.on(WS_EVENTS.STATS, handleStats);
+    wsService.on(WS_EVENTS.STATS_DELTA, handleStatsDelta);
     wsService.on(WS_EVENTS.MONITORING_STATUS, handleMonitoringStatus);
 
     // Cleanup
     return () => {
       wsService.off('connection', handleConnection);
       wsService.off(WS_EVENTS.DETECTION, handleDetection);
+      wsService.off(WS_EVENTS.DETECTION_BATCH, handleDetectionBatch);
       wsService.off(WS_EVENTS.VM_STATUS, handleVMStatus);
       wsService.off(WS_EVENTS.ATTACK_STATUS, handleAttackStatus);
       wsService.off(WS_EVENTS.STATS, handleStats);
+      wsService.off(WS_EVENTS.STATS_DELTA, handleStatsDelta);
       wsService.off(WS_EVENTS.MONITORING_STATUS, handleMonitoringStatus);
     };
   }, []);
@@ -71,7 +136,9 @@ export const useWebSocket = () => {
     detections,
     vmStatus,
     attackStatus,
-    stats,
+    stats: stats?.summary ?? null,
+    activeAttacks: stats?.active_attacks,
+    realAttacks: stats?.real_attacks,
     monitoringStatus,
   };
 };
@@ -48,6 +48,14 @@ export const statsAPI = {
   getModel: () => api.get('/api/stats/model'),
   getWebSocket: () => api.get('/api/stats/websocket'),
   getSystem: () => api.get('/api/stats/system'),
+  getTimeseries: (resolution = '1s', start, end) =>
+    api.get('/api/stats/timeseries', { params: { resolution, start, end } }),
+};
+
+// Detection history API
+export const detectionsAPI = {
+  query: (params = {}) => api.get('/api/detections', { params }),
+  getStoreStats: () => api.get('/api/detections/store'),
 };
 
 // Health check
@@ -1,4 +1,5 @@
-import { WS_URL, WS_EVENTS } from '../utils/constants';
+import { WS_URL, WS_ENCODING } from '../utils/constants';
+import { decodeDetectionBatch } from './wireProtocol';
 
 class WebSocketService {
   constructor() {
@@ -7,6 +8,7 @@ class WebSocketService {
     this.reconnectTimer = null;
     this.listeners = {};
     this.isConnecting = false;
+    this.subscription = null;
   }
 
   connect() {
@@ -22,18 +24,25 @@ class WebSocketService {
     console.log('Connecting to WebSocket...');
 
     try {
-      this.ws = new WebSocket(WS_URL);
+      const url = WS_ENCODING === 'json' ? WS_URL : `${WS_URL}?encoding=${WS_ENCODING}`;
+      this.ws = new WebSocket(url);
+      this.ws.binaryType = 'arraybuffer';
 
       this.ws.onopen = () => {
         console.log('WebSocket connected');
         this.isConnecting = false;
         this.clearReconnectTimer();
+        if (this.subscription) {
+          this.send({ type: 'subscribe', ...this.subscription });
+        }
         this.notifyListeners('connection', { status: 'connected' });
       };
 
       this.ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const data = event.data instanceof ArrayBuffer
+            ? decodeDetectionBatch(event.data)
+            : JSON.parse(event.data);
           const eventType = data.event_type;
           
           if (eventType) {
@@ -122,6 +131,15 @@ class WebSocketService {
     }
   }
 
+  // Server-side filters: { event_types, attack_classes, min_confidence, src_cidrs, dst_cidrs, sample_rate }
+  // Kept across reconnects; pass null to receive everything again
+  subscribe(filters) {
+    this.subscription = filters;
+    if (this.isConnected()) {
+      this.send({ type: 'subscribe', ...(filters || {}) });
+    }
+  }
+
   isConnected() {
     return this.ws && this.ws.readyState === WebSocket.OPEN;
   }
@@ -0,0 +1,93 @@
+// Decoder for the columnar binary detection_batch frames sent on
+// /ws?encoding=columnar (see backend/app/wire_protocol.py for the layout)
+
+const MAGIC = 'IDSB';
+const VERSION = 1;
+const NULL_STRING = 0xffff;
+
+const NUMERIC_COLUMNS = [
+  ['timestamp', 'f64'],
+  ['confidence', 'f32'],
+  ['src_port', 'u16'],
+  ['dst_port', 'u16'],
+  ['packet_count', 'u32'],
+  ['byte_count', 'f64'],
+  ['count', 'u32'],
+  ['first_seen', 'f64'],
+  ['last_seen', 'f64'],
+  ['is_attack', 'u8'],
+];
+const STRING_COLUMNS = ['flow_id', 'prediction', 'src_ip', 'dst_ip', 'protocol', 'incident_id'];
+const TIME_FIELDS = new Set(['timestamp', 'first_seen', 'last_seen']);
+
+const SIZES = { u8: 1, u16: 2, u32: 4, f32: 4, f64: 8 };
+
+const textDecoder = new TextDecoder('utf-8');
+
+const readValue = (view, type, offset) => {
+  switch (type) {
+    case 'u8': return view.getUint8(offset);
+    case 'u16': return view.getUint16(offset, true);
+    case 'u32': return view.getUint32(offset, true);
+    case 'f32': return view.getFloat32(offset, true);
+    default: return view.getFloat64(offset, true);
+  }
+};
+
+const toIso = (seconds) => (Number.isNaN(seconds) ? null : new Date(seconds * 1000).toISOString());
+
+export const decodeDetectionBatch = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = textDecoder.decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC || view.getUint8(4) !== VERSION) {
+    throw new Error('Unknown binary frame');
+  }
+
+  const count = view.getUint32(6, true);
+  const frameTime = view.getFloat64(10, true);
+  let offset = 18;
+
+  const stringCount = view.getUint16(offset, true);
+  offset += 2;
+  const strings = new Array(stringCount);
+  for (let i = 0; i < stringCount; i++) {
+    const length = view.getUint16(offset, true);
+    offset += 2;
+    strings[i] = textDecoder.decode(new Uint8Array(buffer, offset, length));
+    offset += length;
+  }
+
+  const detections = new Array(count);
+  for (let i = 0; i < count; i++) {
+    detections[i] = {};
+  }
+
+  NUMERIC_COLUMNS.forEach(([field, type]) => {
+    const size = SIZES[type];
+    for (let i = 0; i < count; i++) {
+      let value = readValue(view, type, offset);
+      if (TIME_FIELDS.has(field)) {
+        value = toIso(value);
+      } else if (field === 'is_attack') {
+        value = value === 1;
+      }
+      detections[i][field] = value;
+      offset += size;
+    }
+  });
+
+  STRING_COLUMNS.forEach((field) => {
+    for (let i = 0; i < count; i++) {
+      const ref = view.getUint16(offset, true);
+      detections[i][field] = ref === NULL_STRING ? null : strings[ref];
+      offset += 2;
+    }
+  });
+
+  return {
+    event_type: 'detection_batch',
+    timestamp: toIso(frameTime),
+    count,
+    data: detections,
+  };
+};
@@ -1,6 +1,8 @@
 // API Configuration
 export const API_BASE_URL = 'http://localhost:8000';
 export const WS_URL = 'ws://localhost:8000/ws';
+// Wire encoding for detection batches: 'json' or 'columnar' (compact binary)
+export const WS_ENCODING = 'json';
 
 // Default VM Configuration
 export const DEFAULT_VM_IP = '192.168.64.2';
@@ -49,9 +51,11 @@ export const CHART_CONFIG = {
 // WebSocket Events
 export const WS_EVENTS = {
   DETECTION: 'detection',
+  DETECTION_BATCH: 'detection_batch',
   VM_STATUS: 'vm_status',
   ATTACK_STATUS: 'attack_status',
   STATS: 'stats',
+  STATS_DELTA: 'stats_delta',
   MONITORING_STATUS: 'monitoring_status',
   CONNECTED: 'connected'
 };